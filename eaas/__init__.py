@@ -0,0 +1 @@
+"""Módulos de apoio ao dashboard EaaS."""
@@ -0,0 +1,357 @@
+"""Pipeline offline de agregação de estabelecimentos (RAIS/CNAE).
+
+Lê os CSVs brutos de estabelecimentos (dezenas de milhões de linhas) em
+blocos, filtra por setor (divisão CNAE) e porte (vínculos ativos),
+classifica cada estabelecimento em um segmento e conta por município × segmento.
+Cada arquivo é dividido em trechos de bytes alinhados a quebras de linha e
+os trechos são processados em paralelo por um pool de processos; cada
+worker mantém apenas um bloco de linhas e o agregado parcial em memória.
+
+O resultado é um cubo ``estabelecimentos.<ext>`` (UF, Município, Segmento,
+Estabelecimentos, Vínculos) em ``DIR_CUBOS`` (``data/cubos``, ou
+``EAAS_CUBOS_DIR``) que alimenta as colunas 'Empresas Alvo' de ``mercado``
+e 'Qtd. Estimada' das ``segmentacao_*``. O dashboard e o ranking leem o
+cubo do mesmo diretório; ``--destino`` grava em outro, que só é lido com
+``EAAS_CUBOS_DIR`` apontando para ele::
+
+    python -m eaas.agregacao processar rais_2024_*.csv --processos 8 --atualizar
+    python -m eaas.agregacao benchmark --linhas 5000000 --processos 4
+
+Observação: a divisão em trechos assume que nenhum campo contém quebra de
+linha entre aspas, o que vale para os arquivos da RAIS.
+"""
+import argparse
+import io
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from eaas.dados import DIR_DADOS
+from eaas.regioes import CADASTRO
+
+# Nomes das colunas no layout da RAIS Estabelecimentos
+COLUNAS = {
+    'municipio': 'Município',
+    'cnae': 'CNAE 2.0 Subclasse',
+    'vinculos': 'Qtd Vínculos Ativos',
+}
+
+SEPARADOR = ';'
+ENCODING = 'latin-1'
+
+# Divisões CNAE de tecnologia (62: TI, 63: serviços de informação)
+CNAE_TECNOLOGIA = (62, 63)
+
+# Regras de segmentação avaliadas em ordem; vale a primeira que casar.
+# (segmento, divisões CNAE ou None para qualquer uma, vínculos mín., vínculos máx.)
+SEGMENTOS = [
+    ('Startups Growth', CNAE_TECNOLOGIA, 5, 49),
+    ('Startups Scale', CNAE_TECNOLOGIA, 50, 249),
+    ('PMEs Médias', None, 50, 249),
+    ('PMEs Pequenas', None, 10, 49),
+    ('PMEs Micro', None, 1, 9),
+]
+
+# Regiões do dashboard: (nível do cubo, código) — None agrega tudo
+REGIOES = {regiao: (c['nivel'], c['codigo']) for regiao, c in CADASTRO.items()}
+
+TABELAS_SEGMENTACAO = {regiao: c['segmentacao'] for regiao, c in CADASTRO.items()}
+
+LINHAS_POR_BLOCO = 500_000
+BYTES_POR_TRECHO = 64 * 1024 * 1024
+
+DIR_CUBOS = Path(os.environ.get('EAAS_CUBOS_DIR', DIR_DADOS / 'cubos'))
+
+
+class _Trecho(io.RawIOBase):
+    """Visão somente-leitura de ``[inicio, fim)`` de um arquivo."""
+
+    def __init__(self, caminho, inicio, fim):
+        self._arquivo = open(caminho, 'rb')
+        self._arquivo.seek(inicio)
+        self._restante = fim - inicio
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self._restante <= 0:
+            return 0
+        lidos = self._arquivo.readinto(memoryview(buffer)[:self._restante])
+        self._restante -= lidos
+        return lidos
+
+    def close(self):
+        self._arquivo.close()
+        super().close()
+
+
+def _trechos(caminho, bytes_por_trecho=BYTES_POR_TRECHO):
+    """Divide o arquivo (sem o cabeçalho) em trechos alinhados a início de linha."""
+    tamanho = os.path.getsize(caminho)
+    with open(caminho, 'rb') as f:
+        cabecalho = f.readline()
+        inicio = f.tell()
+        trechos = []
+        while inicio < tamanho:
+            f.seek(min(inicio + bytes_por_trecho, tamanho))
+            f.readline()
+            fim = min(f.tell(), tamanho)
+            trechos.append((inicio, fim))
+            inicio = fim
+    nomes = cabecalho.decode(ENCODING).strip().split(SEPARADOR)
+    return nomes, trechos
+
+
+def classificar(cnae, vinculos, segmentos=SEGMENTOS):
+    """Índice do segmento de cada estabelecimento (-1 quando nenhum casa)."""
+    divisao = cnae // 100_000
+    condicoes = []
+    for _, divisoes, minimo, maximo in segmentos:
+        cond = (vinculos >= minimo) & (vinculos <= maximo)
+        if divisoes is not None:
+            cond &= np.isin(divisao, divisoes)
+        condicoes.append(cond)
+    return np.select(condicoes, np.arange(len(segmentos)), default=-1)
+
+
+def _agregar_trecho(caminho, nomes, inicio, fim, filtros):
+    """Worker: conta estabelecimentos por (município, segmento) em um trecho."""
+    usar = [COLUNAS['municipio'], COLUNAS['cnae'], COLUNAS['vinculos']]
+    parciais = []
+    with io.BufferedReader(_Trecho(caminho, inicio, fim), buffer_size=1 << 20) as trecho:
+        blocos = pd.read_csv(
+            trecho, sep=SEPARADOR, encoding=ENCODING, header=None, names=nomes,
+            usecols=usar, dtype=dict.fromkeys(usar, 'int32'),
+            chunksize=filtros['linhas_por_bloco'],
+        )
+        for bloco in blocos:
+            municipio = bloco[COLUNAS['municipio']].to_numpy()
+            cnae = bloco[COLUNAS['cnae']].to_numpy()
+            vinculos = bloco[COLUNAS['vinculos']].to_numpy()
+
+            manter = (vinculos >= filtros['min_vinculos']) & (vinculos <= filtros['max_vinculos'])
+            if filtros['cnae'] is not None:
+                manter &= np.isin(cnae // 100_000, filtros['cnae'])
+            segmento = classificar(cnae, vinculos)
+            manter &= segmento >= 0
+
+            # Chave única município × segmento para um groupby de uma coluna só
+            chave = municipio[manter].astype(np.int64) * 16 + segmento[manter]
+            parcial = pd.DataFrame({
+                'Estabelecimentos': np.ones(len(chave), dtype=np.int64),
+                'Vínculos': vinculos[manter].astype(np.int64),
+            }).groupby(chave).sum()
+            parciais.append(parcial)
+
+            # Mantém o agregado parcial compacto entre blocos
+            if len(parciais) > 8:
+                parciais = [pd.concat(parciais).groupby(level=0).sum()]
+    if not parciais:
+        return pd.DataFrame(columns=['Estabelecimentos', 'Vínculos'], dtype='int64')
+    return pd.concat(parciais).groupby(level=0).sum()
+
+
+def _montar_cubo(agregado):
+    chave = agregado.index.to_numpy(np.int64)
+    municipio = chave // 16
+    nomes_segmentos = np.array([s[0] for s in SEGMENTOS])
+    cubo = pd.DataFrame({
+        # Códigos da RAIS têm 6 dígitos (sem verificador); os do IBGE, 7
+        'UF': np.where(municipio >= 1_000_000, municipio // 100_000, municipio // 10_000),
+        'Município': municipio,
+        'Segmento': pd.Categorical(nomes_segmentos[chave % 16], categories=nomes_segmentos),
+        'Estabelecimentos': agregado['Estabelecimentos'].to_numpy(),
+        'Vínculos': agregado['Vínculos'].to_numpy(),
+    })
+    return cubo.sort_values(['UF', 'Município', 'Segmento'], ignore_index=True)
+
+
+def agregar(arquivos, processos=None, cnae=None, min_vinculos=1, max_vinculos=249,
+            linhas_por_bloco=LINHAS_POR_BLOCO, bytes_por_trecho=BYTES_POR_TRECHO):
+    """Agrega os arquivos brutos em um cubo município × segmento."""
+    filtros = {
+        'cnae': None if cnae is None else np.asarray(cnae),
+        'min_vinculos': min_vinculos,
+        'max_vinculos': max_vinculos,
+        'linhas_por_bloco': linhas_por_bloco,
+    }
+    tarefas = []
+    for caminho in arquivos:
+        nomes, trechos = _trechos(caminho, bytes_por_trecho)
+        tarefas += [(str(caminho), nomes, inicio, fim, filtros) for inicio, fim in trechos]
+
+    if processos == 1 or len(tarefas) == 1:
+        parciais = [_agregar_trecho(*t) for t in tarefas]
+    else:
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            parciais = list(pool.map(_agregar_trecho, *zip(*tarefas)))
+
+    agregado = pd.concat(parciais).groupby(level=0).sum()
+    return _montar_cubo(agregado)
+
+
+def contagens_regionais(cubo, regioes=REGIOES):
+    """Estabelecimentos por região do dashboard × segmento (a partir do cubo)."""
+    partes = {}
+    for regiao, (nivel, codigo) in regioes.items():
+        recorte = cubo if nivel is None else cubo[cubo[nivel].to_numpy() == codigo]
+        partes[regiao] = recorte.groupby('Segmento', observed=False)['Estabelecimentos'].sum()
+    return pd.DataFrame(partes).T
+
+
+def atualizar_tabelas(cubo, diretorio=None, regioes=REGIOES):
+    """Reescreve 'Empresas Alvo' e 'Qtd. Estimada' nos CSVs de ``data/``."""
+    diretorio = Path(diretorio or DIR_DADOS)
+    contagens = contagens_regionais(cubo, regioes)
+
+    caminho = diretorio / 'mercado.csv'
+    mercado = pd.read_csv(caminho)
+    totais = contagens.sum(axis=1)
+    presentes = mercado['Região'].isin(totais.index)
+    mercado.loc[presentes, 'Empresas Alvo'] = totais.reindex(mercado.loc[presentes, 'Região']).to_numpy()
+    mercado.to_csv(caminho, index=False)
+    alterados = [caminho]
+
+    for regiao, nome in TABELAS_SEGMENTACAO.items():
+        if regiao not in contagens.index:
+            continue
+        caminho = diretorio / f'{nome}.csv'
+        seg = pd.read_csv(caminho)
+        linha = contagens.loc[regiao]
+        presentes = seg['Segmento'].isin(linha.index)
+        seg.loc[presentes, 'Qtd. Estimada'] = linha.reindex(seg.loc[presentes, 'Segmento']).to_numpy()
+        seg.to_csv(caminho, index=False)
+        alterados.append(caminho)
+    return alterados
+
+
+def salvar_cubo(cubo, destino=None):
+    """Grava o cubo em Parquet (ou CSV se pyarrow não estiver disponível)."""
+    destino = Path(destino or DIR_CUBOS)
+    destino.mkdir(parents=True, exist_ok=True)
+    try:
+        caminho = destino / 'estabelecimentos.parquet'
+        cubo.to_parquet(caminho, index=False)
+    except ImportError:
+        caminho = destino / 'estabelecimentos.csv'
+        cubo.to_csv(caminho, index=False)
+    return caminho
+
+
+def arquivo_cubo(diretorio=None):
+    """Caminho do cubo gravado por ``salvar_cubo``, ou None se não houver."""
+    diretorio = Path(diretorio or DIR_CUBOS)
+    for nome in ('estabelecimentos.parquet', 'estabelecimentos.csv'):
+        if (diretorio / nome).exists():
+            return diretorio / nome
+    return None
+
+
+def carregar_cubo(diretorio=None):
+    """Lê o cubo de estabelecimentos, ou None se ainda não foi processado."""
+    caminho = arquivo_cubo(diretorio)
+    if caminho is None:
+        return None
+    if caminho.suffix == '.parquet':
+        return pd.read_parquet(caminho)
+    cubo = pd.read_csv(caminho)
+    cubo['Segmento'] = cubo['Segmento'].astype('category')
+    return cubo
+
+
+def gerar_sintetico(caminho, linhas, semente=0):
+    """Arquivo no layout da RAIS com ``linhas`` estabelecimentos aleatórios."""
+    rng = np.random.default_rng(semente)
+    colunas = [COLUNAS['municipio'], 'Tipo Estab', COLUNAS['cnae'], COLUNAS['vinculos'], 'Ind Simples']
+    bloco = 1_000_000
+    with open(caminho, 'w', encoding=ENCODING) as f:
+        f.write(SEPARADOR.join(colunas) + '\n')
+        for inicio in range(0, linhas, bloco):
+            n = min(bloco, linhas - inicio)
+            df = pd.DataFrame({
+                colunas[0]: rng.integers(110001, 530010, n),
+                colunas[1]: 1,
+                colunas[2]: rng.integers(111301, 9900800, n),
+                colunas[3]: rng.geometric(0.08, n) - 1,
+                colunas[4]: rng.integers(0, 2, n),
+            })
+            df.to_csv(f, sep=SEPARADOR, header=False, index=False)
+    return caminho
+
+
+def _pico_rss_mb():
+    # ru_maxrss é em KB no Linux; soma o maior worker ao processo principal
+    proprio = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    filhos = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return {'principal': proprio / 1024, 'maior_worker': filhos / 1024}
+
+
+def benchmark(linhas, processos=None, linhas_por_bloco=LINHAS_POR_BLOCO,
+              bytes_por_trecho=BYTES_POR_TRECHO):
+    """Mede linhas/s e pico de RSS do pipeline sobre um arquivo sintético."""
+    with tempfile.TemporaryDirectory() as tmp:
+        caminho = gerar_sintetico(Path(tmp) / 'rais_sintetico.csv', linhas)
+        inicio = time.perf_counter()
+        cubo = agregar([caminho], processos=processos, linhas_por_bloco=linhas_por_bloco,
+                       bytes_por_trecho=bytes_por_trecho)
+        duracao = time.perf_counter() - inicio
+    return {
+        'linhas': linhas,
+        'processos': processos or os.cpu_count(),
+        'segundos': round(duracao, 3),
+        'linhas_por_segundo': round(linhas / duracao),
+        'linhas_no_cubo': len(cubo),
+        'pico_rss_mb': {k: round(v, 1) for k, v in _pico_rss_mb().items()},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Agregação de estabelecimentos (RAIS/CNAE) em cubos")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    proc = sub.add_parser('processar', help="Agrega arquivos brutos no diretório de cubos")
+    proc.add_argument('arquivos', nargs='+', type=Path)
+    proc.add_argument('--processos', type=int, default=None)
+    proc.add_argument('--cnae', default=None, help="Divisões CNAE aceitas, separadas por vírgula (ex.: 62,63,70)")
+    proc.add_argument('--min-vinculos', type=int, default=1)
+    proc.add_argument('--max-vinculos', type=int, default=249)
+    proc.add_argument('--linhas-por-bloco', type=int, default=LINHAS_POR_BLOCO)
+    proc.add_argument('--destino', type=Path, default=DIR_CUBOS,
+                      help="Diretório do cubo (padrão: EAAS_CUBOS_DIR ou data/cubos, onde o dashboard lê)")
+    proc.add_argument('--atualizar', action='store_true',
+                      help="Reescreve Empresas Alvo/Qtd. Estimada nos CSVs de data/")
+
+    bench = sub.add_parser('benchmark', help="Mede linhas/s e pico de RSS com dados sintéticos")
+    bench.add_argument('--linhas', type=int, default=2_000_000)
+    bench.add_argument('--processos', type=int, default=None)
+    bench.add_argument('--linhas-por-bloco', type=int, default=LINHAS_POR_BLOCO)
+    bench.add_argument('--bytes-por-trecho', type=int, default=BYTES_POR_TRECHO)
+
+    args = parser.parse_args(argv)
+
+    if args.comando == 'processar':
+        cnae = None if args.cnae is None else [int(d) for d in args.cnae.split(',')]
+        cubo = agregar(args.arquivos, args.processos, cnae, args.min_vinculos,
+                       args.max_vinculos, args.linhas_por_bloco)
+        print(salvar_cubo(cubo, args.destino))
+        if args.destino.resolve() != DIR_CUBOS.resolve():
+            print(f"Para o dashboard ler este cubo: EAAS_CUBOS_DIR={args.destino}", file=sys.stderr)
+        if args.atualizar:
+            for caminho in atualizar_tabelas(cubo):
+                print(caminho)
+    else:
+        print(json.dumps(benchmark(args.linhas, args.processos, args.linhas_por_bloco,
+                                   args.bytes_por_trecho), ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
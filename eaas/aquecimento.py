@@ -0,0 +1,151 @@
+"""Aquecimento do dashboard antes de receber tráfego.
+
+Passos locais (não precisam do servidor):
+
+- compila o bytecode de ``eaas/`` e dos scripts;
+- importa os módulos pesados (Plotly, pyarrow) para trazer os arquivos ao
+  cache de páginas do sistema;
+- lê todas as tabelas e monta todos os artefatos, validando os dados e
+  gravando-os no armazém compartilhado entre réplicas (eaas.armazem);
+- com ``--converter``, gera os arquivos Arrow de ``data/`` (leitura mais rápida).
+
+Com ``--url``, espera o servidor Streamlit responder em ``/_stcore/health``
+e abre uma sessão pelo websocket com ``?aquecer=<token>``: o script
+renderiza todas as abas uma vez e os caches compartilhados do processo do
+servidor (``st.cache_resource``/``st.cache_data``) ficam populados antes do
+primeiro usuário. O token é ``EAAS_AQUECIMENTO_TOKEN``, definido no ambiente
+do servidor e do aquecimento; sem ele o parâmetro é ignorado e qualquer
+visitante que o envie vê só a aba ativa. Uso típico no container::
+
+    export EAAS_AQUECIMENTO_TOKEN=$(python -c "import secrets; print(secrets.token_urlsafe())")
+    streamlit run eaas_dashboard.py &
+    python -m eaas.aquecimento --url http://localhost:8501
+"""
+import argparse
+import asyncio
+import compileall
+import hmac
+import importlib
+import os
+import time
+import urllib.parse
+import urllib.request
+from pathlib import Path
+
+from eaas.dados import carregar_fontes, converter
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+SCRIPTS = ['eaas_dashboard.py', 'dashboard.py']
+
+# Carregados sob demanda pelo dashboard; importá-los aqui só aquece o disco
+MODULOS_PESADOS = ['plotly.graph_objects', 'plotly.express', 'pyarrow.compute', 'eaas.cache']
+
+TIMEOUT_S = 120
+
+# Segredo que autoriza a sessão de aquecimento a montar todas as abas
+TOKEN = os.environ.get('EAAS_AQUECIMENTO_TOKEN', '')
+
+
+def autorizado(valor):
+    """``?aquecer=`` confere com o token do ambiente (sem token, nunca)."""
+    return bool(TOKEN) and hmac.compare_digest(str(valor), TOKEN)
+
+
+def compilar():
+    ok = compileall.compile_dir(RAIZ / 'eaas', quiet=1)
+    for script in SCRIPTS:
+        ok = compileall.compile_file(RAIZ / script, quiet=1) and ok
+    return bool(ok)
+
+
+def importar():
+    for nome in MODULOS_PESADOS:
+        importlib.import_module(nome)
+
+
+def preparar_dados(converter_arrow=False):
+    """Lê e valida as tabelas e monta todos os artefatos uma vez (gravando no armazém, se ativo)."""
+    from eaas.armazem import armazem_padrao, preencher
+    from eaas.artefatos import construir_artefatos
+    from eaas.dimensionamento import calcular_indicadores
+
+    if converter_arrow:
+        converter('arrow')
+    fontes = carregar_fontes()
+    calcular_indicadores(fontes)
+    armazem = armazem_padrao()
+    if armazem is None:
+        construir_artefatos(fontes)
+    else:
+        preencher(fontes, armazem)
+    return fontes
+
+
+def aguardar_servidor(url, timeout=TIMEOUT_S):
+    """Espera ``/_stcore/health`` responder; devolve os segundos de espera."""
+    inicio = time.perf_counter()
+    while True:
+        try:
+            with urllib.request.urlopen(url.rstrip('/') + '/_stcore/health', timeout=2) as resposta:
+                if resposta.status == 200:
+                    return time.perf_counter() - inicio
+        except OSError:
+            pass
+        if time.perf_counter() - inicio > timeout:
+            raise TimeoutError(f"Servidor em {url} não respondeu em {timeout} s")
+        time.sleep(0.1)
+
+
+async def _sessao(url, query_string, timeout):
+    import websockets
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+    endereco = url.rstrip('/').replace('http', 'ws', 1) + '/_stcore/stream'
+    async with websockets.connect(endereco, subprotocols=['streamlit'], max_size=None) as ws:
+        pedido = BackMsg()
+        pedido.rerun_script.query_string = query_string
+        await ws.send(pedido.SerializeToString())
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(await asyncio.wait_for(ws.recv(), timeout))
+            if msg.WhichOneof('type') == 'script_finished':
+                return msg.script_finished
+
+
+def abrir_sessao(url, query_string=None, timeout=TIMEOUT_S):
+    """Abre uma sessão e espera o script terminar; devolve os segundos gastos."""
+    if query_string is None:
+        query_string = urllib.parse.urlencode({'aquecer': TOKEN}) if TOKEN else ''
+    inicio = time.perf_counter()
+    asyncio.run(_sessao(url, query_string, timeout))
+    return time.perf_counter() - inicio
+
+
+def aquecer(url=None, converter_arrow=False):
+    """Executa os passos de aquecimento e devolve a duração de cada um (s)."""
+    etapas = {}
+    for nome, passo in (('compilar', compilar), ('importar', importar),
+                        ('dados', lambda: preparar_dados(converter_arrow))):
+        inicio = time.perf_counter()
+        passo()
+        etapas[nome] = round(time.perf_counter() - inicio, 3)
+    if url:
+        etapas['servidor'] = round(aguardar_servidor(url), 3)
+        etapas['sessao'] = round(abrir_sessao(url), 3)
+    return etapas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aquece o dashboard EaaS antes de receber tráfego")
+    parser.add_argument('--url', default=None, help="Servidor Streamlit a aquecer (ex.: http://localhost:8501)")
+    parser.add_argument('--converter', action='store_true', help="Gera os arquivos Arrow de data/")
+    args = parser.parse_args(argv)
+
+    for etapa, segundos in aquecer(args.url, args.converter).items():
+        print(f"{etapa}: {segundos:.3f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,319 @@
+"""Armazém em disco de artefatos (DataFrames e figuras) compartilhado entre réplicas.
+
+Cada entrada é endereçada pelo conteúdo: a chave é o hash das tabelas de
+origem de que o nó depende (``eaas.grafo.NOS``: uma seção, região ou parte
+delas), da versão do código que monta os artefatos e do nome do nó.
+Réplicas com os mesmos dados e o mesmo código chegam à mesma chave, então a
+primeira que montar o nó grava e as demais (inclusive uma réplica
+recém-iniciada) só leem.
+
+Layout de uma entrada (``<raiz>/<chave>/``)::
+
+    manifest.json   nome do artefato -> tipo e arquivo
+    0.parquet       DataFrames (e as tabelas de TabelaIndexada)
+    1.json          figuras Plotly (fig.to_json())
+
+A entrada é montada num diretório temporário e publicada com ``os.replace``
+(atômico): um leitor nunca vê uma entrada pela metade e, se duas réplicas
+gravarem a mesma chave ao mesmo tempo, a segunda simplesmente descarta a
+sua. Ler uma entrada atualiza o mtime do manifesto; quando o total passa de
+``LIMITE_MB``, as entradas usadas há mais tempo são removidas (LRU).
+
+A raiz vem de ``EAAS_ARMAZEM_DIR`` (padrão ``dist/artefatos``; vazio desliga
+o armazém) e deve ser um volume compartilhado pelas réplicas. Sem pyarrow o
+armazém fica desligado. Para preencher antes de subir as réplicas::
+
+    python -m eaas.armazem preencher
+    python -m eaas.armazem status
+    python -m eaas.armazem benchmark
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from eaas.dados import carregar_fontes, pa, versao_tabelas
+
+PASTA = Path(__file__).resolve().parent
+
+DIR_ARMAZEM = os.environ.get('EAAS_ARMAZEM_DIR', str(PASTA.parent / 'dist' / 'artefatos'))
+
+LIMITE_MB = float(os.environ.get('EAAS_ARMAZEM_MB', 256))
+
+# Módulos cujo código altera os artefatos gravados
+MODULOS = ['armazem', 'artefatos', 'concentracao', 'dados', 'dimensionamento', 'grafo', 'precos', 'regioes',
+           'tabela']
+
+MANIFESTO = 'manifest.json'
+
+
+def ativo():
+    return bool(DIR_ARMAZEM) and pa is not None
+
+
+def _hash(*partes):
+    h = hashlib.sha256()
+    for parte in partes:
+        h.update(parte if isinstance(parte, bytes) else str(parte).encode('utf-8'))
+        h.update(b'\x00')
+    return h.hexdigest()[:24]
+
+
+_versao_codigo = None
+
+
+def versao_codigo():
+    """Hash dos módulos em ``MODULOS`` (calculado uma vez por processo)."""
+    global _versao_codigo
+    if _versao_codigo is None:
+        _versao_codigo = _hash(*((PASTA / f'{nome}.py').read_bytes() for nome in MODULOS))
+    return _versao_codigo
+
+
+def chave_no(fontes, no, *extras):
+    """Chave de conteúdo dos artefatos de um nó de eaas.grafo (seção, região ou parte)."""
+    from eaas.grafo import NOS
+
+    return _hash(versao_codigo(), no, versao_tabelas(fontes, NOS[no]), *extras)
+
+
+def _nos_artefatos():
+    from eaas.grafo import NOS
+
+    return [no for no in NOS if no.startswith('artefatos:')]
+
+
+# ============================================================================
+# SERIALIZAÇÃO
+# ============================================================================
+
+def _figura_json(fig):
+    import plotly.io as pio
+
+    figura = json.loads(fig.to_json())
+    # O tema padrão é reaplicado na leitura: fica fora do arquivo (~85% do JSON)
+    # e é a parte mais cara de validar ao recriar a figura
+    padrao = pio.templates[pio.templates.default].to_plotly_json() if pio.templates.default else None
+    if figura['layout'].get('template') == json.loads(json.dumps(padrao, default=str)):
+        del figura['layout']['template']
+    return json.dumps(figura)
+
+
+def _gravar_item(valor, diretorio, i):
+    from eaas.tabela import TabelaIndexada
+
+    if isinstance(valor, TabelaIndexada):
+        # Só a tabela é gravada; os índices de ordenação são refeitos na leitura
+        valor.df.to_parquet(diretorio / f'{i}.parquet')
+        return {'tipo': 'tabela', 'arquivo': f'{i}.parquet'}
+    if isinstance(valor, pd.DataFrame):
+        valor.to_parquet(diretorio / f'{i}.parquet')
+        return {'tipo': 'dataframe', 'arquivo': f'{i}.parquet'}
+    if hasattr(valor, 'to_plotly_json'):
+        (diretorio / f'{i}.json').write_text(_figura_json(valor), encoding='utf-8')
+        return {'tipo': 'figura', 'arquivo': f'{i}.json'}
+    (diretorio / f'{i}.json').write_text(json.dumps(valor, ensure_ascii=False), encoding='utf-8')
+    return {'tipo': 'json', 'arquivo': f'{i}.json'}
+
+
+def _ler_item(item, diretorio):
+    caminho = diretorio / item['arquivo']
+    if item['tipo'] in ('dataframe', 'tabela'):
+        df = pd.read_parquet(caminho)
+        if item['tipo'] == 'dataframe':
+            return df
+        from eaas.tabela import TabelaIndexada
+        return TabelaIndexada(df)
+    texto = caminho.read_text(encoding='utf-8')
+    if item['tipo'] == 'figura':
+        import plotly.graph_objects as go
+        # Gravada a partir de uma figura válida: dispensa a validação propriedade a propriedade
+        return go.Figure(json.loads(texto), _validate=False)
+    return json.loads(texto)
+
+
+# ============================================================================
+# ARMAZÉM
+# ============================================================================
+
+class Armazem:
+    """Entradas ``chave -> dicionário de artefatos`` num diretório compartilhado."""
+
+    def __init__(self, raiz=None, limite_mb=LIMITE_MB):
+        self.raiz = Path(raiz or DIR_ARMAZEM)
+        self.limite = int(limite_mb * 1024 * 1024)
+
+    def _entradas(self):
+        if not self.raiz.exists():
+            return []
+        return [d for d in self.raiz.iterdir() if d.is_dir() and not d.name.startswith('.')]
+
+    def ler(self, chave):
+        """Artefatos gravados em ``chave``, ou None se não houver entrada completa."""
+        diretorio = self.raiz / chave
+        try:
+            itens = json.loads((diretorio / MANIFESTO).read_text(encoding='utf-8'))['itens']
+            artefatos = {nome: _ler_item(item, diretorio) for nome, item in itens.items()}
+            os.utime(diretorio / MANIFESTO)
+        except (OSError, ValueError, KeyError):
+            # Ausente ou removida por outra réplica durante a leitura
+            return None
+        return artefatos
+
+    def gravar(self, chave, artefatos):
+        """Publica a entrada atomicamente; retorna False se outra réplica já a publicou."""
+        self.raiz.mkdir(parents=True, exist_ok=True)
+        destino = self.raiz / chave
+        if destino.exists():
+            return False
+        temporario = Path(tempfile.mkdtemp(prefix=f'.{chave}.', dir=self.raiz))
+        os.chmod(temporario, 0o755)
+        try:
+            itens = {nome: _gravar_item(valor, temporario, i) for i, (nome, valor) in enumerate(artefatos.items())}
+            (temporario / MANIFESTO).write_text(json.dumps({'chave': chave, 'itens': itens}, ensure_ascii=False),
+                                                encoding='utf-8')
+            os.replace(temporario, destino)
+        except OSError:
+            # Diretório de destino já existe (gravação concorrente) ou disco cheio
+            shutil.rmtree(temporario, ignore_errors=True)
+            return False
+        self.despejar()
+        return True
+
+    def obter(self, chave, construir):
+        """Lê ``chave`` ou monta com ``construir()`` e grava."""
+        artefatos = self.ler(chave)
+        if artefatos is None:
+            artefatos = construir()
+            self.gravar(chave, artefatos)
+        return artefatos
+
+    def status(self):
+        """Uma linha por entrada: chave, tamanho e último uso, da mais recente para a mais antiga."""
+        linhas = []
+        for diretorio in self._entradas():
+            try:
+                uso = (diretorio / MANIFESTO).stat().st_mtime
+                tamanho = sum(f.stat().st_size for f in diretorio.iterdir())
+            except OSError:
+                continue
+            linhas.append({'Chave': diretorio.name, 'Tamanho (KB)': round(tamanho / 1024, 1), 'Último Uso': uso})
+        df = pd.DataFrame(linhas, columns=['Chave', 'Tamanho (KB)', 'Último Uso'])
+        df = df.sort_values('Último Uso', ascending=False, ignore_index=True)
+        df['Último Uso'] = pd.to_datetime(df['Último Uso'], unit='s')
+        return df
+
+    def despejar(self):
+        """Remove as entradas usadas há mais tempo até o total caber em ``LIMITE_MB``."""
+        entradas = self.status()
+        total = entradas['Tamanho (KB)'].sum() * 1024
+        removidas = []
+        for chave, tamanho in zip(entradas['Chave'][::-1], entradas['Tamanho (KB)'][::-1]):
+            if total <= self.limite:
+                break
+            # Renomeia antes de apagar: leitores nunca veem a entrada pela metade
+            lixo = self.raiz / f'.lixo.{chave}.{os.getpid()}'
+            try:
+                os.replace(self.raiz / chave, lixo)
+            except OSError:
+                continue
+            shutil.rmtree(lixo, ignore_errors=True)
+            total -= tamanho * 1024
+            removidas.append(chave)
+        return removidas
+
+    def limpar(self):
+        shutil.rmtree(self.raiz, ignore_errors=True)
+
+
+def armazem_padrao():
+    """Armazém configurado por ``EAAS_ARMAZEM_DIR``, ou None se desligado."""
+    return Armazem() if ativo() else None
+
+
+def preencher(fontes=None, armazem=None):
+    """Monta e grava os artefatos de todos os nós; retorna as chaves gravadas."""
+    from eaas.grafo import construir_no
+
+    fontes = carregar_fontes() if fontes is None else fontes
+    armazem = armazem or Armazem()
+    gravadas = {}
+    for no in _nos_artefatos():
+        chave = chave_no(fontes, no)
+        if armazem.ler(chave) is None:
+            armazem.gravar(chave, construir_no(fontes, no))
+            gravadas[no] = chave
+    return gravadas
+
+
+def benchmark(repeticoes=5):
+    """Montar todos os artefatos do zero contra ler do armazém (ms, mediana)."""
+    from eaas.grafo import construir_no
+
+    fontes = carregar_fontes()
+    nos = _nos_artefatos()
+    for no in nos:
+        construir_no(fontes, no)  # importações do Plotly fora da medida
+    armazem = Armazem(tempfile.mkdtemp(prefix='eaas-armazem-'))
+    try:
+        chaves = {no: chave_no(fontes, no) for no in nos}
+        montar, ler = [], []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            for no in nos:
+                construir_no(fontes, no)
+            montar.append((time.perf_counter() - inicio) * 1000)
+        preencher(fontes, armazem)
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            for chave in chaves.values():
+                armazem.ler(chave)
+            ler.append((time.perf_counter() - inicio) * 1000)
+        tamanho = armazem.status()['Tamanho (KB)'].sum()
+    finally:
+        armazem.limpar()
+    return {
+        'nos': len(chaves),
+        'montar_ms': round(sorted(montar)[len(montar) // 2], 1),
+        'ler_ms': round(sorted(ler)[len(ler) // 2], 1),
+        'tamanho_kb': round(float(tamanho), 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Armazém de artefatos compartilhado entre réplicas")
+    parser.add_argument('--raiz', default=None, help=f"Diretório do armazém (padrão: {DIR_ARMAZEM or 'desligado'})")
+    sub = parser.add_subparsers(dest='comando', required=True)
+    sub.add_parser('preencher', help="Grava os artefatos de todas as seções para os dados atuais")
+    sub.add_parser('status', help="Entradas, tamanho e último uso")
+    sub.add_parser('despejar', help="Aplica o limite de tamanho (LRU)")
+    sub.add_parser('limpar', help="Remove todas as entradas")
+    bench = sub.add_parser('benchmark', help="Montar do zero x ler do armazém")
+    bench.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    if args.comando == 'benchmark':
+        print(benchmark(args.repeticoes))
+        return
+    if pa is None:
+        parser.error("pyarrow é necessário para o armazém de artefatos")
+    armazem = Armazem(args.raiz)
+    if args.comando == 'preencher':
+        for no, chave in preencher(armazem=armazem).items():
+            print(f"{no}: {chave}")
+    elif args.comando == 'status':
+        print(armazem.status().to_string(index=False))
+    elif args.comando == 'despejar':
+        print(armazem.despejar())
+    else:
+        armazem.limpar()
+
+
+if __name__ == '__main__':
+    main()
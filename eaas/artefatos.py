@@ -0,0 +1,268 @@
+"""Construção dos DataFrames e figuras Plotly exibidos no dashboard.
+
+Cada aba tem seu próprio construtor em ``SECOES`` e as páginas regionais
+usam um único construtor guiado pelo cadastro de ``eaas.regioes``, de modo
+que apenas a seção (ou região) ativa precisa ser montada. ``plotly.graph_objects`` e
+``plotly.express`` são importados dentro das funções que desenham, só
+quando o primeiro gráfico é de fato construído. As tabelas que podem ficar
+grandes saem também como ``TabelaIndexada`` (chaves ``tab_*``), com os
+índices de ordenação prontos para a paginação no servidor (eaas.tabela).
+"""
+import pandas as pd
+
+from eaas.concentracao import kpi_com_hhi
+from eaas.dimensionamento import COL_RECEITA, com_receita
+from eaas.perfil import instrumentado
+from eaas.precos import com_faixa
+from eaas.regioes import CADASTRO, tabelas_regiao
+from eaas.tabela import TabelaIndexada
+
+CORES_SEGMENTOS = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#F7DC6F']
+
+
+@instrumentado('figura')
+def _barra_regional(df, coluna, cor):
+    import plotly.graph_objects as go
+    fig = go.Figure(data=[
+        go.Bar(x=df['Região'], y=df[coluna], marker_color=cor)
+    ])
+    fig.update_layout(height=300, showlegend=False)
+    return fig
+
+
+@instrumentado('figura')
+def _barra_segmento(df, coluna, cor, titulo=None):
+    import plotly.express as px
+    fig = px.bar(df, x='Segmento', y=coluna, color_discrete_sequence=[cor], title=titulo)
+    if titulo:
+        fig.update_layout(height=400, xaxis_tickangle=-45)
+    return fig
+
+
+@instrumentado('figura')
+def _pizza_segmento(df, titulo=None):
+    import plotly.express as px
+    fig = px.pie(
+        df,
+        labels='Segmento',
+        values='Qtd. Estimada',
+        color_discrete_sequence=CORES_SEGMENTOS[:len(df)],
+        title=titulo
+    )
+    if titulo:
+        fig.update_layout(height=400)
+    return fig
+
+
+def _concorrentes(df, coluna_preco):
+    """Concorrentes com faixa de preço numérica, do mais caro para o mais barato."""
+    df = com_faixa(df, coluna_preco, 'Preço', ' (R$)')
+    return df.sort_values('Preço Médio (R$)', ascending=False, ignore_index=True)
+
+
+@instrumentado('figura')
+def _faixa_precos(df, coluna_nome):
+    import plotly.graph_objects as go
+    # Barras flutuantes de Mín a Máx com o ponto médio marcado
+    ordem = df.sort_values('Preço Médio (R$)')
+    fig = go.Figure([
+        go.Bar(
+            y=ordem[coluna_nome],
+            x=ordem['Preço Máx (R$)'] - ordem['Preço Mín (R$)'],
+            base=ordem['Preço Mín (R$)'],
+            orientation='h',
+            marker_color='#4ECDC4',
+            name='Faixa',
+        ),
+        go.Scatter(
+            y=ordem[coluna_nome],
+            x=ordem['Preço Médio (R$)'],
+            mode='markers',
+            marker=dict(color='#FF6B6B', size=9),
+            name='Médio',
+        ),
+    ])
+    fig.update_layout(height=max(300, 40 * len(ordem)), showlegend=False, xaxis_title='R$/mês')
+    return fig
+
+
+@instrumentado('figura')
+def figura_bandas(bandas):
+    """Leque de percentis (P5–P95, P25–P75 e mediana) da receita mês a mês."""
+    import plotly.graph_objects as go
+    fig = go.Figure()
+    for inferior, superior, opacidade, nome in (('P5', 'P95', 0.2, 'P5–P95'), ('P25', 'P75', 0.4, 'P25–P75')):
+        fig.add_trace(go.Scatter(x=bandas['Mês'], y=bandas[superior], mode='lines',
+                                 line=dict(width=0), showlegend=False, hoverinfo='skip'))
+        fig.add_trace(go.Scatter(x=bandas['Mês'], y=bandas[inferior], mode='lines',
+                                 line=dict(width=0), fill='tonexty', name=nome,
+                                 fillcolor=f'rgba(78, 205, 196, {opacidade})'))
+    fig.add_trace(go.Scatter(x=bandas['Mês'], y=bandas['P50'], mode='lines',
+                             line=dict(color='#FF6B6B', width=2), name='Mediana'))
+    fig.update_layout(height=400, xaxis_title='Mês', yaxis_title='Receita Mensal (R$)')
+    return fig
+
+
+@instrumentado('figura')
+def figura_projecao(longo):
+    """Linhas WebGL (Scattergl) do mercado projetado, uma por série do formato longo de eaas.projecao."""
+    import plotly.graph_objects as go
+    fig = go.Figure()
+    for serie, pontos in longo.groupby('Série', sort=False):
+        fig.add_trace(go.Scattergl(x=pontos['Ano'], y=pontos['Valor'] / 1e6, mode='lines', name=str(serie)))
+    fig.update_layout(height=400, xaxis_title='Ano', yaxis_title='Mercado (R$ mi)', hovermode='x unified')
+    return fig
+
+
+@instrumentado('figura')
+def figura_mapa(geojson, valores, metrica):
+    """Coroplético de ``valores`` (indexados pelo ``id`` das feições de ``geojson``), sem mapa de fundo."""
+    import plotly.graph_objects as go
+    fig = go.Figure(go.Choropleth(
+        geojson=geojson, locations=valores.index, z=valores.to_numpy(), featureidkey='id',
+        colorscale='Teal', marker_line_width=0.3, marker_line_color='white',
+        colorbar=dict(title=dict(text=metrica)),
+        hovertemplate='%{location}<br>%{z:,.1f}<extra></extra>',
+    ))
+    fig.update_geos(fitbounds='locations', visible=False)
+    fig.update_layout(height=550, margin=dict(l=0, r=0, t=0, b=0))
+    return fig
+
+
+def _resumo(fontes):
+    df_mercado = pd.DataFrame(fontes['mercado'])
+    return {
+        'df_mercado': df_mercado,
+        'fig_mercado': _barra_regional(df_mercado, 'Mercado (R$ mi)', 'indianred'),
+        'fig_empresas': _barra_regional(df_mercado, 'Empresas Alvo', 'lightsalmon'),
+        'fig_penetracao': _barra_regional(df_mercado, 'Taxa Penetração', 'lightseagreen'),
+        'fig_ticket': _barra_regional(df_mercado, 'Ticket Médio (R$)', 'khaki'),
+    }
+
+
+# Gráficos de segmentação da página regional: (título, chave em artefatos_regiao)
+GRAFICOS_REGIAO = [
+    ("Distribuição de Clientes por Segmento", 'fig_distribuicao'),
+    ("Ticket Médio por Segmento (R$)", 'fig_ticket'),
+    ("Receita Mensal Potencial por Segmento (R$)", 'fig_receita'),
+    ("Investimento Anual em EaaS (R$)", 'fig_investimento'),
+]
+
+
+def segmentacao_regiao(df_segmentacao, maiores=None):
+    """Tabela e gráficos de segmentação; ``maiores`` limita aos N segmentos de maior receita."""
+    if maiores is not None and maiores < len(df_segmentacao):
+        # Mantém a ordem original das linhas escolhidas
+        escolhidos = df_segmentacao[COL_RECEITA].nlargest(maiores).index.sort_values()
+        df_segmentacao = df_segmentacao.loc[escolhidos].reset_index(drop=True)
+    art = {
+        'df_segmentacao': df_segmentacao,
+        'fig_distribuicao': _pizza_segmento(df_segmentacao, "Clientes por Segmento"),
+        'fig_ticket': _barra_segmento(df_segmentacao, 'Ticket Médio (R$)', '#FF6B6B', "Ticket Médio"),
+        'fig_receita': _barra_segmento(df_segmentacao, COL_RECEITA, '#4ECDC4', "Receita Mensal"),
+    }
+    if 'Inv. Anual EaaS' in df_segmentacao.columns:
+        art['fig_investimento'] = _barra_segmento(df_segmentacao, 'Inv. Anual EaaS', '#45B7D1', "Investimento Anual")
+    return art
+
+
+def _parte_concorrentes(df, cadastro):
+    df_concorrentes = _concorrentes(df, cadastro['col_preco'])
+    if cadastro['col_participacao']:
+        df_concorrentes = com_faixa(df_concorrentes, cadastro['col_participacao'], 'Clientes')
+    return {
+        'df_concorrentes': df_concorrentes,
+        'tab_concorrentes': TabelaIndexada(df_concorrentes),
+        'fig_precos': _faixa_precos(df_concorrentes, cadastro['col_empresa']),
+    }
+
+
+# Partes da página regional: campo do cadastro com a tabela de origem -> função(tabela, cadastro)
+PARTES_REGIAO = {
+    'concorrentes': _parte_concorrentes,
+    'segmentacao': lambda df, cadastro: segmentacao_regiao(com_receita(df)),
+    'cidades': lambda df, cadastro: {'df_cidades': df},
+    'swot': lambda df, cadastro: {'swot': df},
+}
+
+
+def _comparativo(fontes):
+    import plotly.express as px
+    df_mercado = pd.DataFrame(fontes['mercado'])
+    return {
+        'df_mercado': df_mercado,
+        'fig_empresas_comp': px.bar(df_mercado, x='Região', y='Empresas Alvo',
+                                    color_discrete_sequence=['#FF6B6B']),
+        'fig_mercado_comp': px.bar(df_mercado, x='Região', y='Mercado (R$ mi)',
+                                   color_discrete_sequence=['#4ECDC4']),
+    }
+
+
+def _gaps(fontes):
+    df_gaps = pd.DataFrame(fontes['gaps_oportunidades'])
+    return {'df_gaps': df_gaps, 'tab_gaps': TabelaIndexada(df_gaps)}
+
+
+# Partes da análise consolidada: nome -> (tabelas de origem, construtor)
+PARTES_CONSOLIDADA = {
+    'comparativo': (['mercado'], _comparativo),
+    'kpi': (['kpi', *(c['concorrentes'] for c in CADASTRO.values() if c['col_participacao'])],
+            lambda fontes: {'df_kpi': kpi_com_hhi(fontes)}),
+    'recomendacoes': (['recomendacoes'], lambda fontes: {'df_recomendacoes': pd.DataFrame(fontes['recomendacoes'])}),
+    'gaps': (['gaps_oportunidades'], _gaps),
+}
+
+
+def partes(secao):
+    """Partes independentes de ``secao``; cada uma lê poucas tabelas e pode ser
+    reconstruída sozinha quando só elas mudam (eaas.grafo). Vazio: a seção é uma peça só."""
+    if secao in CADASTRO:
+        return [parte for parte in PARTES_REGIAO if CADASTRO[secao][parte]]
+    return list(PARTES_CONSOLIDADA) if secao == 'consolidada' else []
+
+
+def tabelas_parte(secao, parte):
+    if secao in CADASTRO:
+        return [CADASTRO[secao][parte]]
+    return PARTES_CONSOLIDADA[parte][0]
+
+
+def construir_parte(fontes, secao, parte):
+    if secao in CADASTRO:
+        cadastro = CADASTRO[secao]
+        return PARTES_REGIAO[parte](fontes[cadastro[parte]], cadastro)
+    return PARTES_CONSOLIDADA[parte][1](fontes)
+
+
+def _por_partes(fontes, secao):
+    art = {}
+    for parte in partes(secao):
+        art.update(construir_parte(fontes, secao, parte))
+    return art
+
+
+def artefatos_regiao(fontes, regiao):
+    """Tabelas e figuras da página de ``regiao`` conforme o cadastro (eaas.regioes)."""
+    return _por_partes(fontes, regiao)
+
+
+SECOES = {
+    'resumo': _resumo,
+    'consolidada': lambda fontes: _por_partes(fontes, 'consolidada'),
+}
+
+# Tabelas de origem lidas por cada seção e região (usado para reconstruir só o que mudou)
+DEPENDENCIAS = {
+    'resumo': ['mercado'],
+    'consolidada': [tabela for tabelas, _ in PARTES_CONSOLIDADA.values() for tabela in tabelas],
+    **{regiao: tabelas_regiao(regiao) for regiao in CADASTRO},
+}
+
+
+def construir_artefatos(fontes, secao=None):
+    """Monta os artefatos de uma seção ou região (ou de todas, por nome, se ``secao`` for None)."""
+    if secao is None:
+        return {nome: construir_artefatos(fontes, nome) for nome in [*SECOES, *CADASTRO]}
+    if secao in SECOES:
+        return SECOES[secao](fontes)
+    return artefatos_regiao(fontes, secao)
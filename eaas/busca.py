@@ -0,0 +1,292 @@
+"""Busca por concorrentes em todas as regiões com índice invertido em memória.
+
+As tabelas de concorrentes do cadastro (eaas.regioes) viram um catálogo
+único: empresa, região, descrição (serviço, especialidade, região base,
+estratégia...) e faixa de preço. Os textos são normalizados (sem acentos,
+minúsculas, milhar sem ponto) e quebrados em termos; o índice guarda o
+vocabulário ordenado e as listas de documentos de cada termo em arrays
+contíguos (CSR), com o peso do campo em que o termo aparece.
+
+Como o vocabulário é ordenado, todos os termos com um prefixo ocupam uma
+faixa contígua de ids e as suas listas são uma única fatia dos arrays:
+uma busca por prefixo é um ``searchsorted`` e uma fatia, sem varrer o
+catálogo. Termos com erro de digitação são encontrados por trigramas do
+vocabulário e confirmados pela distância de edição até um prefixo do
+termo. Um número na consulta também casa com as faixas de preço que o
+contêm. Vários termos são combinados com E e o resultado é ordenado pela
+soma dos pesos::
+
+    python -m eaas.busca "consultoria financ"
+    python -m eaas.busca benchmark --empresas 100000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from eaas.precos import faixas
+from eaas.regioes import CADASTRO
+
+# Peso de cada campo do catálogo no score
+PESOS_CAMPOS = {'Empresa': 3.0, 'Descrição': 2.0, 'Região': 1.0, 'Faixa de Preço': 1.0}
+
+# Fator do score por tipo de casamento do termo
+EXATO, PREFIXO, APROXIMADO = 1.0, 0.8, 0.5
+
+LIMITE = 20
+
+# Termos mais curtos que isso não são buscados com erro de digitação
+MIN_APROXIMADO = 4
+
+# Termos do vocabulário conferidos pela distância de edição por termo da consulta
+MAX_CANDIDATOS = 200
+
+
+def _normalizar(textos):
+    """Minúsculas sem acentos e com o ponto de milhar removido ('R$ 2.500' -> 'r$ 2500')."""
+    return (pd.Series(textos, dtype=object).fillna('').astype(str)
+            .str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii').str.lower()
+            .str.replace(r'(?<=\d)\.(?=\d{3})', '', regex=True))
+
+
+def _termos(textos):
+    return _normalizar(textos).str.findall(r'[a-z0-9]+')
+
+
+def termos_consulta(consulta):
+    return _termos([consulta]).iloc[0]
+
+
+def catalogo(fontes):
+    """Uma linha por empresa de cada região, com as colunas comuns."""
+    partes = []
+    for regiao, c in CADASTRO.items():
+        df = fontes[c['concorrentes']]
+        descritivas = [col for col in df.columns
+                       if col not in (c['col_empresa'], c['col_preco'], c['col_participacao'])]
+        precos = faixas(df[c['col_preco']])
+        partes.append(pd.DataFrame({
+            'Empresa': df[c['col_empresa']].astype(str).to_numpy(),
+            'Região': regiao,
+            'Descrição': df[descritivas].astype(str).agg(' · '.join, axis=1).to_numpy(),
+            'Faixa de Preço': df[c['col_preco']].astype(str).to_numpy(),
+            'Preço Mín (R$)': precos['Mín'].to_numpy(),
+            'Preço Máx (R$)': precos['Máx'].to_numpy(),
+        }))
+    return pd.concat(partes, ignore_index=True)
+
+
+def _distancia_prefixo(consulta, termo, limite):
+    """Menor distância de edição entre ``consulta`` e um prefixo de ``termo`` (limite + 1 se passar)."""
+    termo = termo[:len(consulta) + limite]
+    linha = list(range(len(termo) + 1))
+    for i, letra in enumerate(consulta, 1):
+        anterior, linha = linha, [i]
+        for j, outra in enumerate(termo, 1):
+            linha.append(min(anterior[j] + 1, linha[j - 1] + 1, anterior[j - 1] + (letra != outra)))
+        if min(linha) > limite:
+            return limite + 1
+    return min(linha)
+
+
+def _trigramas(termo):
+    termo = f'^{termo}'
+    return {termo[i:i + 3] for i in range(max(len(termo) - 2, 1))}
+
+
+def _maximo_por_documento(docs, scores):
+    """Documentos únicos com o maior score de cada um."""
+    if len(docs) == 0:
+        return docs, scores
+    ordem = np.lexsort((-scores, docs))
+    docs, scores = docs[ordem], scores[ordem]
+    primeiro = np.r_[True, docs[1:] != docs[:-1]]
+    return docs[primeiro], scores[primeiro]
+
+
+class IndiceBusca:
+    """Índice invertido do catálogo; ``consultar`` não percorre o DataFrame."""
+
+    def __init__(self, tabela):
+        self.tabela = tabela.reset_index(drop=True)
+        self.minimo = self.tabela['Preço Mín (R$)'].to_numpy(np.float64)
+        self.maximo = self.tabela['Preço Máx (R$)'].to_numpy(np.float64)
+
+        pares = []
+        for campo, peso in PESOS_CAMPOS.items():
+            termos = _termos(self.tabela[campo].to_numpy()).explode().dropna()
+            pares.append(pd.DataFrame({'termo': termos.to_numpy(), 'doc': termos.index.to_numpy(np.int64),
+                                       'peso': peso}))
+        pares = pd.concat(pares, ignore_index=True)
+        ids, vocabulario = pd.factorize(pares['termo'], sort=True)
+        pares = pd.DataFrame({'id': ids, 'doc': pares['doc'].to_numpy(), 'peso': pares['peso'].to_numpy()})
+        # Um par (termo, documento) com o maior peso entre os campos, ordenado por termo
+        pares = pares.sort_values(['id', 'doc', 'peso'], ascending=[True, True, False])
+        pares = pares.drop_duplicates(['id', 'doc'])
+        self.vocabulario = np.asarray(vocabulario, dtype=str)
+        self.docs = pares['doc'].to_numpy(np.int64)
+        self.pesos = pares['peso'].to_numpy(np.float64)
+        self.inicio = np.searchsorted(pares['id'].to_numpy(), np.arange(len(self.vocabulario) + 1))
+
+        # Trigramas do vocabulário -> ids de termos (CSR), para os erros de digitação
+        gramas = pd.Series([sorted(_trigramas(t)) for t in self.vocabulario]).explode()
+        ids_gramas, self._gramas = pd.factorize(gramas.to_numpy(), sort=True)
+        ordem = np.argsort(ids_gramas, kind='stable')
+        self._gramas = np.asarray(self._gramas, dtype=str)
+        self._termos_grama = gramas.index.to_numpy(np.int64)[ordem]
+        self._inicio_grama = np.searchsorted(ids_gramas[ordem], np.arange(len(self._gramas) + 1))
+
+    def __len__(self):
+        return len(self.tabela)
+
+    def _fatia(self, primeiro, ultimo):
+        fatia = slice(self.inicio[primeiro], self.inicio[ultimo])
+        return self.docs[fatia], self.pesos[fatia]
+
+    def _faixa_prefixo(self, termo):
+        return (int(np.searchsorted(self.vocabulario, termo, 'left')),
+                int(np.searchsorted(self.vocabulario, termo + '\uffff', 'left')))
+
+    def aproximados(self, termo, limite=None):
+        """Ids dos termos do vocabulário com um prefixo a até ``limite`` edições de ``termo``."""
+        limite = limite if limite is not None else (1 if len(termo) <= 7 else 2)
+        gramas = list(_trigramas(termo))
+        posicoes = np.searchsorted(self._gramas, gramas)
+        listas = [self._termos_grama[self._inicio_grama[p]:self._inicio_grama[p + 1]]
+                  for p, g in zip(posicoes, gramas) if p < len(self._gramas) and self._gramas[p] == g]
+        if not listas:
+            return np.empty(0, np.int64)
+        candidatos, contagem = np.unique(np.concatenate(listas), return_counts=True)
+        # Cada edição destrói no máximo 3 trigramas; confere só os que mais compartilham
+        filtro = contagem >= max(1, len(gramas) - 3 * limite)
+        candidatos, contagem = candidatos[filtro], contagem[filtro]
+        candidatos = candidatos[np.argsort(-contagem, kind='stable')[:MAX_CANDIDATOS]]
+        return np.array([c for c in candidatos
+                         if _distancia_prefixo(termo, self.vocabulario[c], limite) <= limite], dtype=np.int64)
+
+    def _documentos(self, termo):
+        """Documentos que casam com ``termo`` e o score de cada um."""
+        docs, scores = [], []
+        primeiro, ultimo = self._faixa_prefixo(termo)
+        if primeiro < ultimo:
+            d, p = self._fatia(primeiro, ultimo)
+            exato = self.vocabulario[primeiro] == termo
+            fator = np.full(len(d), PREFIXO)
+            if exato:
+                fator[:self.inicio[primeiro + 1] - self.inicio[primeiro]] = EXATO
+            docs.append(d)
+            scores.append(p * fator)
+        elif len(termo) >= MIN_APROXIMADO:
+            for id_termo in self.aproximados(termo):
+                d, p = self._fatia(id_termo, id_termo + 1)
+                docs.append(d)
+                scores.append(p * APROXIMADO)
+        if termo.isdigit():
+            # Número: faixas de preço que o contêm
+            valor = float(termo)
+            d = np.flatnonzero((self.minimo <= valor) & (valor <= self.maximo))
+            docs.append(d)
+            scores.append(np.full(len(d), PESOS_CAMPOS['Faixa de Preço']))
+        if not docs:
+            return np.empty(0, np.int64), np.empty(0)
+        return _maximo_por_documento(np.concatenate(docs), np.concatenate(scores))
+
+    def consultar(self, consulta, limite=LIMITE, preco_max=None):
+        """As ``limite`` empresas de maior score para ``consulta`` (todos os termos precisam casar)."""
+        termos = termos_consulta(consulta)
+        if not termos:
+            return self.tabela.iloc[:0].assign(Score=[])
+        docs, scores = None, None
+        # Começa pelo termo mais seletivo: as interseções seguintes ficam pequenas
+        for d, s in sorted((self._documentos(t) for t in termos), key=lambda par: len(par[0])):
+            if docs is None:
+                docs, scores = d, s
+            else:
+                docs, i, j = np.intersect1d(docs, d, assume_unique=True, return_indices=True)
+                scores = scores[i] + s[j]
+            if len(docs) == 0:
+                break
+        if preco_max is not None:
+            dentro = self.minimo[docs] <= preco_max
+            docs, scores = docs[dentro], scores[dentro]
+        k = min(limite, len(docs))
+        if k == 0:
+            return self.tabela.iloc[:0].assign(Score=[])
+        escolhidos = np.argpartition(-scores, k - 1)[:k]
+        escolhidos = escolhidos[np.lexsort((docs[escolhidos], -scores[escolhidos]))]
+        resultado = self.tabela.iloc[docs[escolhidos]].reset_index(drop=True)
+        resultado.insert(0, 'Score', scores[escolhidos].round(2))
+        return resultado
+
+
+def construir_indice(fontes):
+    return IndiceBusca(catalogo(fontes))
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+SILABAS = ['ca', 'con', 'sul', 'fin', 'tec', 'bra', 'ges', 'tão', 'lu', 'mar', 'ri', 'no', 'ção', 'vi', 'pa']
+DESCRICOES = ['Análise econômica', 'BPO Financeiro', 'Planejamento PME', 'Fluxo Caixa SaaS', 'Gestão Completa',
+              'Consultoria Tributária', 'Valuation', 'Inteligência de Mercado']
+
+
+def catalogo_sintetico(empresas=100_000, semente=0):
+    rng = np.random.default_rng(semente)
+    nomes = [''.join(rng.choice(SILABAS, rng.integers(2, 5))).capitalize() for _ in range(empresas // 4 + 1)]
+    minimo = rng.integers(10, 60, empresas) * 100
+    return pd.DataFrame({
+        'Empresa': [f"{nomes[i % len(nomes)]} {sufixo}" for i, sufixo in
+                    enumerate(rng.choice(['Consultoria', 'Finance', 'Gestão', 'Análise', 'Partners'], empresas))],
+        'Região': rng.choice(list(CADASTRO), empresas),
+        'Descrição': rng.choice(DESCRICOES, empresas),
+        'Faixa de Preço': [f"{a:,}-{a * 2:,}".replace(',', '.') for a in minimo],
+        'Preço Mín (R$)': minimo.astype(np.float64),
+        'Preço Máx (R$)': minimo * 2.0,
+    })
+
+
+def benchmark(empresas=100_000, repeticoes=50):
+    """Montagem do índice e latência (mediana, ms) por tipo de consulta, contra a varredura com pandas."""
+    tabela = catalogo_sintetico(empresas)
+    inicio = time.perf_counter()
+    indice = IndiceBusca(tabela)
+    resultado = {'empresas': empresas, 'vocabulario': len(indice.vocabulario),
+                 'montagem_ms': round((time.perf_counter() - inicio) * 1000, 1)}
+    consultas = {'prefixo': 'consul', 'erro_digitacao': 'finence', 'varios_termos': 'gestao fluxo cai',
+                 'preco': 'bpo 3000', 'prefixo_curto': 'c'}
+    for nome, consulta in consultas.items():
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            achados = indice.consultar(consulta)
+            tempos.append((time.perf_counter() - inicio) * 1000)
+        resultado[nome] = {'ms': round(float(np.median(tempos)), 2), 'resultados': len(achados)}
+    # Referência: varrer o texto normalizado a cada tecla (sem erro de digitação)
+    inicio = time.perf_counter()
+    texto = _normalizar(tabela['Empresa'] + ' ' + tabela['Descrição'])
+    texto.str.contains('consul', regex=False)
+    resultado['varredura_pandas_ms'] = round((time.perf_counter() - inicio) * 1000, 1)
+    return resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Busca por concorrentes de todas as regiões")
+    parser.add_argument('consulta', nargs='?', default=None, help="Texto buscado, ou 'benchmark'")
+    parser.add_argument('--limite', type=int, default=LIMITE)
+    parser.add_argument('--empresas', type=int, default=100_000, help="Empresas sintéticas (benchmark)")
+    args = parser.parse_args(argv)
+
+    if args.consulta == 'benchmark':
+        print(benchmark(args.empresas))
+        return
+    from eaas.dados import carregar_fontes
+
+    indice = construir_indice(carregar_fontes())
+    print(indice.consultar(args.consulta or '', args.limite).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,352 @@
+"""Cache de DataFrames e figuras compartilhado entre reruns e sessões.
+
+As tabelas de origem e os artefatos derivados são construídos uma única
+vez por versão dos dados e ficam em ``st.cache_resource``, que é global ao
+processo do servidor. O número de entradas mantidas é limitado e as mais
+antigas são descartadas.
+
+A versão usada como chave é a do nó (eaas.grafo.NOS): o hash só das tabelas
+de que ele depende. Editar uma tabela muda a versão apenas dos nós abaixo
+dela; os demais continuam no cache. O grafo confere os arquivos de
+``data/`` (a cada rerun ou, com ``EAAS_OBSERVAR_S``, numa thread), relê só o
+que mudou e reconstrói os nós afetados.
+
+Abaixo desse cache em memória, os artefatos passam pelo armazém em disco
+(eaas.armazem), compartilhado entre réplicas: uma réplica nova lê o que
+outra já montou em vez de montar de novo.
+"""
+import functools
+import threading
+
+import streamlit as st
+
+from eaas.agregacao import arquivo_cubo, carregar_cubo
+from eaas.armazem import armazem_padrao, chave_no
+from eaas.artefatos import SECOES, figura_mapa, figura_projecao, segmentacao_regiao
+from eaas.busca import LIMITE, construir_indice
+from eaas.cenarios import REGIOES, Simulador, bandas_receita, parametros_regionais, sortear_base
+from eaas.concentracao import MonitorConcentracao, participacoes_regionais
+from eaas.dados import Fontes, versao_dados
+from eaas.dimensionamento import calcular_indicadores
+from eaas.elasticidade import construir_curvas
+from eaas.exportacao import Exportador
+from eaas.grafo import NOS, Grafo, construir_no, nos_artefatos
+from eaas.ingestao import INTERVALO_H, UF_PADRAO, agendar, arquivo_municipios, carregar
+from eaas.mapa import arquivo_camada, camada_regiao, carregar_camada, escolher_resolucao, valores
+from eaas.oportunidade import construir_motor
+from eaas.projecao import projetar_fontes, reduzir
+from eaas.regioes import CADASTRO
+
+# Quantidade máxima de versões de dados mantidas em memória
+MAX_VERSOES = 4
+
+
+def _versao(fontes, no, versao=None):
+    # Com Fontes, a versão é só a das tabelas do nó; senão, a versão informada (ou a de tudo)
+    if isinstance(fontes, Fontes):
+        return fontes.versao(NOS[no])
+    return versao_dados(fontes) if versao is None else versao
+
+
+@st.cache_resource(max_entries=MAX_VERSOES, show_spinner=False)
+def _grafo(diretorio):
+    grafo = Grafo(diretorio, RECALCULO)
+    grafo.observar()
+    return grafo
+
+
+def obter_grafo(diretorio=None):
+    """Grafo de recomputação (eaas.grafo) das tabelas de ``diretorio``, um por processo."""
+    return _grafo(diretorio)
+
+
+def obter_fontes(diretorio=None):
+    """Retorna ``(fontes, versao)``; só as tabelas cujos arquivos mudaram são relidas."""
+    grafo = _grafo(diretorio)
+    if not grafo.observando:
+        # Com EAAS_OBSERVAR_S, só a thread do grafo confere os arquivos e recalcula
+        grafo.verificar()
+    return grafo.fontes, grafo.fontes.versao()
+
+
+def _armazenado(fontes, no, construir, *extras):
+    # Réplicas com os mesmos dados e código compartilham o resultado pelo armazém em disco
+    armazem = armazem_padrao()
+    if armazem is None:
+        return construir()
+    return armazem.obter(chave_no(fontes, no, *extras), construir)
+
+
+@st.cache_resource(max_entries=MAX_VERSOES * len(NOS), show_spinner=False)
+def _artefatos_por_versao(versao, no, _fontes):
+    return _armazenado(_fontes, no, lambda: construir_no(_fontes, no))
+
+
+def obter_artefatos(fontes, secao=None, versao=None):
+    """Retorna os artefatos de uma seção ou região na versão atual das fontes, construindo se preciso.
+
+    Seções divididas em partes juntam os artefatos de cada parte, cada uma
+    em cache pela versão das suas tabelas.
+    """
+    if secao is None:
+        return {nome: obter_artefatos(fontes, nome, versao) for nome in [*SECOES, *CADASTRO]}
+    nos = nos_artefatos(secao)
+    if len(nos) == 1:
+        return _artefatos_por_versao(_versao(fontes, nos[0], versao), nos[0], fontes)
+    artefatos = {}
+    for no in nos:
+        artefatos.update(_artefatos_por_versao(_versao(fontes, no, versao), no, fontes))
+    return artefatos
+
+
+@st.cache_resource(max_entries=MAX_VERSOES * len(CADASTRO) * 8, show_spinner=False)
+def _segmentacao_por_versao(versao, regiao, maiores, _fontes):
+    no = f'artefatos:{regiao}:segmentacao'
+    return _armazenado(_fontes, no, lambda: segmentacao_regiao(
+        _artefatos_por_versao(versao, no, _fontes)['df_segmentacao'], maiores), f'maiores={maiores}')
+
+
+def obter_segmentacao(fontes, regiao, versao, maiores=None):
+    """Tabela e gráficos de segmentação de ``regiao`` com os N segmentos de maior receita."""
+    art = obter_artefatos(fontes, regiao, versao)
+    if maiores is None or maiores >= len(art['df_segmentacao']):
+        return art
+    return _segmentacao_por_versao(_versao(fontes, f'artefatos:{regiao}:segmentacao', versao),
+                                   regiao, maiores, fontes)
+
+
+@st.cache_resource(show_spinner=False)
+def _monitor_concentracao():
+    return MonitorConcentracao(), threading.Lock()
+
+
+@st.cache_resource(max_entries=MAX_VERSOES, show_spinner=False)
+def _concentracao_por_versao(versao, _fontes):
+    monitor, trava = _monitor_concentracao()
+    with trava:
+        # Só as empresas alteradas desde a versão anterior são reaplicadas
+        monitor.sincronizar(participacoes_regionais(_fontes))
+        return monitor.tabela()
+
+
+def obter_concentracao(fontes, versao=None):
+    """HHI/CR4 por região (eaas.concentracao), atualizados de forma incremental entre versões."""
+    return _concentracao_por_versao(_versao(fontes, 'concentracao', versao), fontes)
+
+
+@st.cache_resource(max_entries=MAX_VERSOES, show_spinner=False)
+def _indicadores_por_versao(versao, _fontes):
+    return calcular_indicadores(_fontes, concentracao=obter_concentracao(_fontes, versao))
+
+
+def obter_indicadores(fontes, versao=None):
+    """Métricas derivadas (eaas.dimensionamento) da versão atual das fontes."""
+    return _indicadores_por_versao(_versao(fontes, 'indicadores', versao), fontes)
+
+
+@st.cache_resource(max_entries=MAX_VERSOES, show_spinner=False)
+def _curvas_por_versao(versao, _fontes):
+    return construir_curvas(_fontes)
+
+
+def obter_curvas(fontes, versao=None):
+    """Curvas de demanda pré-calculadas (eaas.elasticidade) da versão atual das fontes."""
+    return _curvas_por_versao(_versao(fontes, 'curvas', versao), fontes)
+
+
+def _assinatura_cubo():
+    caminho = arquivo_cubo()
+    if caminho is None:
+        return None
+    estado = caminho.stat()
+    return str(caminho), estado.st_mtime_ns, estado.st_size
+
+
+@st.cache_resource(max_entries=MAX_VERSOES, show_spinner=False)
+def _motor_por_versao(versao, cubo, _fontes):
+    return construir_motor(_fontes, carregar_cubo() if cubo else None)
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _ranking(versao, cubo, pesos, k, _fontes):
+    return _motor_por_versao(versao, cubo, _fontes).top(k, dict(pesos))
+
+
+def obter_ranking(fontes, versao, pesos, k):
+    """Top-``k`` do score de oportunidade (eaas.oportunidade) com os ``pesos`` por dimensão.
+
+    A matriz normalizada é montada uma vez por versão dos dados e do cubo de
+    estabelecimentos; cada vetor de pesos já consultado fica em cache.
+    """
+    return _ranking(_versao(fontes, 'oportunidade', versao), _assinatura_cubo(),
+                    tuple(sorted(pesos.items())), k, fontes)
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _camada(nome, assinatura):
+    return carregar_camada(nome)
+
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _mapa(versao, cubo, regiao, metrica, resolucao, camada, _fontes):
+    nome, prefixo = camada_regiao(regiao)
+    geojson = _camada(*camada).geojson(resolucao, prefixo)
+    codigos = [feicao['id'] for feicao in geojson['features']]
+    motor = _motor_por_versao(versao, cubo, _fontes) if cubo else None
+    serie = valores(_fontes, nome, codigos, metrica, carregar_cubo() if cubo else None, motor)
+    return figura_mapa(geojson, serie, metrica)
+
+
+def obter_mapa(fontes, versao, regiao, metrica, resolucao=None):
+    """``(figura, resolução, vértices)`` do coroplético de ``regiao``, ou None sem a malha preparada.
+
+    Sem ``resolucao``, vai a mais fina que cabe no orçamento de vértices do
+    recorte (eaas.mapa.escolher_resolucao).
+    """
+    nome, prefixo = camada_regiao(regiao)
+    try:
+        info = arquivo_camada(nome).stat()
+    except OSError:
+        return None
+    camada = (nome, (info.st_size, info.st_mtime_ns))
+    malha = _camada(*camada)
+    resolucao = resolucao or escolher_resolucao(malha, prefixo)
+    figura = _mapa(_versao(fontes, 'oportunidade', versao), _assinatura_cubo(), regiao, metrica, resolucao,
+                   camada, fontes)
+    return figura, resolucao, malha.vertices(resolucao, prefixo)
+
+
+@st.cache_resource(max_entries=MAX_VERSOES * 4, show_spinner=False)
+def _cubo_projecao(versao, anos, pontos_por_ano, ajustes, choque_pp, _fontes):
+    return projetar_fontes(_fontes, anos, pontos_por_ano, dict(ajustes), choque_pp)
+
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def _projecao(versao, anos, pontos_por_ano, ajustes, choque_pp, regiao, _fontes):
+    cubo = _cubo_projecao(versao, anos, pontos_por_ano, ajustes, choque_pp, _fontes)
+    series = cubo.por_regiao() if regiao is None else cubo.por_segmento(regiao)
+    final = cubo.final()
+    if regiao is not None:
+        final = final[final['Região'] == regiao].reset_index(drop=True)
+    return figura_projecao(reduzir(series)), final
+
+
+def obter_projecao(fontes, versao, anos, pontos_por_ano=1, ajustes=None, choque_pp=0.0, regiao=None):
+    """Gráfico (já reduzido) e tabela final da projeção plurianual (eaas.projecao).
+
+    O cubo completo fica em memória por cenário; ao navegador vai só a
+    figura com as séries e pontos limitados por ``reduzir``. Com ``regiao``,
+    as séries são os segmentos dessa região; sem ela, o total de cada região.
+    """
+    ajustes = tuple(sorted((ajustes or {}).items()))
+    return _projecao(_versao(fontes, 'projecao', versao), anos, pontos_por_ano, ajustes, choque_pp, regiao, fontes)
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _base_simulacao(n, semente, processos):
+    return sortear_base(REGIOES, n, semente, processos)
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _simulador(versao, n, semente, processos, _fontes):
+    return Simulador(_base_simulacao(n, semente, processos), parametros_regionais(_fontes))
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _cenario(versao, n, semente, processos, variacao_preco, desvio_elasticidade, desvio_penetracao, _fontes):
+    simulador = _simulador(versao, n, semente, processos, _fontes)
+    resultado = simulador.percentis(variacao_preco=variacao_preco, desvio_elasticidade=desvio_elasticidade,
+                                    desvio_penetracao=desvio_penetracao)
+    return resultado, bandas_receita(resultado, simulador.parametros)
+
+
+def obter_cenario(fontes, versao, n, semente=42, processos=None, variacao_preco=0.0,
+                  desvio_elasticidade=0.15, desvio_penetracao=3.0):
+    """Percentis e bandas de receita de um cenário (eaas.cenarios).
+
+    Os sorteios padronizados são feitos uma vez por (n, semente) e o
+    ``Simulador`` da versão dos dados guarda os percentis de cada métrica
+    pelos controles de que ela depende: mover um slider só recalcula as
+    métricas afetadas, e voltar a uma posição já visitada não simula de novo.
+    """
+    return _cenario(_versao(fontes, 'cenarios', versao), n, semente, processos, variacao_preco,
+                    desvio_elasticidade, desvio_penetracao, fontes)
+
+
+@st.cache_resource(show_spinner=False)
+def _coleta_agendada(uf):
+    return agendar(INTERVALO_H, uf)
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def _municipios(uf, assinatura):
+    return carregar(uf)
+
+
+def obter_municipios(uf=UF_PADRAO):
+    """``(tabela, metadados)`` da última coleta do IBGE (eaas.ingestao), ou None.
+
+    Só lê o arquivo gravado pela coleta; a rede nunca é acessada no rerun.
+    """
+    _coleta_agendada(uf)
+    try:
+        info = arquivo_municipios(uf).stat()
+    except OSError:
+        return None
+    return _municipios(uf, (info.st_size, info.st_mtime_ns))
+
+
+@st.cache_resource(max_entries=MAX_VERSOES, show_spinner=False)
+def _indice_busca(versao, _fontes):
+    return construir_indice(_fontes)
+
+
+def obter_busca(fontes, versao, consulta, limite=LIMITE, preco_max=None):
+    """Concorrentes de todas as regiões que casam com ``consulta`` (eaas.busca).
+
+    O índice é montado uma vez por versão das tabelas de concorrentes e
+    compartilhado entre as sessões; cada consulta só lê o índice.
+    """
+    return _indice_busca(_versao(fontes, 'busca', versao), fontes).consultar(consulta, limite, preco_max)
+
+
+@st.cache_resource(show_spinner=False)
+def obter_exportador():
+    """Exportador (eaas.exportacao) compartilhado: sessões que pedem a mesma exportação reaproveitam a tarefa."""
+    return Exportador()
+
+
+def _recalcular_artefatos(fontes, no):
+    _artefatos_por_versao(_versao(fontes, no), no, fontes)
+
+
+# Nós reconstruídos pelo grafo, em segundo plano, quando uma tabela de que dependem muda
+RECALCULO = {
+    'concentracao': obter_concentracao,
+    'indicadores': obter_indicadores,
+    'curvas': obter_curvas,
+    'busca': lambda fontes: _indice_busca(_versao(fontes, 'busca'), fontes),
+    **{no: functools.partial(_recalcular_artefatos, no=no) for no in NOS if no.startswith('artefatos:')},
+}
+
+
+def invalidar_cache():
+    """Descarta todas as versões em cache (todas as sessões)."""
+    # As threads de observação terminam sozinhas quando o grafo é descartado
+    _grafo.clear()
+    _artefatos_por_versao.clear()
+    _segmentacao_por_versao.clear()
+    _monitor_concentracao.clear()
+    _concentracao_por_versao.clear()
+    _indicadores_por_versao.clear()
+    _curvas_por_versao.clear()
+    _motor_por_versao.clear()
+    _ranking.clear()
+    _cubo_projecao.clear()
+    _projecao.clear()
+    _simulador.clear()
+    _cenario.clear()
+    _municipios.clear()
+    _indice_busca.clear()
+    _camada.clear()
+    _mapa.clear()
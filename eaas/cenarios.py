@@ -0,0 +1,196 @@
+"""Simulação Monte Carlo de receita e mercado por região.
+
+Para cada região sorteia, de forma vetorizada:
+
+- ticket ~ Uniforme(faixa de 'Preço Base Recomendado');
+- clientes ~ Triangular(faixa de 'Escala Viável (Year 1)', moda no ponto médio);
+- elasticidade-preço ~ Normal(valor do KPI, desvio do cenário);
+- penetração ~ Normal(taxa do mercado, desvio do cenário), limitada a [0, 100].
+
+Uma variação de preço Δ aplica ticket × (1 + Δ) e clientes × (1 + Δ)^ε.
+Os sorteios ficam guardados como variáveis padronizadas (U(0,1) e N(0,1)),
+independentes dos parâmetros do cenário. ``Simulador`` aplica uma vez o que
+só depende das tabelas (ticket, clientes e receita sem variação de preço) e
+guarda os percentis de cada métrica pelos controles de que ela depende: o
+mercado só pelo desvio da penetração (Δ o multiplica por 1 + Δ, e os
+percentis acompanham); clientes e receita só por Δ e pelo desvio da
+elasticidade, e por nenhum dos dois quando Δ = 0. Mexer num controle só
+recalcula as métricas ligadas a ele. A geração pode ser dividida entre
+processos com sementes independentes (``SeedSequence``).
+"""
+import functools
+import threading
+
+import numpy as np
+import pandas as pd
+
+from eaas.precos import faixas
+from eaas.regioes import CADASTRO
+
+# Regiões simuladas: todas as do cadastro (eaas.regioes)
+REGIOES = list(CADASTRO)
+
+PERCENTIS = [5, 25, 50, 75, 95]
+
+N_SIMULACOES = 1_000_000
+
+# Variáveis padronizadas sorteadas por região
+VARIAVEIS = ('u_ticket', 'u_clientes', 'z_elasticidade', 'z_penetracao')
+
+
+def parametros_regionais(fontes):
+    """Faixas e valores centrais de cada região extraídos das tabelas."""
+    rec = fontes['recomendacoes'].set_index('Dimensão')
+    kpi = fontes['kpi'].set_index('Indicador')
+    mercado = fontes['mercado'].set_index('Região')
+    linhas = {}
+    for regiao in REGIOES:
+        preco = faixas(pd.Series([rec.loc['Preço Base Recomendado', regiao]])).iloc[0]
+        clientes = faixas(pd.Series([rec.loc['Escala Viável (Year 1)', regiao]])).iloc[0]
+        horizonte = faixas(pd.Series([rec.loc['Horizon Inicial', regiao]])).iloc[0]
+        linhas[regiao] = {
+            'ticket_min': preco['Mín'], 'ticket_max': preco['Máx'],
+            'clientes_min': clientes['Mín'], 'clientes_max': clientes['Máx'],
+            'horizonte_meses': horizonte['Médio'],
+            'elasticidade': kpi.loc['Elasticidade-Preço', regiao],
+            'penetracao': mercado.loc[regiao, 'Taxa Penetração'],
+            'empresas': mercado.loc[regiao, 'Empresas Alvo'],
+        }
+    return pd.DataFrame.from_dict(linhas, orient='index')
+
+
+def _sortear(n, semente):
+    rng = np.random.default_rng(semente)
+    return {
+        'u_ticket': rng.random(n, dtype=np.float32),
+        'u_clientes': rng.random(n, dtype=np.float32),
+        'z_elasticidade': rng.standard_normal(n, dtype=np.float32),
+        'z_penetracao': rng.standard_normal(n, dtype=np.float32),
+    }
+
+
+def sortear_base(regioes=REGIOES, n=N_SIMULACOES, semente=42, processos=None):
+    """Variáveis padronizadas por região; ``processos`` > 1 divide o trabalho em um pool."""
+    sementes = np.random.SeedSequence(semente).spawn(len(regioes) * max(processos or 1, 1))
+    if not processos or processos <= 1:
+        return {regiao: _sortear(n, s) for regiao, s in zip(regioes, sementes)}
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    tamanhos = [n // processos + (i < n % processos) for i in range(processos)]
+    tarefas = [(tam, sementes[r * processos + i])
+               for r in range(len(regioes)) for i, tam in enumerate(tamanhos)]
+    with ProcessPoolExecutor(max_workers=processos) as pool:
+        partes = list(pool.map(_sortear, *zip(*tarefas)))
+    base = {}
+    for r, regiao in enumerate(regioes):
+        blocos = partes[r * processos:(r + 1) * processos]
+        base[regiao] = {v: np.concatenate([b[v] for b in blocos]) for v in VARIAVEIS}
+    return base
+
+
+def _triangular(u, a, b):
+    # Inversa da CDF triangular com moda no ponto médio
+    c = (a + b) / 2
+    corte = (c - a) / (b - a) if b > a else 0.5
+    return np.where(
+        u < corte,
+        a + np.sqrt(u * (b - a) * (c - a)),
+        b - np.sqrt((1 - u) * (b - a) * (b - c)),
+    )
+
+
+class Simulador:
+    """Sorteios de todas as regiões com as partes fixas já calculadas e percentis em cache."""
+
+    def __init__(self, base, parametros):
+        self.parametros = parametros
+        self._regioes = {}
+        for regiao, sorteios in base.items():
+            # Escalares Python mantêm as amostras em float32
+            p = {chave: float(valor) for chave, valor in parametros.loc[regiao].items()}
+            ticket = p['ticket_min'] + sorteios['u_ticket'] * (p['ticket_max'] - p['ticket_min'])
+            clientes = _triangular(sorteios['u_clientes'], p['clientes_min'], p['clientes_max'])
+            self._regioes[regiao] = (p, {
+                'ticket': ticket,
+                'clientes': clientes,
+                'receita': clientes * ticket,
+                'z_elasticidade': sorteios['z_elasticidade'],
+                'z_penetracao': sorteios['z_penetracao'],
+            })
+        self._percentis = {}
+        self._trava = threading.Lock()
+
+    def _mercado(self, p, a, desvio_penetracao):
+        penetracao = np.clip(p['penetracao'] + desvio_penetracao * a['z_penetracao'], 0, 100)
+        return p['empresas'] * 12 / 100 * penetracao * a['ticket']
+
+    def _demanda(self, p, a, variacao_preco, desvio_elasticidade):
+        return np.power(1 + variacao_preco, p['elasticidade'] + desvio_elasticidade * a['z_elasticidade'])
+
+    def simular(self, regiao, variacao_preco=0.0, desvio_elasticidade=0.15, desvio_penetracao=3.0):
+        """Amostras de receita mensal, clientes e mercado anual de uma região."""
+        p, a = self._regioes[regiao]
+        demanda = self._demanda(p, a, variacao_preco, desvio_elasticidade)
+        return {
+            'Receita Mensal (R$)': a['receita'] * demanda * (1 + variacao_preco),
+            'Clientes': a['clientes'] * demanda,
+            'Mercado Anual (R$)': self._mercado(p, a, desvio_penetracao) * (1 + variacao_preco),
+        }
+
+    def _quantis(self, chave, amostras):
+        with self._trava:
+            q = self._percentis.get(chave)
+        if q is None:
+            # Fora da trava: duas sessões na mesma posição só calculam duas vezes
+            q = np.percentile(amostras(), PERCENTIS)
+            with self._trava:
+                self._percentis[chave] = q
+        return q
+
+    def percentis(self, variacao_preco=0.0, desvio_elasticidade=0.15, desvio_penetracao=3.0):
+        """Percentis P5…P95 por região e métrica (DataFrame longo)."""
+        fator = 1 + variacao_preco
+        # Sem variação de preço a demanda é 1 e o desvio da elasticidade não importa
+        demanda = (variacao_preco, desvio_elasticidade) if variacao_preco else (0.0, 0.0)
+        linhas = []
+        for regiao, (p, a) in self._regioes.items():
+            if variacao_preco:
+                fracao = functools.partial(self._demanda, p, a, variacao_preco, desvio_elasticidade)
+                receita = lambda: a['receita'] * fracao() * fator
+                clientes = lambda: a['clientes'] * fracao()
+            else:
+                receita, clientes = (lambda: a['receita']), (lambda: a['clientes'])
+            quantis = {
+                'Receita Mensal (R$)': self._quantis((regiao, 'receita', *demanda), receita),
+                'Clientes': self._quantis((regiao, 'clientes', *demanda), clientes),
+                'Mercado Anual (R$)': fator * self._quantis(
+                    (regiao, 'mercado', desvio_penetracao), lambda: self._mercado(p, a, desvio_penetracao)),
+            }
+            for metrica, q in quantis.items():
+                linhas.append({'Região': regiao, 'Métrica': metrica,
+                               **{f'P{p}': float(v) for p, v in zip(PERCENTIS, q)}})
+        return pd.DataFrame(linhas)
+
+
+def percentis(fontes, base, **cenario):
+    """Percentis P5…P95 por região e métrica (DataFrame longo)."""
+    return Simulador(base, parametros_regionais(fontes)).percentis(**cenario)
+
+
+def bandas_receita(resultado, parametros, meses=36):
+    """Faixas de receita mês a mês, com rampa linear de clientes até o horizonte.
+
+    A rampa é um fator determinístico por mês, então os percentis de cada mês
+    são os percentis finais multiplicados pelo fator.
+    """
+    receita = resultado[resultado['Métrica'] == 'Receita Mensal (R$)'].set_index('Região')
+    mes = np.arange(1, meses + 1)
+    partes = []
+    for regiao, linha in receita.iterrows():
+        rampa = np.minimum(mes / parametros.loc[regiao, 'horizonte_meses'], 1.0)
+        partes.append(pd.DataFrame({
+            'Região': regiao, 'Mês': mes,
+            **{f'P{p}': linha[f'P{p}'] * rampa for p in PERCENTIS},
+        }))
+    return pd.concat(partes, ignore_index=True)
@@ -0,0 +1,196 @@
+"""Índices de concentração de mercado (HHI, CR4) a partir das participações.
+
+As participações vêm de uma tabela longa de concorrentes (uma linha por
+região × empresa) com uma coluna de base: número de clientes ou receita.
+``indices_concentracao`` calcula tudo com groupby vetorizado para qualquer
+agrupamento regional; ``MonitorConcentracao`` mantém somas por grupo e
+atualiza o HHI em O(1) quando a linha de uma única empresa muda. O
+dashboard usa o monitor (eaas.cache.obter_concentracao): quando o grafo
+relê uma tabela de concorrentes, só as empresas alteradas são reaplicadas.
+"""
+import numpy as np
+import pandas as pd
+
+from eaas.precos import faixas
+from eaas.regioes import CADASTRO
+
+# Limiares usuais (DOJ/FTC) para classificar o HHI
+LIMIAR_MODERADO = 1500
+LIMIAR_ALTO = 2500
+
+# Tabela de concorrentes de cada região e colunas de nome e de participação
+CONCORRENTES = {
+    regiao: (c['concorrentes'], c['col_empresa'], c['col_participacao'])
+    for regiao, c in CADASTRO.items()
+}
+
+# Regiões sem coluna de participação: o HHI exibido é o valor de referência do kpi.csv
+REGIOES_HHI_REFERENCIA = [regiao for regiao, (_, _, coluna) in CONCORRENTES.items() if coluna is None]
+
+
+def classificar_hhi(hhi):
+    """Rótulo textual do nível de concentração."""
+    if hhi > LIMIAR_ALTO:
+        return "Altamente concentrado"
+    if hhi >= LIMIAR_MODERADO:
+        return "Moderadamente concentrado"
+    return "Fragmentado - múltiplos nichos"
+
+
+def rotulo_hhi(regiao):
+    """'HHI' quando calculado dos concorrentes, 'HHI (referência)' quando vem do kpi.csv."""
+    return 'HHI (referência)' if regiao in REGIOES_HHI_REFERENCIA else 'HHI'
+
+
+def nota_hhi():
+    """Frase que identifica as regiões com HHI de referência (vazia se todas são calculadas)."""
+    if not REGIOES_HHI_REFERENCIA:
+        return ''
+    return (f"HHI de {', '.join(REGIOES_HHI_REFERENCIA)}: valor de referência do kpi.csv "
+            "(sem clientes por concorrente para calcular).")
+
+
+def indices_concentracao(df, grupo='Região', valor='Clientes'):
+    """Um registro por grupo com N, HHI, CR4, número equivalente e participação do líder."""
+    base = pd.DataFrame({
+        'grupo': df[grupo].to_numpy(),
+        'valor': df[valor].to_numpy(np.float64),
+    })
+    base = base[base['valor'] > 0]
+    total = base.groupby('grupo', sort=False)['valor'].transform('sum')
+    base['participacao'] = base['valor'] / total
+    base['quadrado'] = base['participacao'] ** 2
+
+    # CR4: soma das quatro maiores participações de cada grupo
+    ordenado = base.sort_values(['grupo', 'participacao'], ascending=[True, False])
+    cr4 = ordenado.groupby('grupo', sort=False).head(4).groupby('grupo')['participacao'].sum()
+
+    g = base.groupby('grupo', sort=False)
+    resultado = pd.DataFrame({
+        'Empresas': g.size(),
+        'HHI': g['quadrado'].sum() * 10_000,
+        'CR4 (%)': cr4 * 100,
+        'Líder (%)': g['participacao'].max() * 100,
+    })
+    resultado['Nº Equivalente'] = 10_000 / resultado['HHI']
+    resultado.index.name = grupo
+    return resultado
+
+
+def participacoes_regionais(fontes):
+    """Tabela longa Região × Empresa com a base de participação (clientes).
+
+    Regiões cuja tabela não tem coluna de participação ficam de fora.
+    """
+    partes = []
+    for regiao, (tabela, col_nome, col_valor) in CONCORRENTES.items():
+        if col_valor is None:
+            continue
+        df = fontes[tabela]
+        partes.append(pd.DataFrame({
+            'Região': regiao,
+            'Empresa': df[col_nome].to_numpy(),
+            'Clientes': faixas(df[col_valor])['Médio'].to_numpy(),
+        }))
+    if not partes:
+        return pd.DataFrame(columns=['Região', 'Empresa', 'Clientes'])
+    return pd.concat(partes, ignore_index=True)
+
+
+def kpi_com_hhi(fontes, indices=None):
+    """Cópia de ``kpi`` com a linha 'HHI Index' trocada pelos valores calculados."""
+    if indices is None:
+        indices = indices_concentracao(participacoes_regionais(fontes))
+    kpi = fontes['kpi'].copy()
+    linha = kpi['Indicador'] == 'HHI Index'
+    for regiao, hhi in indices['HHI'].items():
+        if regiao in kpi.columns:
+            kpi.loc[linha, regiao] = round(hhi)
+    return kpi
+
+
+class MonitorConcentracao:
+    """HHI/CR4 incrementais por grupo.
+
+    Guarda, por grupo, a soma S = Σv e a soma dos quadrados Q = Σv²; o HHI é
+    10.000·Q/S². Trocar o valor de uma empresa ajusta S e Q em O(1) e só o
+    grupo afetado é tocado. O estado é indexado por (grupo, empresa):
+    ``sincronizar`` compara uma tabela nova com esse estado e reaplica só as
+    empresas incluídas, removidas ou com valor alterado, independentemente
+    da ordem das linhas. Linhas repetidas da mesma empresa no grupo somam.
+    """
+
+    def __init__(self, df=None, grupo='Região', empresa='Empresa', valor='Clientes'):
+        self.colunas = (grupo, empresa, valor)
+        self._valores = {}
+        self._somas = {}
+        self._quadrados = {}
+        self._tabela = {}
+        if df is not None:
+            self.sincronizar(df)
+
+    def atualizar(self, grupo, empresa, valor):
+        """Define o valor de ``empresa`` em ``grupo``; ``None`` (ou valor ≤ 0) remove a empresa."""
+        valores = self._valores.setdefault(grupo, {})
+        antigo = valores.pop(empresa, 0.0)
+        novo = 0.0 if valor is None or valor <= 0 else float(valor)
+        if novo:
+            valores[empresa] = novo
+        self._somas[grupo] = self._somas.get(grupo, 0.0) - antigo + novo
+        self._quadrados[grupo] = self._quadrados.get(grupo, 0.0) - antigo ** 2 + novo ** 2
+        self._tabela.pop(grupo, None)
+        if not valores:
+            del self._valores[grupo], self._somas[grupo], self._quadrados[grupo]
+
+    def sincronizar(self, df):
+        """Aplica ``df`` ao monitor; retorna quantas empresas foram reaplicadas."""
+        grupo, empresa, valor = self.colunas
+        valores = pd.Series(np.clip(np.nan_to_num(df[valor].to_numpy(np.float64)), 0, None))
+        novos = valores.groupby([df[grupo].to_numpy(), df[empresa].to_numpy()], sort=False).sum()
+        novos = novos[novos > 0]
+        if not self._valores:
+            # Monitor vazio: monta os grupos de uma vez
+            for g, parte in novos.groupby(level=0, sort=False):
+                v = parte.to_numpy()
+                self._valores[g] = dict(zip(parte.index.get_level_values(1), v.tolist()))
+                self._somas[g] = v.sum()
+                self._quadrados[g] = (v ** 2).sum()
+            return len(novos)
+        novos = dict(zip(novos.index, novos.to_numpy().tolist()))
+        removidas = [(g, e) for g, empresas in self._valores.items() for e in empresas if (g, e) not in novos]
+        mudaram = [chave for chave, v in novos.items() if self._valores.get(chave[0], {}).get(chave[1]) != v]
+        for g, e in removidas:
+            self.atualizar(g, e, None)
+        for g, e in mudaram:
+            self.atualizar(g, e, novos[(g, e)])
+        return len(removidas) + len(mudaram)
+
+    def hhi(self, grupo):
+        soma = self._somas.get(grupo, 0.0)
+        return 10_000 * self._quadrados[grupo] / soma ** 2 if soma else float('nan')
+
+    def cr(self, grupo, k=4):
+        """Participação (%) das ``k`` maiores empresas do grupo."""
+        valores = np.fromiter(self._valores.get(grupo, {}).values(), dtype=np.float64)
+        soma = self._somas.get(grupo, 0.0)
+        if not soma:
+            return float('nan')
+        if len(valores) > k:
+            valores = np.partition(valores, -k)[-k:]
+        return 100 * valores.sum() / soma
+
+    def _linha(self, grupo):
+        # Só os grupos tocados desde a última tabela são recalculados
+        if grupo not in self._tabela:
+            self._tabela[grupo] = (len(self._valores[grupo]), self.hhi(grupo), self.cr(grupo),
+                                   100 * max(self._valores[grupo].values()) / self._somas[grupo])
+        return self._tabela[grupo]
+
+    def tabela(self):
+        """Mesmas colunas de ``indices_concentracao``."""
+        grupos = list(self._valores)
+        resultado = pd.DataFrame([self._linha(g) for g in grupos],
+                                 columns=['Empresas', 'HHI', 'CR4 (%)', 'Líder (%)'],
+                                 index=pd.Index(grupos, name=self.colunas[0]))
+        resultado['Nº Equivalente'] = 10_000 / resultado['HHI']
+        return resultado
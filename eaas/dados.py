@@ -0,0 +1,334 @@
+"""Camada de dados: leitura das tabelas do dashboard a partir de arquivos.
+
+Cada tabela vive em ``data/<nome>.<ext>`` e tem esquema declarado em
+``ESQUEMAS``. A ordem de preferência é Arrow IPC (``.arrow``, lido via
+memory-map sem cópia), Parquet (``.parquet``, memory-mapped) e por fim CSV.
+Um arquivo colunar só é usado se não for mais antigo que o CSV de mesmo
+nome, para que uma edição no CSV nunca seja mascarada por um binário velho.
+
+Os esquemas usam tipos compactos: colunas de texto com poucos valores
+distintos (segmentos, especializações, classificações FORTE/MODERADA/...)
+são categóricas, textos livres são strings com buffers Arrow e inteiros usam
+a menor largura que comporta os valores esperados. Os decimais continuam em
+``float64`` porque aparecem sem arredondamento nas tabelas do dashboard.
+``ORCAMENTO_BYTES_LINHA`` fixa quanta memória cada tabela pode ocupar por
+linha (além de ``ORCAMENTO_FIXO_BYTES``) e ``relatorio_memoria`` compara o
+consumo real com esse orçamento.
+
+Para gerar os arquivos colunares a partir dos CSVs e conferir a memória::
+
+    python -m eaas.dados converter --formato arrow
+    python -m eaas.dados memoria
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow é opcional: sem ele só o CSV é lido
+    pa = None
+
+DIR_DADOS = Path(os.environ.get('EAAS_DADOS_DIR', Path(__file__).resolve().parent.parent / 'data'))
+
+FORMATOS = ('arrow', 'parquet', 'csv')
+
+# Texto livre com buffers Arrow; texto repetitivo como categoria (em memória, o pandas
+# escolhe códigos int8/int16 pelo número de categorias; nos arquivos Arrow o índice
+# do dicionário é int32, que comporta qualquer cardinalidade)
+TEXTO = 'string[pyarrow]' if pa is not None else 'string'
+CATEGORIA = 'category'
+
+ESQUEMAS = {
+    'mercado': {
+        'Região': TEXTO,
+        'Empresas Alvo': 'int32',
+        'Mercado (R$ mi)': 'float64',
+        'Ticket Médio (R$)': 'int32',
+        'Taxa Penetração': 'int16',
+        'Crescimento Anual': 'int16',
+    },
+    'concorrentes_fl': {
+        'Empresa': TEXTO,
+        'Serviço Principal': CATEGORIA,
+        'Faixa de Preço (R$)': TEXTO,
+        'Clientes Aprox.': TEXTO,
+    },
+    'segmentacao_fl': {
+        'Segmento': CATEGORIA,
+        'Qtd. Estimada': 'int32',
+        'Ticket Médio (R$)': 'int32',
+        'Inv. Anual EaaS': 'int32',
+    },
+    'kpi': {
+        'Indicador': TEXTO,
+        'Florianópolis': 'float64',
+        'Santa Catarina': 'float64',
+        'Brasil': 'float64',
+    },
+    'swot_fl': {
+        'Forças': TEXTO,
+        'Fraquezas': TEXTO,
+        'Oportunidades': TEXTO,
+        'Ameaças': TEXTO,
+    },
+    'cidades_sc': {
+        'Cidade': TEXTO,
+        'Especialização': CATEGORIA,
+        'Ticket Médio': TEXTO,
+    },
+    'concorrentes_sc': {
+        'Empresa': TEXTO,
+        'Região Base': CATEGORIA,
+        'Estratégia': CATEGORIA,
+        'Preço Base (R$/mês)': TEXTO,
+    },
+    'segmentacao_sc': {
+        'Segmento': CATEGORIA,
+        'Qtd. Estimada': 'int32',
+        'Ticket Médio (R$)': 'int32',
+    },
+    'concorrentes_br': {
+        'Empresa/Plataforma': TEXTO,
+        'Especialidade': CATEGORIA,
+        'Abrangência': CATEGORIA,
+        'Ticket Médio (R$/mês)': TEXTO,
+    },
+    'segmentacao_br': {
+        'Segmento': CATEGORIA,
+        'Qtd. Estimada': 'int32',
+        'Ticket Médio (R$)': 'int32',
+    },
+    'recomendacoes': {
+        'Dimensão': TEXTO,
+        'Florianópolis': TEXTO,
+        'Santa Catarina': TEXTO,
+        'Brasil': TEXTO,
+    },
+    'gaps_oportunidades': {
+        'Gap/Oportunidade': TEXTO,
+        'Florianópolis': CATEGORIA,
+        'Santa Catarina': CATEGORIA,
+        'Brasil': CATEGORIA,
+        'Recomendação': TEXTO,
+    },
+}
+
+# Memória máxima de cada tabela: parte fixa (dicionários das categorias) + bytes por linha
+ORCAMENTO_FIXO_BYTES = 16 * 1024
+ORCAMENTO_BYTES_LINHA = {
+    'mercado': 48,
+    'concorrentes_fl': 64,
+    'segmentacao_fl': 16,
+    'kpi': 56,
+    'swot_fl': 160,
+    'cidades_sc': 48,
+    'concorrentes_sc': 48,
+    'segmentacao_sc': 12,
+    'concorrentes_br': 48,
+    'segmentacao_br': 12,
+    'recomendacoes': 128,
+    'gaps_oportunidades': 80,
+}
+
+
+class ErroEsquema(ValueError):
+    """Arquivo de dados com colunas diferentes das declaradas."""
+
+
+def arquivo_tabela(nome, diretorio=None):
+    """Caminho do arquivo que será lido para a tabela ``nome``."""
+    diretorio = Path(diretorio or DIR_DADOS)
+    csv = diretorio / f'{nome}.csv'
+    mtime_csv = csv.stat().st_mtime_ns if csv.exists() else -1
+    if pa is not None:
+        for formato in FORMATOS[:-1]:
+            caminho = diretorio / f'{nome}.{formato}'
+            if caminho.exists() and caminho.stat().st_mtime_ns >= mtime_csv:
+                return caminho
+    if mtime_csv < 0:
+        raise FileNotFoundError(f"Tabela '{nome}' não encontrada em {diretorio}")
+    return csv
+
+
+def _validar(nome, df):
+    esperadas = list(ESQUEMAS[nome])
+    if list(df.columns) != esperadas:
+        raise ErroEsquema(f"Tabela '{nome}': colunas {list(df.columns)}, esperadas {esperadas}")
+    return df
+
+
+def carregar_tabela(nome, diretorio=None):
+    """Lê uma tabela aplicando o esquema declarado."""
+    caminho = arquivo_tabela(nome, diretorio)
+    esquema = ESQUEMAS[nome]
+
+    if caminho.suffix == '.csv':
+        df = pd.read_csv(caminho, dtype=esquema)
+        return _validar(nome, df)
+
+    if caminho.suffix == '.arrow':
+        # memory_map=True: os buffers apontam direto para o arquivo mapeado
+        tabela = feather.read_table(caminho, memory_map=True)
+    else:
+        tabela = pq.read_table(caminho, memory_map=True)
+    df = tabela.to_pandas(
+        split_blocks=True, self_destruct=True,
+        types_mapper={pa.string(): pd.StringDtype('pyarrow')}.get
+    )
+    return _validar(nome, df)
+
+
+class Fontes(dict):
+    """Tabelas por nome, com a versão de conteúdo de cada uma.
+
+    Quem depende só de algumas tabelas usa ``versao(tabelas)`` como chave de
+    cache: trocar uma tabela não invalida o que não a lê.
+    """
+
+    def __init__(self, tabelas=(), versoes=None):
+        super().__init__(tabelas)
+        self.versoes = dict(versoes) if versoes is not None else {nome: versao_dados({nome: df})
+                                                                   for nome, df in self.items()}
+
+    def versao(self, tabelas=None):
+        return versao_tabelas(self, sorted(self) if tabelas is None else tabelas)
+
+    def substituir(self, tabelas):
+        """Nova ``Fontes`` com ``tabelas`` trocadas; as demais são as mesmas (sem cópia)."""
+        versoes = {**self.versoes, **{nome: versao_dados({nome: df}) for nome, df in tabelas.items()}}
+        return Fontes({**self, **tabelas}, versoes)
+
+
+def carregar_fontes(diretorio=None):
+    """Lê todas as tabelas declaradas em ``ESQUEMAS``."""
+    return Fontes({nome: carregar_tabela(nome, diretorio) for nome in ESQUEMAS})
+
+
+def versao_dados(fontes):
+    """Hash estável do conteúdo das fontes de dados (dicionários ou DataFrames)."""
+    h = hashlib.sha256()
+    for nome in sorted(fontes):
+        valor = fontes[nome]
+        h.update(nome.encode('utf-8'))
+        if isinstance(valor, pd.DataFrame):
+            h.update(json.dumps(list(valor.columns), ensure_ascii=False).encode('utf-8'))
+            h.update(pd.util.hash_pandas_object(valor, index=False).values.tobytes())
+        else:
+            h.update(json.dumps(valor, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8'))
+    return h.hexdigest()[:16]
+
+
+def versao_tabelas(fontes, tabelas):
+    """Hash do conteúdo de ``tabelas``; com ``Fontes``, reaproveita as versões já calculadas."""
+    versoes = fontes.versoes if isinstance(fontes, Fontes) else {}
+    h = hashlib.sha256()
+    for nome in sorted(set(tabelas)):
+        versao = versoes.get(nome) or versao_dados({nome: fontes[nome]})
+        h.update(f'{nome}:{versao};'.encode('utf-8'))
+    return h.hexdigest()[:16]
+
+
+def relatorio_memoria(fontes):
+    """Memória ocupada por tabela contra ``ORCAMENTO_BYTES_LINHA``."""
+    linhas = []
+    for nome, df in fontes.items():
+        memoria = int(df.memory_usage(deep=True, index=False).sum())
+        orcamento = ORCAMENTO_FIXO_BYTES + ORCAMENTO_BYTES_LINHA[nome] * len(df)
+        linhas.append({
+            'Tabela': nome,
+            'Linhas': len(df),
+            'Memória (KB)': round(memoria / 1024, 1),
+            'Orçamento (KB)': round(orcamento / 1024, 1),
+            'Bytes/Linha': round(memoria / max(len(df), 1), 1),
+            'Dentro': memoria <= orcamento,
+        })
+    return pd.DataFrame(linhas)
+
+
+def pico_rss_mb():
+    """Pico de memória residente deste processo (MB)."""
+    # VmHWM é zerado no exec; ru_maxrss herda o pico do processo pai que fez o fork
+    try:
+        with open('/proc/self/status', encoding='ascii') as status:
+            for linha in status:
+                if linha.startswith('VmHWM:'):
+                    return round(int(linha.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    import resource
+
+    # ru_maxrss é em KB no Linux e em bytes no macOS
+    escala = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / escala, 1)
+
+
+def esquema_arrow(nome):
+    """Esquema pyarrow equivalente ao esquema pandas declarado."""
+    especiais = {TEXTO: pa.string(), CATEGORIA: pa.dictionary(pa.int32(), pa.string())}
+    return pa.schema([
+        (coluna, especiais.get(tipo) or pa.type_for_alias(tipo)) for coluna, tipo in ESQUEMAS[nome].items()
+    ])
+
+
+def converter(formato='arrow', diretorio=None):
+    """Gera ``<nome>.arrow``/``<nome>.parquet`` a partir dos CSVs."""
+    if pa is None:
+        raise RuntimeError("pyarrow é necessário para gerar arquivos colunares")
+    diretorio = Path(diretorio or DIR_DADOS)
+    gerados = []
+    for nome, esquema in ESQUEMAS.items():
+        df = _validar(nome, pd.read_csv(diretorio / f'{nome}.csv', dtype=esquema))
+        tabela = pa.Table.from_pandas(df, schema=esquema_arrow(nome), preserve_index=False)
+        destino = diretorio / f'{nome}.{formato}'
+        if formato == 'arrow':
+            # Sem compressão: requisito para leitura zero-copy via memory-map
+            feather.write_feather(tabela, destino, compression='uncompressed')
+        else:
+            pq.write_table(tabela, destino)
+        gerados.append(destino)
+    return gerados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Utilitários da camada de dados do dashboard EaaS")
+    sub = parser.add_subparsers(dest='comando', required=True)
+    conv = sub.add_parser('converter', help="Converte os CSVs de data/ para formato colunar")
+    conv.add_argument('--formato', choices=FORMATOS[:-1], default='arrow')
+    conv.add_argument('--diretorio', default=None)
+    mem = sub.add_parser('memoria', help="Memória de cada tabela contra o orçamento por linha")
+    mem.add_argument('--diretorio', default=None)
+    mem.add_argument('--json', type=Path, default=None,
+                     help="Grava o relatório e o pico de RSS do processo (usado por eaas.desempenho)")
+    args = parser.parse_args(argv)
+
+    if args.comando == 'converter':
+        for caminho in converter(args.formato, args.diretorio):
+            print(caminho)
+    elif args.comando == 'memoria':
+        import time
+
+        rss_base = pico_rss_mb()
+        inicio = time.perf_counter()
+        relatorio = relatorio_memoria(carregar_fontes(args.diretorio))
+        if args.json:
+            args.json.write_text(json.dumps({
+                'leitura_ms': round((time.perf_counter() - inicio) * 1000, 1),
+                'rss_base_mb': rss_base,
+                'pico_rss_mb': pico_rss_mb(),
+                'tabelas': relatorio.to_dict(orient='records'),
+            }, ensure_ascii=False, default=bool), encoding='utf-8')
+        print(relatorio.to_string(index=False))
+        if not relatorio['Dentro'].all():
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
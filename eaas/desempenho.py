@@ -0,0 +1,528 @@
+"""Benchmark de renderização dos scripts do dashboard.
+
+Executa ``eaas_dashboard.py`` e ``dashboard.py`` sem navegador (via
+``streamlit.testing.v1.AppTest``) e registra, para cada script e escala de
+dados:
+
+- tempo de parede do primeiro run (cache frio) e dos reruns seguintes;
+- por aba (``eaas_dashboard.py``): tempo do rerun, tempo e payload medidos
+  por ``eaas.navegacao.medir_aba``;
+- bytes de especificação Plotly e de dados Arrow das tabelas enviados;
+- pico de RSS do processo.
+
+O subcomando ``partida`` mede a partida a frio: tempo de importação dos
+módulos do dashboard num interpretador novo, tempo até o servidor
+Streamlit responder, tempo até o primeiro byte de ``/`` e tempo da primeira
+e da segunda visualização (sessão pelo websocket), com ou sem aquecimento.
+
+O subcomando ``fragmento`` sobe o servidor e, como o navegador, manda pelo
+websocket a mudança do slider de segmentação de Florianópolis duas vezes:
+num rerun completo e num rerun só do fragmento (``fragment_id``), e compara
+latência e bytes recebidos.
+
+O subcomando ``simulador`` monta as curvas de demanda (eaas.elasticidade)
+para dezenas de regiões sintéticas, mede cada movimento de slider como uma
+consulta a ``CurvasDemanda.projetar`` e, no servidor, o rerun do fragmento
+do simulador de preço.
+
+O subcomando ``memoria`` grava ~1M de linhas sintéticas, lê tudo num
+interpretador novo e falha (código de saída 1) se o pico de RSS passar de
+``RSS_MAX_MB`` ou se alguma tabela estourar o orçamento de
+``eaas.dados.ORCAMENTO_BYTES_LINHA``; ``tests/test_memoria.py`` roda a mesma
+carga na suíte de testes.
+
+Cada combinação roda num subprocesso próprio, para que caches e memória de
+uma medição não contaminem a seguinte. As escalas multiplicam as linhas das
+tabelas de entidades (concorrentes, segmentos, cidades, SWOT, gaps); as
+tabelas indexadas por região ficam como estão, pois as abas dependem delas.
+
+Uso::
+
+    python -m eaas.desempenho --escalas 1 10 100 1000 --saida dist/benchmark.json
+    python -m eaas.desempenho partida --saida dist/partida.json
+    python -m eaas.desempenho fragmento --escalas 1 1000
+    python -m eaas.desempenho simulador --regioes 36
+    python -m eaas.desempenho memoria --linhas 1000000 --rss-max-mb 512
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from eaas.aquecimento import abrir_sessao, aguardar_servidor, aquecer
+from eaas.dados import carregar_fontes, converter, pico_rss_mb
+from eaas.dimensionamento import segmentacao_longa
+from eaas.elasticidade import INDICADOR_ELASTICIDADE, CurvasDemanda
+from eaas.regioes import CADASTRO
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+SCRIPTS = ['eaas_dashboard.py', 'dashboard.py']
+
+# Tabelas cujas linhas são multiplicadas nos dados sintéticos
+ESCALAVEIS = [
+    'concorrentes_fl', 'concorrentes_sc', 'concorrentes_br',
+    'segmentacao_fl', 'segmentacao_sc', 'segmentacao_br',
+    'cidades_sc', 'swot_fl', 'gaps_oportunidades',
+]
+
+REPETICOES = 3
+
+TIMEOUT_S = 600
+
+# Carga sintética do subcomando ``memoria``: linhas somadas das tabelas escaláveis e teto de RSS.
+# O pico medido é ~290 MB (CSV); o teto tem folga para alocador e versões do Python, e quem
+# garante o tamanho das tabelas são os orçamentos por linha de eaas.dados
+LINHAS_CARGA = 1_000_000
+RSS_MAX_MB = 512
+
+# Módulos importados no topo pelos scripts do dashboard
+IMPORTS_DASHBOARD = 'import streamlit, eaas.cache, eaas.concentracao, eaas.navegacao, eaas.perfil'
+
+
+def escalar_dados(destino, fator, origem=None, repetir_categorias=False):
+    """Grava em ``destino`` uma cópia das tabelas com as entidades repetidas ``fator`` vezes.
+
+    A primeira coluna das cópias ganha o sufixo ' #k' para manter os nomes únicos.
+    Com ``repetir_categorias``, uma primeira coluna categórica (ex.: 'Segmento')
+    mantém os valores, como numa tabela por município × segmento.
+    """
+    destino = Path(destino)
+    destino.mkdir(parents=True, exist_ok=True)
+    for nome, df in carregar_fontes(origem).items():
+        if nome in ESCALAVEIS and fator > 1:
+            copia = np.repeat(np.arange(fator), len(df))
+            df = df.iloc[np.tile(np.arange(len(df)), fator)].reset_index(drop=True)
+            chave = df.columns[0]
+            if not (repetir_categorias and isinstance(df[chave].dtype, pd.CategoricalDtype)):
+                sufixo = pd.Series(copia).astype(str).radd(' #').where(copia > 0, '')
+                df[chave] = df[chave].astype(str) + sufixo
+        df.to_csv(destino / f'{nome}.csv', index=False)
+    return destino
+
+
+def _payload(at):
+    """Bytes de especificação Plotly e de dados Arrow presentes na árvore do AppTest."""
+    figuras = at.get('plotly_chart')
+    return {
+        'figuras': len(figuras),
+        'bytes_figuras': sum(len(fig.proto.spec) for fig in figuras),
+        'tabelas': len(at.dataframe),
+        'bytes_tabelas': sum(len(df.proto.arrow_data.data) for df in at.dataframe),
+    }
+
+
+def _rodar(at):
+    inicio = time.perf_counter()
+    at.run()
+    duracao = (time.perf_counter() - inicio) * 1000
+    if at.exception:
+        raise RuntimeError(f"Exceção no script: {at.exception[0].value}")
+    return duracao
+
+
+def _resumo(tempos):
+    return {'mediana_ms': round(statistics.median(tempos), 1), 'min_ms': round(min(tempos), 1)}
+
+
+def _widget(at, tipo, chave):
+    return next((w for w in getattr(at, tipo) if w.key == chave), None)
+
+
+def _medir_aba(at, aba, repeticoes, regiao=None):
+    tempos = []
+    for _ in range(repeticoes + 1):
+        _widget(at, 'radio', 'aba_ativa').set_value(aba)
+        if regiao is not None:
+            _widget(at, 'selectbox', 'regiao').set_value(regiao)
+        tempos.append(_rodar(at))
+    custo = at.session_state['custos_abas'][aba]
+    return {
+        'primeira_ms': round(tempos[0], 1),
+        'rerun': _resumo(tempos[1:]),
+        'secao_ms': custo['Tempo (ms)'],
+        'payload_kb': custo['Payload (KB)'],
+        **_payload(at),
+    }
+
+
+def medir(script, repeticoes=REPETICOES):
+    """Mede um script no processo atual (as tabelas vêm de ``EAAS_DADOS_DIR``)."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(RAIZ / script), default_timeout=TIMEOUT_S)
+    resultado = {'script': script, 'frio_ms': round(_rodar(at), 1)}
+    resultado['rerun'] = _resumo([_rodar(at) for _ in range(repeticoes)])
+    resultado['payload'] = _payload(at)
+
+    navegacao = _widget(at, 'radio', 'aba_ativa')
+    if navegacao is not None:
+        abas = {}
+        for aba in navegacao.options:
+            abas[aba] = _medir_aba(at, aba, repeticoes)
+            # Aba com seletor de região: mede cada região cadastrada
+            if _widget(at, 'selectbox', 'regiao') is not None:
+                for regiao in CADASTRO:
+                    abas[f'{aba} · {regiao}'] = _medir_aba(at, aba, repeticoes, regiao)
+        resultado['abas'] = abas
+
+    resultado['pico_rss_mb'] = pico_rss_mb()
+    return resultado
+
+
+def _medir_em_subprocesso(script, dados, repeticoes):
+    with tempfile.NamedTemporaryFile(suffix='.json') as saida:
+        env = dict(os.environ, EAAS_DADOS_DIR=str(dados))
+        processo = subprocess.run(
+            [sys.executable, '-m', 'eaas.desempenho', 'medir', script,
+             '--repeticoes', str(repeticoes), '--saida', saida.name],
+            cwd=RAIZ, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+        )
+        if processo.returncode:
+            raise RuntimeError(f"{script} falhou:\n{processo.stderr[-2000:]}")
+        return json.loads(Path(saida.name).read_text(encoding='utf-8'))
+
+
+def memoria(linhas=LINHAS_CARGA, rss_max_mb=RSS_MAX_MB, formato='csv'):
+    """Carrega ~``linhas`` linhas sintéticas num subprocesso e compara o pico de RSS com o teto."""
+    por_copia = sum(len(df) for nome, df in carregar_fontes().items() if nome in ESCALAVEIS)
+    fator = -(-linhas // por_copia)
+    with tempfile.TemporaryDirectory() as tmp, tempfile.NamedTemporaryFile(suffix='.json') as saida:
+        dados = escalar_dados(Path(tmp) / f'x{fator}', fator, repetir_categorias=True)
+        if formato != 'csv':
+            converter(formato, dados)
+        env = dict(os.environ, EAAS_DADOS_DIR=str(dados))
+        # Interpretador novo que só importa eaas.dados: o RSS não depende do que o chamador já carregou
+        processo = subprocess.run(
+            [sys.executable, '-m', 'eaas.dados', 'memoria', '--json', saida.name],
+            cwd=RAIZ, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+        )
+        # Código 1 é tabela acima do orçamento, já registrada no relatório
+        if processo.returncode not in (0, 1):
+            raise RuntimeError(f"Leitura da carga sintética falhou:\n{processo.stderr[-2000:]}")
+        resultado = json.loads(Path(saida.name).read_text(encoding='utf-8'))
+    linhas_carga = sum(t['Linhas'] for t in resultado['tabelas'] if t['Tabela'] in ESCALAVEIS)
+    return {
+        'formato': formato,
+        'linhas': linhas_carga,
+        'rss_max_mb': rss_max_mb,
+        **resultado,
+        'dentro': resultado['pico_rss_mb'] <= rss_max_mb and all(t['Dentro'] for t in resultado['tabelas']),
+    }
+
+
+def executar(escalas=(1,), scripts=SCRIPTS, repeticoes=REPETICOES):
+    """Roda todas as combinações script × escala e devolve o relatório."""
+    relatorio = {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'repeticoes': repeticoes,
+        'resultados': [],
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for fator in escalas:
+            dados = escalar_dados(Path(tmp) / f'x{fator}', fator)
+            for script in scripts:
+                medicao = _medir_em_subprocesso(script, dados, repeticoes)
+                relatorio['resultados'].append({'escala': fator, **medicao})
+                print(f"{script} ×{fator}: frio {medicao['frio_ms']:.0f} ms, "
+                      f"rerun {medicao['rerun']['mediana_ms']:.0f} ms, "
+                      f"pico {medicao['pico_rss_mb']:.0f} MB", file=sys.stderr)
+    return relatorio
+
+
+def tempo_importacao(repeticoes=REPETICOES):
+    """Tempo de importação dos módulos do dashboard num interpretador novo."""
+    codigo = (
+        'import sys, time; t = time.perf_counter(); '
+        f'{IMPORTS_DASHBOARD}; '
+        'print(time.perf_counter() - t, "plotly.express" in sys.modules, "plotly.graph_objects" in sys.modules)'
+    )
+    tempos = []
+    for _ in range(repeticoes):
+        saida = subprocess.run([sys.executable, '-c', codigo], cwd=RAIZ, capture_output=True,
+                               text=True, check=True).stdout.split()
+        tempos.append(float(saida[0]) * 1000)
+    return {
+        **_resumo(tempos),
+        'plotly_express_carregado': saida[1] == 'True',
+        'plotly_graph_objects_carregado': saida[2] == 'True',
+    }
+
+
+def _porta_livre():
+    with socket.socket() as s:
+        s.bind(('localhost', 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def _servidor(script, dados=None):
+    """Sobe ``streamlit run script`` numa porta livre (tabelas de ``dados``); devolve a URL."""
+    porta = _porta_livre()
+    env = dict(os.environ, EAAS_DADOS_DIR=str(dados)) if dados else None
+    servidor = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', script, '--server.headless', 'true',
+         '--server.port', str(porta), '--browser.gatherUsageStats', 'false'],
+        cwd=RAIZ, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        yield f'http://localhost:{porta}'
+    finally:
+        servidor.terminate()
+        servidor.wait()
+
+
+def partida(script='eaas_dashboard.py', aquecido=False):
+    """Sobe o servidor Streamlit e mede prontidão, TTFB e as duas primeiras visualizações."""
+    inicio = time.perf_counter()
+    with _servidor(script) as url:
+        resultado = {'script': script, 'aquecido': aquecido}
+        resultado['servidor_pronto_s'] = round(aguardar_servidor(url), 3)
+        pedido = time.perf_counter()
+        with urllib.request.urlopen(url, timeout=TIMEOUT_S) as resposta:
+            resposta.read(1)
+            resultado['ttfb_ms'] = round((time.perf_counter() - pedido) * 1000, 1)
+        if aquecido:
+            resultado['aquecimento_s'] = aquecer(url)
+        resultado['primeira_visualizacao_ms'] = round(abrir_sessao(url, '') * 1000, 1)
+        resultado['segunda_visualizacao_ms'] = round(abrir_sessao(url, '') * 1000, 1)
+        resultado['total_ate_primeira_visualizacao_s'] = round(time.perf_counter() - inicio, 3)
+        return resultado
+
+
+class _Cliente:
+    """Sessão pelo websocket que envia reruns como o navegador (com ou sem ``fragment_id``)."""
+
+    def __init__(self, ws):
+        self.ws = ws
+        # chave do widget -> (id do widget, id do fragmento que o contém, proto do widget)
+        self.widgets = {}
+
+    async def rerun(self, estados=(), fragmento=''):
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+        from streamlit.runtime.state.common import user_key_from_element_id
+
+        pedido = BackMsg()
+        pedido.rerun_script.widget_states.widgets.extend(estados)
+        pedido.rerun_script.fragment_id = fragmento
+        inicio = time.perf_counter()
+        await self.ws.send(pedido.SerializeToString())
+        recebidos = 0
+        while True:
+            dados = await asyncio.wait_for(self.ws.recv(), TIMEOUT_S)
+            recebidos += len(dados)
+            msg = ForwardMsg()
+            msg.ParseFromString(dados)
+            tipo = msg.WhichOneof('type')
+            if tipo == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+                elemento = msg.delta.new_element
+                widget = getattr(elemento, elemento.WhichOneof('type'))
+                identificador = getattr(widget, 'id', '')
+                if identificador.startswith('$$ID-'):
+                    self.widgets[user_key_from_element_id(identificador)] = (
+                        identificador, msg.delta.fragment_id, widget)
+            elif tipo == 'script_finished':
+                return (time.perf_counter() - inicio) * 1000, recebidos
+
+    def estado(self, chave, **valor):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        estado = WidgetState(id=self.widgets[chave][0])
+        for campo, v in valor.items():
+            if isinstance(v, list):
+                getattr(estado, campo).data.extend(v)
+            else:
+                setattr(estado, campo, v)
+        return estado
+
+
+# Regiões sintéticas no benchmark do simulador de preço
+REGIOES_SIMULADOR = 36
+
+# Controles comparados (sliders da página de Florianópolis, dentro de fragmentos):
+# chave e os dois múltiplos do valor padrão alternados entre reruns
+ABA_FRAGMENTO = "🗺️ Regiões"
+CONTROLES_FRAGMENTO = {
+    'segmentacao': (f"{CADASTRO['Florianópolis']['chave']}_segmentos", (0.34, 0.67)),
+    'preco': (f"{CADASTRO['Florianópolis']['chave']}_preco_0", (1.1, 0.9)),
+}
+
+
+async def _comparar_reruns(url, repeticoes, controle='segmentacao'):
+    import websockets
+
+    endereco = url.rstrip('/').replace('http', 'ws', 1) + '/_stcore/stream'
+    async with websockets.connect(endereco, subprotocols=['streamlit'], max_size=None) as ws:
+        cliente = _Cliente(ws)
+        await cliente.rerun()
+        await cliente.rerun([cliente.estado('aba_ativa', string_value=ABA_FRAGMENTO)])
+        chave, multiplos = CONTROLES_FRAGMENTO[controle]
+        _, fragmento, widget = cliente.widgets[chave]
+        valores = [float(round(widget.default[0] * m)) for m in multiplos]
+
+        medidas = {'completo': [], 'fragmento': []}
+        for i in range(repeticoes + 1):
+            for modo, alvo in (('completo', ''), ('fragmento', fragmento)):
+                # Alterna o valor para que cada rerun seja uma mudança real
+                estado = cliente.estado(chave, double_array_value=[valores[i % 2]])
+                medidas[modo].append(await cliente.rerun([estado], alvo))
+    resultado = {}
+    for modo, valores in medidas.items():
+        tempos, bytes_ = zip(*valores[1:])
+        resultado[modo] = {**_resumo(tempos), 'payload_kb': round(statistics.median(bytes_) / 1024, 1)}
+    return resultado
+
+
+def comparar_fragmento(escalas=(1,), repeticoes=REPETICOES, controle='segmentacao'):
+    """Latência e payload de um rerun completo contra o rerun só do fragmento do ``controle``."""
+    resultados = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for fator in escalas:
+            dados = escalar_dados(Path(tmp) / f'x{fator}', fator)
+            with _servidor('eaas_dashboard.py', dados) as url:
+                aguardar_servidor(url)
+                resultado = {'escala': fator, **asyncio.run(_comparar_reruns(url, repeticoes, controle))}
+            resultado['aceleracao'] = round(
+                resultado['completo']['mediana_ms'] / resultado['fragmento']['mediana_ms'], 1)
+            resultados.append(resultado)
+            print(f"×{fator}: rerun completo {resultado['completo']['mediana_ms']:.0f} ms, "
+                  f"fragmento {resultado['fragmento']['mediana_ms']:.0f} ms "
+                  f"({resultado['aceleracao']}×)", file=sys.stderr)
+    return resultados
+
+
+def curvas_sinteticas(regioes=REGIOES_SIMULADOR, fontes=None):
+    """Curvas de demanda com as segmentações do cadastro replicadas até ``regioes`` regiões."""
+    fontes = fontes or carregar_fontes()
+    longa = segmentacao_longa(fontes)
+    elasticidades = fontes['kpi'].set_index('Indicador').loc[INDICADOR_ELASTICIDADE]
+    mercados = fontes['mercado'].set_index('Região')['Mercado (R$ mi)'].astype(np.float64) * 1e6
+    copias = -(-regioes // longa['Região'].nunique())
+    partes, elasticidade, mercado = [], {}, {}
+    for k in range(copias):
+        parte = longa.copy()
+        parte['Região'] = parte['Região'].astype(str) + (f' #{k}' if k else '')
+        for original, nome in zip(longa['Região'].astype(str), parte['Região']):
+            elasticidade[nome], mercado[nome] = elasticidades[original], mercados[original]
+        partes.append(parte)
+    longa = pd.concat(partes, ignore_index=True)
+    manter = longa['Região'].isin(list(dict.fromkeys(longa['Região']))[:regioes])
+    return CurvasDemanda(longa[manter], pd.Series(elasticidade), pd.Series(mercado))
+
+
+def simulador(regioes=REGIOES_SIMULADOR, movimentos=500, semente=0):
+    """Tempo de montar as curvas e de cada movimento de slider (consulta a ``projetar``)."""
+    inicio = time.perf_counter()
+    curvas = curvas_sinteticas(regioes)
+    montagem_ms = (time.perf_counter() - inicio) * 1000
+
+    rng = np.random.default_rng(semente)
+    nomes = curvas.regioes
+    tempos = []
+    for _ in range(movimentos):
+        regiao = nomes[rng.integers(len(nomes))]
+        segmentos = curvas.segmentos(regiao)
+        precos = dict(zip(segmentos['Segmento'], segmentos['Ticket Médio (R$)'] * rng.uniform(0.5, 1.5, len(segmentos))))
+        inicio = time.perf_counter()
+        curvas.projetar(regiao, precos)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return {
+        'regioes': len(nomes),
+        'pares': len(curvas.base),
+        'montagem_ms': round(montagem_ms, 1),
+        'movimento': {**_resumo(tempos), 'p95_ms': round(float(np.percentile(tempos, 95)), 2)},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de renderização dos scripts do dashboard")
+    sub = parser.add_subparsers(dest='comando')
+
+    med = sub.add_parser('medir', help="Mede um script no processo atual (uso interno)")
+    med.add_argument('script', choices=SCRIPTS)
+    med.add_argument('--repeticoes', type=int, default=REPETICOES)
+    med.add_argument('--saida', type=Path, required=True)
+
+    mem = sub.add_parser('memoria', help="Carga sintética de ~1M de linhas contra o teto de RSS")
+    mem.add_argument('--linhas', type=int, default=LINHAS_CARGA)
+    mem.add_argument('--rss-max-mb', type=float, default=RSS_MAX_MB)
+    mem.add_argument('--formato', choices=['csv', 'arrow', 'parquet'], default='csv')
+    mem.add_argument('--saida', type=Path, default=Path('dist/memoria.json'))
+
+    fra = sub.add_parser('fragmento', help="Rerun completo × rerun do fragmento da segmentação")
+    fra.add_argument('--escalas', type=int, nargs='+', default=[1, 1000])
+    fra.add_argument('--controle', choices=list(CONTROLES_FRAGMENTO), default='segmentacao')
+    fra.add_argument('--saida', type=Path, default=Path('dist/fragmento.json'))
+
+    sim = sub.add_parser('simulador', help="Simulador de preço: consulta às curvas e rerun do fragmento")
+    sim.add_argument('--regioes', type=int, default=REGIOES_SIMULADOR)
+    sim.add_argument('--movimentos', type=int, default=500)
+    sim.add_argument('--saida', type=Path, default=Path('dist/simulador.json'))
+
+    par = sub.add_parser('partida', help="Partida a frio: importação, TTFB e primeira visualização")
+    par.add_argument('--saida', type=Path, default=Path('dist/partida.json'))
+
+    parser.add_argument('--escalas', type=int, nargs='+', default=[1, 10, 100, 1000])
+    parser.add_argument('--scripts', nargs='+', choices=SCRIPTS, default=SCRIPTS)
+    parser.add_argument('--repeticoes', type=int, default=REPETICOES)
+    parser.add_argument('--saida', type=Path, default=Path('dist/benchmark.json'))
+    args = parser.parse_args(argv)
+
+    if args.comando == 'medir':
+        resultado = medir(args.script, args.repeticoes)
+        args.saida.write_text(json.dumps(resultado, ensure_ascii=False), encoding='utf-8')
+        return
+
+    if args.comando == 'memoria':
+        relatorio = memoria(args.linhas, args.rss_max_mb, args.formato)
+        print(pd.DataFrame(relatorio['tabelas']).to_string(index=False), file=sys.stderr)
+        print(f"{relatorio['linhas']:,} linhas ({args.formato}): pico de RSS {relatorio['pico_rss_mb']:.0f} MB "
+              f"(teto {args.rss_max_mb:.0f} MB)", file=sys.stderr)
+    elif args.comando == 'fragmento':
+        relatorio = {
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'controle': CONTROLES_FRAGMENTO[args.controle][0],
+            'resultados': comparar_fragmento(args.escalas, args.repeticoes, args.controle),
+        }
+    elif args.comando == 'simulador':
+        relatorio = {
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'curvas': simulador(args.regioes, args.movimentos),
+            'servidor': comparar_fragmento((1,), args.repeticoes, 'preco'),
+        }
+        curvas = relatorio['curvas']
+        print(f"{curvas['regioes']} regiões ({curvas['pares']} pares): curvas em {curvas['montagem_ms']:.0f} ms, "
+              f"movimento {curvas['movimento']['mediana_ms']:.2f} ms (p95 {curvas['movimento']['p95_ms']:.2f} ms)",
+              file=sys.stderr)
+    elif args.comando == 'partida':
+        relatorio = {
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'importacao': tempo_importacao(args.repeticoes),
+            'servidor': [partida(script, aquecido) for script in args.scripts for aquecido in (False, True)],
+        }
+    else:
+        relatorio = executar(args.escalas, args.scripts, args.repeticoes)
+    args.saida.parent.mkdir(parents=True, exist_ok=True)
+    args.saida.write_text(json.dumps(relatorio, indent=2, ensure_ascii=False), encoding='utf-8')
+    print(args.saida)
+    if args.comando == 'memoria' and not relatorio['dentro']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
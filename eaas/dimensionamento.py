@@ -0,0 +1,118 @@
+"""Motor de dimensionamento de mercado.
+
+Deriva as métricas do dashboard (totais, tickets médios ponderados, receita
+= Qtd. Estimada × Ticket Médio, penetração e razões entre regiões) a partir
+das tabelas de mercado e de segmentação. Todas as contas são vetorizadas e
+valem para qualquer número de regiões, inclusive os 5.570 municípios.
+"""
+import numpy as np
+import pandas as pd
+
+from eaas.concentracao import indices_concentracao, kpi_com_hhi, participacoes_regionais
+from eaas.regioes import CADASTRO
+
+COL_QTD = 'Qtd. Estimada'
+COL_TICKET = 'Ticket Médio (R$)'
+COL_RECEITA = 'Receita Mensal (R$)'
+
+REFERENCIA = 'Florianópolis'
+
+# Tabelas de segmentação e a região a que cada uma se refere
+SEGMENTACOES = {c['segmentacao']: regiao for regiao, c in CADASTRO.items()}
+
+
+def com_receita(segmentacao):
+    """Cópia da segmentação com 'Receita Mensal (R$)' logo após o ticket."""
+    df = segmentacao.copy(deep=False)
+    receita = df[COL_QTD].to_numpy(np.int64) * df[COL_TICKET].to_numpy(np.int64)
+    df.insert(df.columns.get_loc(COL_TICKET) + 1, COL_RECEITA, receita)
+    return df
+
+
+def segmentacao_longa(fontes):
+    """Empilha as segmentações regionais em uma tabela região × segmento."""
+    partes = [fontes[nome][['Segmento', COL_QTD, COL_TICKET]] for nome in SEGMENTACOES]
+    return pd.concat(partes, keys=list(SEGMENTACOES.values()), names=['Região', None]) \
+        .reset_index(level=0).reset_index(drop=True)
+
+
+def kpis_segmentacao(segmentacao, por='Região'):
+    """Agrega uma segmentação longa por ``por``: quantidade, receita e ticket ponderado."""
+    qtd = segmentacao[COL_QTD].to_numpy(np.float64)
+    receita = qtd * segmentacao[COL_TICKET].to_numpy(np.float64)
+    agregado = (
+        pd.DataFrame({por: segmentacao[por].to_numpy(), COL_QTD: qtd, COL_RECEITA: receita})
+        .groupby(por, sort=False, observed=True)
+        .sum()
+    )
+    agregado[COL_TICKET] = agregado[COL_RECEITA] / agregado[COL_QTD]
+    agregado['Participação Receita'] = agregado[COL_RECEITA] / agregado[COL_RECEITA].sum()
+    return agregado
+
+
+def indicadores_regionais(mercado, referencia=REFERENCIA):
+    """Uma linha por região com as métricas de mercado e razões contra a referência."""
+    df = mercado.set_index('Região')
+    empresas = df['Empresas Alvo'].to_numpy(np.float64)
+    mercado_rs = df['Mercado (R$ mi)'].to_numpy(np.float64) * 1e6
+    ticket = df[COL_TICKET].to_numpy(np.float64)
+
+    if referencia in df.index:
+        i_ref = df.index.get_loc(referencia)
+        ref_empresas, ref_mercado, ref_ticket = empresas[i_ref], mercado_rs[i_ref], ticket[i_ref]
+    else:
+        ref_empresas = ref_mercado = ref_ticket = np.nan
+
+    return pd.DataFrame({
+        'Empresas Alvo': empresas,
+        'Mercado (R$)': mercado_rs,
+        COL_TICKET: ticket,
+        'Taxa Penetração': df['Taxa Penetração'].to_numpy(np.float64),
+        'Crescimento Anual': df['Crescimento Anual'].to_numpy(np.float64),
+        'Razão Empresas': empresas / ref_empresas,
+        'Razão Mercado': mercado_rs / ref_mercado,
+        'Ticket vs Referência (%)': (ticket / ref_ticket - 1) * 100,
+    }, index=df.index)
+
+
+def resumo_mercado(mercado, referencia=REFERENCIA):
+    """Totais e médias do conjunto de regiões (linha de métricas do Resumo Executivo)."""
+    empresas = mercado['Empresas Alvo'].to_numpy(np.float64)
+    mercado_rs = mercado['Mercado (R$ mi)'].to_numpy(np.float64) * 1e6
+    ticket = mercado[COL_TICKET].to_numpy(np.float64)
+    penetracao = mercado['Taxa Penetração'].to_numpy(np.float64)
+    crescimento = mercado['Crescimento Anual'].to_numpy(np.float64)
+
+    ticket_medio = np.average(ticket, weights=empresas)
+    ref = mercado['Região'].to_numpy() == referencia
+    ticket_ref = ticket[ref][0] if ref.any() else np.nan
+
+    return {
+        'empresas_total': empresas.sum(),
+        'mercado_total': mercado_rs.sum(),
+        'ticket_medio': ticket_medio,
+        'ticket_vs_referencia': (ticket_medio / ticket_ref - 1) * 100,
+        'penetracao_media': penetracao.mean(),
+        'penetracao_ponderada': np.average(penetracao, weights=empresas),
+        'crescimento_empresas': np.average(crescimento, weights=empresas),
+        'crescimento_mercado': np.average(crescimento, weights=mercado_rs),
+    }
+
+
+def calcular_indicadores(fontes, referencia=REFERENCIA, concentracao=None):
+    """Todas as métricas derivadas usadas pelo dashboard.
+
+    ``concentracao`` pronta (ex.: do ``MonitorConcentracao``) evita recalcular os índices.
+    O 'Score Oportunidade' do KPI vem do motor de oportunidade (eaas.oportunidade).
+    """
+    from eaas.oportunidade import kpi_com_score
+
+    if concentracao is None:
+        concentracao = indices_concentracao(participacoes_regionais(fontes))
+    return {
+        'geral': resumo_mercado(fontes['mercado'], referencia),
+        'regioes': indicadores_regionais(fontes['mercado'], referencia),
+        'segmentos': kpis_segmentacao(segmentacao_longa(fontes)),
+        'concentracao': concentracao,
+        'kpi': kpi_com_score(fontes, kpi_com_hhi(fontes, concentracao)),
+    }
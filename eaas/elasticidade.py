@@ -0,0 +1,121 @@
+"""Simulador what-if de preço com curvas de demanda pré-calculadas.
+
+Cada par região × segmento tem uma curva de elasticidade constante::
+
+    clientes(p) = Qtd. Estimada × (p / Ticket Médio) ^ ε
+
+com ε = 'Elasticidade-Preço' do KPI da região. As curvas de clientes e de
+receita são calculadas de uma vez, vetorizadas, numa grade de preços
+relativa ao ticket de cada segmento (``GRADE_MIN``–``GRADE_MAX`` × ticket).
+Uma simulação só localiza o preço na grade e interpola linearmente entre
+dois pontos; nenhuma potência é recalculada por interação.
+
+A participação de mercado é a receita anual (mensal × 12, em R$) sobre o
+'Mercado (R$ mi)' × 10⁶ da mesma região, limitada a 100%: quando a tabela
+de segmentação soma mais que o mercado (``excede_mercado``), o valor
+bruto não é uma participação e a interface avisa.
+"""
+import numpy as np
+import pandas as pd
+
+from eaas.dimensionamento import COL_QTD, COL_RECEITA, COL_TICKET, segmentacao_longa
+
+# Grade de preços como múltiplo do ticket médio do segmento
+GRADE_MIN = 0.5
+GRADE_MAX = 1.5
+PONTOS_GRADE = 201
+
+INDICADOR_ELASTICIDADE = 'Elasticidade-Preço'
+
+
+class CurvasDemanda:
+    """Curvas de clientes e receita de todos os pares região × segmento."""
+
+    def __init__(self, segmentacao, elasticidades, mercados):
+        base = segmentacao[['Região', 'Segmento', COL_QTD, COL_TICKET]].reset_index(drop=True)
+        base['Segmento'] = base['Segmento'].astype(str)
+        self.base = base
+        self.grade = np.linspace(GRADE_MIN, GRADE_MAX, PONTOS_GRADE)
+
+        regioes = base['Região'].astype(str)
+        self.qtd = base[COL_QTD].to_numpy(np.float64)
+        self.ticket = base[COL_TICKET].to_numpy(np.float64)
+        self.elasticidade = elasticidades.reindex(regioes).to_numpy(np.float64)
+        self.mercado = mercados.reindex(regioes).to_numpy(np.float64)
+
+        # Matrizes (pares × pontos da grade)
+        self.clientes = self.qtd[:, None] * np.power(self.grade[None, :], self.elasticidade[:, None])
+        self.receita = self.clientes * (self.ticket[:, None] * self.grade[None, :])
+
+        self._linhas = {
+            regiao: np.asarray(pos) for regiao, pos in base.groupby(regioes, sort=False).indices.items()
+        }
+
+    @property
+    def regioes(self):
+        return list(self._linhas)
+
+    def elasticidade_regiao(self, regiao):
+        return self.elasticidade[self._linhas[regiao][0]]
+
+    def segmentos(self, regiao):
+        """Segmentos de ``regiao`` com quantidade, ticket e receita base."""
+        linhas = self._linhas[regiao]
+        return pd.DataFrame({
+            'Segmento': self.base['Segmento'].to_numpy()[linhas],
+            COL_QTD: self.qtd[linhas],
+            COL_TICKET: self.ticket[linhas],
+            COL_RECEITA: self.qtd[linhas] * self.ticket[linhas],
+        })
+
+    def excede_mercado(self, regiao):
+        """A receita anual da segmentação, nos tickets atuais, passa do mercado da região."""
+        linhas = self._linhas[regiao]
+        return bool((self.qtd[linhas] * self.ticket[linhas]).sum() * 12 > self.mercado[linhas[0]])
+
+    def participacao(self, regiao, projecao):
+        """``(atual, projetada)``: participação total (%) da região na projeção, limitada a 100."""
+        mercado = self.mercado[self._linhas[regiao][0]]
+        return tuple(min(projecao[coluna].sum() * 12 / mercado * 100, 100.0)
+                     for coluna in ('Receita Atual (R$)', COL_RECEITA))
+
+    def _interpolar(self, tabela, linhas, precos):
+        multiplo = np.clip(precos / self.ticket[linhas], GRADE_MIN, GRADE_MAX)
+        posicao = (multiplo - GRADE_MIN) / (GRADE_MAX - GRADE_MIN) * (PONTOS_GRADE - 1)
+        i = np.minimum(posicao.astype(np.int64), PONTOS_GRADE - 2)
+        fracao = posicao - i
+        return tabela[linhas, i] * (1 - fracao) + tabela[linhas, i + 1] * fracao
+
+    def projetar(self, regiao, precos=None):
+        """Clientes, receita e participação de mercado de ``regiao`` com os ``precos`` por segmento.
+
+        Segmentos ausentes em ``precos`` ficam no ticket médio atual.
+        """
+        linhas = self._linhas[regiao]
+        segmentos = self.base['Segmento'].to_numpy()[linhas]
+        ticket = self.ticket[linhas]
+        novo = ticket.copy()
+        if precos:
+            escolhidos = pd.Series(precos, dtype=np.float64).reindex(segmentos).to_numpy()
+            novo = np.where(np.isnan(escolhidos), ticket, escolhidos)
+        clientes = self._interpolar(self.clientes, linhas, novo)
+        receita = self._interpolar(self.receita, linhas, novo)
+        return pd.DataFrame({
+            'Segmento': segmentos,
+            'Ticket Atual (R$)': ticket,
+            'Ticket Simulado (R$)': novo,
+            'Clientes Atuais': self.qtd[linhas],
+            'Clientes Projetados': clientes,
+            'Receita Atual (R$)': self.qtd[linhas] * ticket,
+            COL_RECEITA: receita,
+            'Participação Atual (%)': np.minimum(self.qtd[linhas] * ticket * 12 / self.mercado[linhas] * 100, 100),
+            'Participação Projetada (%)': np.minimum(receita * 12 / self.mercado[linhas] * 100, 100),
+        })
+
+
+def construir_curvas(fontes):
+    """Curvas de todas as segmentações regionais (eaas.dimensionamento)."""
+    elasticidades = fontes['kpi'].set_index('Indicador').loc[INDICADOR_ELASTICIDADE]
+    # Mercado anual em R$, a mesma unidade da receita mensal × 12
+    mercados = fontes['mercado'].set_index('Região')['Mercado (R$ mi)'].astype(np.float64) * 1e6
+    return CurvasDemanda(segmentacao_longa(fontes), elasticidades, mercados)
@@ -0,0 +1,275 @@
+"""Exportação em lote das tabelas (Excel ou Parquet) e dos gráficos (PDF).
+
+Todas as tabelas exibidas no dashboard (artefatos de cada seção e região
+e as métricas de eaas.dimensionamento) vão para um único arquivo: uma
+planilha por tabela no ``.xlsx`` ou um ``.parquet`` por tabela num ``.zip``.
+As figuras Plotly viram um PDF com uma página por gráfico (imagem gerada
+pelo kaleido e páginas montadas pelo Pillow).
+
+A geração roda numa thread do ``Exportador``, que informa o progresso
+(``Tarefa.progresso``) sem bloquear a sessão. O resultado fica em
+``dist/exportacao/`` com nome derivado da versão dos dados e do código:
+pedir de novo a mesma exportação devolve o arquivo já pronto, e duas
+sessões que pedem a mesma exportação compartilham a tarefa.
+
+Formatos que dependem de pacotes ausentes (openpyxl/xlsxwriter para Excel,
+kaleido para PDF, pyarrow para Parquet) ficam indisponíveis::
+
+    python -m eaas.exportacao --formato parquet
+    python -m eaas.exportacao --formato xlsx --formato pdf
+"""
+import argparse
+import hashlib
+import importlib.util
+import io
+import os
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from eaas.armazem import versao_codigo
+from eaas.artefatos import GRAFICOS_REGIAO, construir_artefatos
+from eaas.dimensionamento import calcular_indicadores
+from eaas.regioes import CADASTRO
+
+DIR_EXPORTACAO = Path(os.environ.get('EAAS_EXPORTACAO_DIR',
+                                     Path(__file__).resolve().parent.parent / 'dist' / 'exportacao'))
+
+# Formato -> (extensão, pacotes dos quais basta um, tipo MIME)
+FORMATOS = {
+    'xlsx': ('xlsx', ['openpyxl', 'xlsxwriter'], 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'parquet': ('zip', ['pyarrow'], 'application/zip'),
+    'pdf': ('pdf', ['kaleido'], 'application/pdf'),
+}
+
+# Tamanho das páginas do PDF (px) e escala da imagem
+LARGURA_PDF, ALTURA_PDF, ESCALA_PDF = 1100, 650, 2
+
+# Títulos dos gráficos que não estão em GRAFICOS_REGIAO
+TITULOS = {
+    'fig_mercado': "Mercado Potencial (R$ mi)",
+    'fig_empresas': "Empresas Alvo",
+    'fig_penetracao': "Taxa de Penetração (%)",
+    'fig_ticket': "Ticket Médio (R$)",
+    'fig_empresas_comp': "Empresas Alvo por Região",
+    'fig_mercado_comp': "Mercado Potencial Comparativo",
+    'fig_precos': "Faixa de Preços dos Concorrentes",
+    **{chave: titulo for titulo, chave in GRAFICOS_REGIAO},
+}
+
+
+def disponivel(formato):
+    return any(importlib.util.find_spec(pacote) for pacote in FORMATOS[formato][1])
+
+
+def disponiveis():
+    return [formato for formato in FORMATOS if disponivel(formato)]
+
+
+def _prefixo(secao):
+    return CADASTRO[secao]['chave'] if secao in CADASTRO else secao
+
+
+def conteudo(fontes):
+    """``(tabelas, figuras)``: nome -> DataFrame e título -> figura, na ordem das abas."""
+    tabelas, figuras = {}, {}
+    for secao, art in construir_artefatos(fontes).items():
+        for chave, valor in art.items():
+            if chave.startswith('df_') or chave == 'swot':
+                nome = chave.removeprefix('df_')
+                # Tabelas de origem únicas (mercado) aparecem em mais de uma seção
+                nome = nome if secao in ('resumo', 'consolidada') else f'{_prefixo(secao)}_{nome}'
+                tabelas.setdefault(nome, valor)
+            elif chave.startswith('fig_'):
+                figuras[f"{secao} - {TITULOS.get(chave, chave.removeprefix('fig_'))}"] = valor
+    indicadores = calcular_indicadores(fontes)
+    for nome in ('regioes', 'segmentos', 'concentracao'):
+        tabelas[f'indicadores_{nome}'] = indicadores[nome]
+    return tabelas, figuras
+
+
+def _gravar_xlsx(destino, tabelas, figuras, avancar):
+    import pandas as pd
+
+    with pd.ExcelWriter(destino) as planilha:
+        for nome, df in tabelas.items():
+            # Planilhas do Excel têm no máximo 31 caracteres no nome
+            df.to_excel(planilha, sheet_name=nome[:31], index=False)
+            avancar(nome)
+
+
+def _gravar_parquet(destino, tabelas, figuras, avancar):
+    # Parquet já é comprimido: o zip só agrupa os arquivos
+    with zipfile.ZipFile(destino, 'w', zipfile.ZIP_STORED) as pacote:
+        for nome, df in tabelas.items():
+            buffer = io.BytesIO()
+            df.to_parquet(buffer, index=False)
+            pacote.writestr(f'{nome}.parquet', buffer.getvalue())
+            avancar(nome)
+
+
+def _gravar_pdf(destino, tabelas, figuras, avancar):
+    import plotly.graph_objects as go
+    from PIL import Image
+
+    paginas = []
+    for titulo, fig in figuras.items():
+        pagina = go.Figure(fig)
+        pagina.update_layout(title=dict(text=titulo), width=LARGURA_PDF, height=ALTURA_PDF)
+        png = pagina.to_image(format='png', scale=ESCALA_PDF)
+        paginas.append(Image.open(io.BytesIO(png)).convert('RGB'))
+        avancar(titulo)
+    primeira, *demais = paginas
+    primeira.save(destino, 'PDF', save_all=True, append_images=demais, resolution=72 * ESCALA_PDF)
+
+
+GRAVADORES = {'xlsx': _gravar_xlsx, 'parquet': _gravar_parquet, 'pdf': _gravar_pdf}
+
+# Hash deste módulo e do score do KPI (eaas.oportunidade, lido por calcular_indicadores):
+# mudar o layout da exportação ou o score invalida os arquivos antigos
+_CODIGO = hashlib.sha256(b''.join(
+    Path(__file__).with_name(nome).read_bytes() for nome in ('exportacao.py', 'oportunidade.py')
+)).hexdigest()
+
+
+def chave_exportacao(fontes, formato):
+    """Hash da versão dos dados, do código e do formato."""
+    from eaas.dados import versao_dados
+
+    versao = fontes.versao() if hasattr(fontes, 'versao') else versao_dados(fontes)
+    h = hashlib.sha256()
+    for parte in (versao_codigo(), _CODIGO, versao, formato):
+        h.update(parte.encode('utf-8'))
+    return h.hexdigest()[:16]
+
+
+def arquivo_exportacao(chave, formato, diretorio=None):
+    return Path(diretorio or DIR_EXPORTACAO) / f"eaas_{chave}.{FORMATOS[formato][0]}"
+
+
+def exportar(fontes, formato, destino=None, avancar=None, total=None):
+    """Grava a exportação em ``destino`` (ou no caminho em cache) e retorna o caminho."""
+    if not disponivel(formato):
+        raise RuntimeError(f"Formato '{formato}' indisponível: instale {' ou '.join(FORMATOS[formato][1])}")
+    avancar = avancar or (lambda etapa: None)
+    destino = Path(destino or arquivo_exportacao(chave_exportacao(fontes, formato), formato))
+    tabelas, figuras = conteudo(fontes)
+    if total is not None:
+        total(len(figuras) if formato == 'pdf' else len(tabelas))
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    # Grava ao lado e renomeia: um download nunca recebe um arquivo pela metade
+    descritor, temporario = tempfile.mkstemp(dir=destino.parent, suffix=destino.suffix)
+    os.close(descritor)
+    try:
+        GRAVADORES[formato](temporario, tabelas, figuras, avancar)
+        os.replace(temporario, destino)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+    return destino
+
+
+class Tarefa:
+    """Exportação em andamento ou concluída; lida pela interface a cada atualização."""
+
+    def __init__(self, formato, caminho):
+        self.formato = formato
+        self.caminho = caminho
+        self.total = 0
+        self.feitos = 0
+        self.etapa = ''
+        self.erro = None
+        self.futuro = None
+        self.inicio = time.perf_counter()
+        self.duracao_s = None
+
+    @property
+    def pronta(self):
+        return self.duracao_s is not None
+
+    @property
+    def progresso(self):
+        if self.pronta:
+            return 1.0
+        return self.feitos / self.total if self.total else 0.0
+
+    @property
+    def nome(self):
+        return f"eaas_dashboard.{FORMATOS[self.formato][0]}"
+
+    @property
+    def mime(self):
+        return FORMATOS[self.formato][2]
+
+
+class Exportador:
+    """Fila de exportações numa thread; uma tarefa por (versão, formato)."""
+
+    def __init__(self, diretorio=None, trabalhadores=1):
+        self.diretorio = diretorio
+        self._executor = ThreadPoolExecutor(trabalhadores, thread_name_prefix='eaas-exportacao')
+        self._tarefas = {}
+        self._trava = threading.Lock()
+
+    def _existente(self, chave, formato):
+        # Chamado com a trava: tarefa conhecida ou arquivo já gravado (inclusive por outro processo)
+        tarefa = self._tarefas.get(chave)
+        if tarefa is None:
+            caminho = arquivo_exportacao(chave, formato, self.diretorio)
+            if caminho.exists():
+                tarefa = self._tarefas[chave] = Tarefa(formato, caminho)
+                tarefa.duracao_s = 0.0
+        return tarefa
+
+    def consultar(self, fontes, formato):
+        """Tarefa desta versão e formato: em andamento, concluída (inclusive por outro processo) ou None."""
+        chave = chave_exportacao(fontes, formato)
+        with self._trava:
+            return self._existente(chave, formato)
+
+    def iniciar(self, fontes, formato):
+        """Tarefa da exportação de ``fontes``, disparada na thread se ainda não houver uma válida."""
+        chave = chave_exportacao(fontes, formato)
+        # Consulta e envio sob a mesma trava: cliques simultâneos compartilham a tarefa
+        with self._trava:
+            tarefa = self._existente(chave, formato)
+            if tarefa is None or tarefa.erro is not None:
+                tarefa = self._tarefas[chave] = Tarefa(formato, arquivo_exportacao(chave, formato, self.diretorio))
+                tarefa.futuro = self._executor.submit(self._rodar, tarefa, fontes)
+            return tarefa
+
+    def _rodar(self, tarefa, fontes):
+        def avancar(etapa):
+            tarefa.feitos += 1
+            tarefa.etapa = etapa
+
+        try:
+            exportar(fontes, tarefa.formato, tarefa.caminho, avancar, lambda n: setattr(tarefa, 'total', n))
+            tarefa.duracao_s = round(time.perf_counter() - tarefa.inicio, 2)
+        except Exception as erro:
+            tarefa.erro = f"{type(erro).__name__}: {erro}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta tabelas (Excel/Parquet) e gráficos (PDF)")
+    parser.add_argument('--formato', action='append', choices=list(FORMATOS),
+                        help="Repetível; sem ele, todos os disponíveis")
+    parser.add_argument('--saida', default=None, help="Pasta de saída (padrão: dist/exportacao)")
+    args = parser.parse_args(argv)
+    from eaas.dados import carregar_fontes
+
+    fontes = carregar_fontes()
+    for formato in args.formato or disponiveis():
+        inicio = time.perf_counter()
+        destino = None
+        if args.saida:
+            destino = Path(args.saida) / f"eaas_dashboard.{FORMATOS[formato][0]}"
+        caminho = exportar(fontes, formato, destino)
+        print(f"{caminho} ({caminho.stat().st_size / 1024:.0f} KB, {time.perf_counter() - inicio:.1f} s)")
+
+
+if __name__ == '__main__':
+    main()
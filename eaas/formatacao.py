@@ -0,0 +1,48 @@
+"""Formatação de números no padrão brasileiro para métricas e tabelas."""
+import math
+
+
+def _br(texto):
+    # Troca separadores do padrão en-US (1,234.5) para pt-BR (1.234,5)
+    return texto.replace(',', '_').replace('.', ',').replace('_', '.')
+
+
+def numero(valor, casas=0):
+    """47080 -> '47.080'; 10.67 (casas=1) -> '10,7'."""
+    return _br(f"{valor:,.{casas}f}")
+
+
+def moeda(valor):
+    """2840 -> 'R$ 2.840'."""
+    return f"R$ {numero(valor)}"
+
+
+def moeda_abreviada(valor, digitos=3):
+    """Valor em reais com sufixo mil/M/B e ``digitos`` significativos: 1.9224e9 -> 'R$ 1,92B'."""
+    for escala, sufixo in ((1e9, 'B'), (1e6, 'M'), (1e3, ' mil')):
+        if abs(valor) >= escala:
+            reduzido = valor / escala
+            casas = max(digitos - 1 - int(math.floor(math.log10(abs(reduzido)))), 0)
+            texto = numero(reduzido, casas)
+            if ',' in texto:
+                texto = texto.rstrip('0').rstrip(',')
+            return f"R$ {texto}{sufixo}"
+    return moeda(valor)
+
+
+def percentual(valor, casas=1):
+    """10.67 -> '10,7%'; 18.0 -> '18%'."""
+    texto = numero(valor, casas)
+    if ',' in texto:
+        texto = texto.rstrip('0').rstrip(',')
+    return f"{texto}%"
+
+
+def razao(valor):
+    """6.43 -> '6,4x'; 160.7 -> '161x'."""
+    return f"{numero(valor, 0 if valor >= 100 else 1)}x"
+
+
+def variacao(valor, casas=1):
+    """6.15 -> '+6,2%'; -3.0 -> '-3%'."""
+    return f"{'+' if valor >= 0 else '-'}{percentual(abs(valor), casas)}"
@@ -0,0 +1,239 @@
+"""Grafo de recomputação incremental das tabelas derivadas.
+
+Cada nó derivado (artefatos de uma seção ou região, indicadores, curvas de
+demanda, ...) declara em ``NOS`` as tabelas de origem de que depende. A
+versão de um nó é o hash do conteúdo dessas tabelas (``Fontes.versao``), e
+é ela que os caches de eaas.cache usam como chave: uma tabela alterada só
+muda a versão dos nós abaixo dela; o resto continua servido do cache.
+
+``Grafo.verificar`` compara a assinatura (tamanho, mtime) dos arquivos de
+``data/`` com a última leitura, relê só os que mudaram e, se o conteúdo
+mudou de fato, publica um novo ``Fontes`` (as tabelas intactas são os
+mesmos objetos) e recalcula os nós afetados com as funções de
+``recalcular``, aquecendo o cache antes do próximo rerun. ``observar``
+roda essa verificação numa thread a cada ``INTERVALO_S`` segundos (por
+polling, que também funciona em volumes de rede compartilhados). A
+observação é opcional (``EAAS_OBSERVAR_S``): sem ela, as tabelas são
+conferidas no início de cada rerun; com ela, só a thread confere e
+recalcula, e as sessões apenas comparam ``geracao``.
+
+Para ver quais nós uma edição atinge e quanto custa::
+
+    python -m eaas.grafo nos concorrentes_fl
+    python -m eaas.grafo benchmark --tabela concorrentes_fl
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+import weakref
+from pathlib import Path
+
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+from eaas.artefatos import DEPENDENCIAS, SECOES, construir_artefatos, construir_parte, partes, tabelas_parte
+from eaas.concentracao import CONCORRENTES
+from eaas.dados import DIR_DADOS, ESQUEMAS, Fontes, arquivo_tabela, carregar_tabela
+from eaas.dimensionamento import SEGMENTACOES
+from eaas.regioes import CADASTRO
+
+# Segundos entre verificações dos arquivos em segundo plano (0, o padrão, desliga a observação)
+INTERVALO_S = float(os.environ.get('EAAS_OBSERVAR_S', 0))
+
+# Tabelas de concorrentes com base de participação e as lidas pelo HHI do KPI
+TABELAS_PARTICIPACAO = [tabela for tabela, _, coluna in CONCORRENTES.values() if coluna]
+TABELAS_HHI = ['kpi', *TABELAS_PARTICIPACAO]
+
+
+def nos_artefatos(secao):
+    """Nós cujos artefatos, juntos, formam a página de ``secao`` (seção ou região)."""
+    return [f'artefatos:{secao}:{parte}' for parte in partes(secao)] or [f'artefatos:{secao}']
+
+
+# Nó derivado -> tabelas de origem de que depende. Seções e regiões divididas
+# em partes (eaas.artefatos.partes) têm um nó por parte
+NOS = {
+    'concentracao': TABELAS_PARTICIPACAO,
+    'indicadores': ['mercado', *TABELAS_HHI, *SEGMENTACOES],
+    **{f'artefatos:{secao}': DEPENDENCIAS[secao] for secao in [*SECOES, *CADASTRO] if not partes(secao)},
+    **{f'artefatos:{secao}:{parte}': tabelas_parte(secao, parte)
+       for secao in [*SECOES, *CADASTRO] for parte in partes(secao)},
+    'curvas': ['kpi', 'mercado', *SEGMENTACOES],
+    'oportunidade': ['mercado', *TABELAS_HHI, *SEGMENTACOES],
+    'projecao': ['mercado', *SEGMENTACOES],
+    'cenarios': ['recomendacoes', 'kpi', 'mercado'],
+    'busca': [c['concorrentes'] for c in CADASTRO.values()],
+}
+
+
+def construir_no(fontes, no):
+    """Artefatos de um nó ``artefatos:<seção>`` ou ``artefatos:<região>:<parte>``."""
+    _, secao, *parte = no.split(':')
+    return construir_parte(fontes, secao, parte[0]) if parte else construir_artefatos(fontes, secao)
+
+
+def abaixo(tabelas, nos=NOS):
+    """Nós que dependem de alguma das ``tabelas``, na ordem de declaração."""
+    tabelas = set(tabelas)
+    return [no for no, dependencias in nos.items() if tabelas & set(dependencias)]
+
+
+def _assinatura(nome, diretorio):
+    try:
+        caminho = arquivo_tabela(nome, diretorio)
+        info = caminho.stat()
+    except OSError:
+        return None
+    return caminho.name, info.st_size, info.st_mtime_ns
+
+
+class Grafo:
+    """Fontes atuais e recomputação dos nós abaixo de cada tabela alterada."""
+
+    def __init__(self, diretorio=None, recalcular=None, nos=NOS):
+        self.diretorio = diretorio
+        self.nos = nos
+        self.recalcular = recalcular or {}
+        self.fontes = Fontes()
+        # Incrementada a cada mudança de conteúdo publicada
+        self.geracao = 0
+        self.ultima = None
+        self.observando = False
+        self._assinaturas = {}
+        self._trava = threading.Lock()
+        self._parar = threading.Event()
+        self.verificar()
+
+    def versao(self, no):
+        return self.fontes.versao(self.nos[no])
+
+    def verificar(self):
+        """Relê as tabelas cujos arquivos mudaram e recalcula os nós abaixo delas.
+
+        Retorna ``{'tabelas', 'nos', 'ms'}`` se algum conteúdo mudou, senão None.
+        """
+        with self._trava:
+            inicio = time.perf_counter()
+            assinaturas = {nome: _assinatura(nome, self.diretorio) for nome in ESQUEMAS}
+            mudaram = [nome for nome in ESQUEMAS if assinaturas[nome] != self._assinaturas.get(nome)]
+            if not mudaram:
+                return None
+            novas = {}
+            for nome in mudaram:
+                try:
+                    novas[nome] = carregar_tabela(nome, self.diretorio)
+                except (OSError, ValueError):
+                    if nome not in self.fontes:
+                        raise
+                    # Arquivo sendo gravado ou inválido: mantém a versão anterior e tenta de novo
+                    continue
+                self._assinaturas[nome] = assinaturas[nome]
+            fontes = self.fontes.substituir(novas)
+            alteradas = [nome for nome in novas if fontes.versoes[nome] != self.fontes.versoes.get(nome)]
+            if not alteradas:
+                return None
+            self.fontes = fontes
+            self.geracao += 1
+            nos = abaixo(alteradas, self.nos)
+            for no in nos:
+                if no in self.recalcular:
+                    self.recalcular[no](fontes)
+            self.ultima = {'tabelas': alteradas, 'nos': nos,
+                           'ms': round((time.perf_counter() - inicio) * 1000, 1)}
+            return self.ultima
+
+    def observar(self, intervalo=INTERVALO_S):
+        """Verifica os arquivos em segundo plano; a thread termina com o grafo."""
+        if intervalo <= 0:
+            return None
+        referencia = weakref.ref(self)
+        parar = self._parar
+        self.observando = True
+
+        def laco():
+            while not parar.wait(intervalo):
+                grafo = referencia()
+                if grafo is None:
+                    return
+                try:
+                    grafo.verificar()
+                except Exception:
+                    # Uma leitura com falha é tentada de novo na próxima verificação
+                    pass
+                del grafo
+
+        thread = threading.Thread(target=laco, name='eaas-observador', daemon=True)
+        thread.start()
+        return thread
+
+    def parar(self):
+        self._parar.set()
+
+
+def benchmark(tabela='concorrentes_fl', repeticoes=5):
+    """Editar ``tabela``: recomputação incremental contra reconstrução completa (ms, mediana)."""
+    from eaas.dimensionamento import calcular_indicadores
+    from eaas.elasticidade import construir_curvas
+
+    funcoes = {
+        'indicadores': calcular_indicadores,
+        'curvas': construir_curvas,
+        **{no: (lambda f, no=no: construir_no(f, no)) for no in NOS if no.startswith('artefatos:')},
+    }
+    destino = Path(tempfile.mkdtemp(prefix='eaas-grafo-'))
+    try:
+        for arquivo in Path(DIR_DADOS).glob('*.csv'):
+            shutil.copy2(arquivo, destino)
+        grafo = Grafo(destino, funcoes)
+        for no, funcao in funcoes.items():
+            funcao(grafo.fontes)  # importações do Plotly fora da medida
+        completo, incremental = [], []
+        csv = destino / f'{tabela}.csv'
+        for i in range(repeticoes):
+            inicio = time.perf_counter()
+            for funcao in funcoes.values():
+                funcao(grafo.fontes)
+            completo.append((time.perf_counter() - inicio) * 1000)
+            # Edição de conteúdo, como a de um analista: última coluna da primeira linha
+            df = pd.read_csv(csv)
+            coluna = df.columns[-1]
+            df.loc[0, coluna] = df.loc[0, coluna] + 1 if is_numeric_dtype(df[coluna]) else f'{df.loc[0, coluna]}.'
+            df.to_csv(csv, index=False)
+            incremental.append(grafo.verificar()['ms'])
+        nos = grafo.ultima['nos']
+    finally:
+        shutil.rmtree(destino, ignore_errors=True)
+    return {
+        'tabela': tabela,
+        'nos_recalculados': [no for no in nos if no in funcoes],
+        'nos_total': len(funcoes),
+        'completo_ms': round(sorted(completo)[len(completo) // 2], 1),
+        'incremental_ms': round(sorted(incremental)[len(incremental) // 2], 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dependências entre tabelas de origem e nós derivados")
+    sub = parser.add_subparsers(dest='comando', required=True)
+    nos = sub.add_parser('nos', help="Nós afetados pela alteração das tabelas")
+    nos.add_argument('tabelas', nargs='*', help="Sem tabelas, lista todas as dependências")
+    bench = sub.add_parser('benchmark', help="Edita uma tabela e mede a recomputação incremental")
+    bench.add_argument('--tabela', default='concorrentes_fl', choices=list(ESQUEMAS))
+    bench.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    if args.comando == 'nos':
+        if args.tabelas:
+            print('\n'.join(abaixo(args.tabelas)))
+        else:
+            for no, tabelas in NOS.items():
+                print(f"{no}: {', '.join(tabelas)}")
+    else:
+        print(benchmark(args.tabela, args.repeticoes))
+
+
+if __name__ == '__main__':
+    main()
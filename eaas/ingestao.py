@@ -0,0 +1,516 @@
+"""Coleta de indicadores municipais de APIs públicas (IBGE/SIDRA).
+
+Os municípios de uma UF vêm da API de localidades do IBGE e cada indicador
+de ``INDICADORES`` (tabela e variável do SIDRA) é pedido em lotes de
+municípios. Os pedidos são disparados juntos com ``asyncio`` e atendidos
+por uma sessão HTTP com pool de conexões limitado a ``CONEXOES`` (o mesmo
+número de threads executa as chamadas bloqueantes). Falhas transitórias
+(erros de rede, 429, 5xx) são repetidas com espera exponencial, respeitando
+``Retry-After``.
+
+As respostas ficam em disco (``CacheHttp``): dentro do TTL não há rede
+alguma; vencido o TTL, o pedido vai com ``If-None-Match``/``If-Modified-Since``
+e um 304 só renova a entrada. O resultado é gravado em
+``data/ibge/municipios_<uf>.parquet`` (ou CSV) com um JSON de metadados; o
+dashboard só lê esse arquivo, então um rerun nunca espera pela rede. Com
+``EAAS_INGESTAO_H`` > 0 a coleta é refeita em segundo plano (``agendar``).
+
+``ServidorLocal`` imita as duas APIs (com latência, ETag e falhas
+injetadas) para exercitar a coleta sem rede::
+
+    python -m eaas.ingestao coletar --uf 42
+    python -m eaas.ingestao status
+    python -m eaas.ingestao benchmark --municipios 300 --atraso-ms 50
+"""
+import argparse
+import asyncio
+import functools
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import weakref
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from eaas.dados import DIR_DADOS
+
+URL_SIDRA = os.environ.get('EAAS_SIDRA_URL', 'https://apisidra.ibge.gov.br')
+URL_LOCALIDADES = os.environ.get('EAAS_LOCALIDADES_URL', 'https://servicodados.ibge.gov.br/api/v1/localidades')
+
+DIR_INGESTAO = Path(os.environ.get('EAAS_INGESTAO_DIR', DIR_DADOS / 'ibge'))
+
+# Validade das respostas em cache (horas) e intervalo da coleta em segundo plano (0 desliga)
+TTL_H = float(os.environ.get('EAAS_INGESTAO_TTL_H', 24))
+INTERVALO_H = float(os.environ.get('EAAS_INGESTAO_H', 0))
+
+UF_PADRAO = '42'  # Santa Catarina
+
+CONEXOES = 16
+TENTATIVAS = 4
+ESPERA_S = 0.5
+TIMEOUT_S = 30
+# Municípios por pedido ao SIDRA
+LOTE = 20
+
+# Status repetidos com espera
+REPETIR = {429, 500, 502, 503, 504}
+
+# Indicador -> (tabela SIDRA, variável)
+INDICADORES = {
+    'PIB (R$ mil)': ('5938', '37'),
+    'População': ('6579', '9324'),
+    'Empresas': ('1685', '706'),
+}
+
+# Marcadores do SIDRA para valor ausente, sigiloso ou não aplicável
+SEM_VALOR = {'-', '..', '...', 'X'}
+
+
+class ErroColeta(RuntimeError):
+    """Pedido que falhou depois de todas as tentativas."""
+
+
+# ============================================================================
+# CACHE HTTP EM DISCO
+# ============================================================================
+
+class CacheHttp:
+    """Respostas por URL com ETag/Last-Modified; uma entrada é um arquivo JSON."""
+
+    def __init__(self, raiz, ttl_h=TTL_H):
+        self.raiz = Path(raiz)
+        self.ttl_s = ttl_h * 3600
+
+    def _caminho(self, url):
+        return self.raiz / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()[:32]}.json"
+
+    def ler(self, url):
+        try:
+            return json.loads(self._caminho(url).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+
+    def fresca(self, entrada):
+        return time.time() - entrada['gravado'] < self.ttl_s
+
+    def gravar(self, url, corpo, etag=None, modificado=None):
+        entrada = {'url': url, 'etag': etag, 'modificado': modificado, 'gravado': time.time(), 'corpo': corpo}
+        self.raiz.mkdir(parents=True, exist_ok=True)
+        # Arquivo temporário + os.replace: outro processo nunca lê uma entrada pela metade
+        descritor, temporario = tempfile.mkstemp(dir=self.raiz, suffix='.tmp')
+        with os.fdopen(descritor, 'w', encoding='utf-8') as arquivo:
+            json.dump(entrada, arquivo, ensure_ascii=False)
+        os.replace(temporario, self._caminho(url))
+        return entrada
+
+    def renovar(self, entrada):
+        """Resposta 304: o corpo guardado continua válido por mais um TTL."""
+        return self.gravar(entrada['url'], entrada['corpo'], entrada['etag'], entrada['modificado'])
+
+    def limpar(self):
+        shutil.rmtree(self.raiz, ignore_errors=True)
+
+
+# ============================================================================
+# CLIENTE HTTP ASSÍNCRONO
+# ============================================================================
+
+class Cliente:
+    """GET de JSON com pool de conexões limitado, tentativas e cache em disco.
+
+    ``json`` é uma corrotina; muitos pedidos disparados com ``asyncio.gather``
+    ocupam no máximo ``conexoes`` conexões ao mesmo tempo.
+    """
+
+    def __init__(self, cache=None, conexoes=CONEXOES, tentativas=TENTATIVAS, espera_s=ESPERA_S,
+                 timeout_s=TIMEOUT_S):
+        self.cache = cache
+        self.tentativas = tentativas
+        self.espera_s = espera_s
+        self.timeout_s = timeout_s
+        self.sessao = requests.Session()
+        # pool_block: sem conexão livre, a thread espera em vez de abrir outra
+        adaptador = HTTPAdapter(pool_connections=conexoes, pool_maxsize=conexoes, pool_block=True)
+        self.sessao.mount('http://', adaptador)
+        self.sessao.mount('https://', adaptador)
+        self._executor = ThreadPoolExecutor(conexoes, thread_name_prefix='eaas-http')
+        # cache / 304 / rede / repeticoes
+        self.contagem = Counter()
+
+    def fechar(self):
+        self._executor.shutdown(wait=False)
+        self.sessao.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        self.fechar()
+
+    async def json(self, url):
+        entrada = self.cache.ler(url) if self.cache is not None else None
+        if entrada is not None and self.cache.fresca(entrada):
+            self.contagem['cache'] += 1
+            return json.loads(entrada['corpo'])
+        cabecalhos = {'Accept': 'application/json'}
+        if entrada is not None:
+            if entrada['etag']:
+                cabecalhos['If-None-Match'] = entrada['etag']
+            if entrada['modificado']:
+                cabecalhos['If-Modified-Since'] = entrada['modificado']
+        resposta = await self._get(url, cabecalhos)
+        if resposta.status_code == 304 and entrada is not None:
+            self.contagem['304'] += 1
+            return json.loads(self.cache.renovar(entrada)['corpo'])
+        self.contagem['rede'] += 1
+        corpo = resposta.text
+        dados = json.loads(corpo)
+        if self.cache is not None:
+            self.cache.gravar(url, corpo, resposta.headers.get('ETag'), resposta.headers.get('Last-Modified'))
+        return dados
+
+    async def _get(self, url, cabecalhos):
+        loop = asyncio.get_running_loop()
+        pedido = functools.partial(self.sessao.get, url, headers=cabecalhos, timeout=self.timeout_s)
+        falha = None
+        for tentativa in range(self.tentativas):
+            if tentativa:
+                self.contagem['repeticoes'] += 1
+            try:
+                resposta = await loop.run_in_executor(self._executor, pedido)
+            except requests.RequestException as erro:
+                falha, espera = erro, self.espera_s * 2 ** tentativa
+            else:
+                if resposta.status_code not in REPETIR:
+                    if resposta.status_code >= 400:
+                        raise ErroColeta(f"{url}: HTTP {resposta.status_code}")
+                    return resposta
+                falha = f"HTTP {resposta.status_code}"
+                espera = _retry_after(resposta)
+                if espera is None:
+                    espera = self.espera_s * 2 ** tentativa
+            if tentativa + 1 < self.tentativas:
+                await asyncio.sleep(espera)
+        raise ErroColeta(f"{url}: {falha} após {self.tentativas} tentativas")
+
+
+def _retry_after(resposta):
+    try:
+        return float(resposta.headers.get('Retry-After', ''))
+    except ValueError:
+        return None
+
+
+# ============================================================================
+# IBGE / SIDRA
+# ============================================================================
+
+def url_municipios(uf, base=URL_LOCALIDADES):
+    return f"{base}/estados/{uf}/municipios"
+
+
+def url_sidra(tabela, variavel, municipios, periodo='last', base=URL_SIDRA):
+    return f"{base}/values/t/{tabela}/n6/{','.join(municipios)}/v/{variavel}/p/{periodo}"
+
+
+def _coluna(cabecalho, rotulo):
+    return next(chave for chave, texto in cabecalho.items() if texto.startswith(rotulo))
+
+
+def linhas_sidra(dados):
+    """``(código do município, período, valor)`` de uma resposta /values (a 1ª linha é o cabeçalho)."""
+    if not dados:
+        return []
+    cabecalho, *linhas = dados
+    codigo, periodo = _coluna(cabecalho, 'Município (Código)'), _coluna(cabecalho, 'Ano')
+    return [
+        (linha[codigo], linha[periodo], None if linha['V'] in SEM_VALOR else float(linha['V']))
+        for linha in linhas
+    ]
+
+
+async def _coletar(cliente, uf, indicadores, lote, url_sidra_base, url_localidades_base):
+    municipios = await cliente.json(url_municipios(uf, url_localidades_base))
+    codigos = [str(municipio['id']) for municipio in municipios]
+    pedidos = [
+        (nome, url_sidra(tabela, variavel, codigos[i:i + lote], base=url_sidra_base))
+        for nome, (tabela, variavel) in indicadores.items()
+        for i in range(0, len(codigos), lote)
+    ]
+    respostas = await asyncio.gather(*(cliente.json(url) for _, url in pedidos), return_exceptions=True)
+
+    tabela = pd.DataFrame({
+        'Código': codigos,
+        'Município': [municipio['nome'] for municipio in municipios],
+    }).set_index('Código')
+    periodos, falhas = {}, []
+    valores = {nome: {} for nome in indicadores}
+    for (nome, url), resposta in zip(pedidos, respostas):
+        if isinstance(resposta, Exception):
+            # Um lote perdido deixa só aqueles municípios sem valor
+            falhas.append(str(resposta))
+            continue
+        for codigo, periodo, valor in linhas_sidra(resposta):
+            valores[nome][codigo] = valor
+            periodos[nome] = max(periodos.get(nome, periodo), periodo)
+    for nome in indicadores:
+        tabela[nome] = pd.Series(valores[nome], dtype='float64')
+    return tabela.reset_index(), {'periodos': periodos, 'pedidos': len(pedidos) + 1, 'falhas': falhas}
+
+
+def coletar(uf=UF_PADRAO, indicadores=None, cliente=None, lote=LOTE,
+            url_sidra_base=URL_SIDRA, url_localidades_base=URL_LOCALIDADES):
+    """Tabela Código × Município × indicador da UF e metadados da coleta."""
+    proprio = cliente is None
+    if proprio:
+        cliente = Cliente(CacheHttp(DIR_INGESTAO / 'http'))
+    inicio = time.perf_counter()
+    try:
+        tabela, meta = asyncio.run(_coletar(cliente, uf, indicadores or INDICADORES, lote,
+                                            url_sidra_base, url_localidades_base))
+    finally:
+        if proprio:
+            cliente.fechar()
+    meta.update({
+        'uf': uf,
+        'coletado_em': datetime.now().isoformat(timespec='seconds'),
+        'ms': round((time.perf_counter() - inicio) * 1000, 1),
+        'contagem': dict(cliente.contagem),
+    })
+    return tabela, meta
+
+
+# ============================================================================
+# RESULTADO EM DISCO
+# ============================================================================
+
+def arquivo_municipios(uf=UF_PADRAO, diretorio=None):
+    """Caminho dos metadados da última coleta da UF (a tabela fica ao lado)."""
+    return Path(diretorio or DIR_INGESTAO) / f'municipios_{uf}.json'
+
+
+def salvar(tabela, meta, diretorio=None):
+    caminho = arquivo_municipios(meta['uf'], diretorio)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        import pyarrow  # noqa: F401
+        dados, escrever = caminho.with_suffix('.parquet'), lambda destino: tabela.to_parquet(destino, index=False)
+    except ImportError:
+        dados, escrever = caminho.with_suffix('.csv'), lambda destino: tabela.to_csv(destino, index=False)
+    temporario = dados.with_suffix('.tmp')
+    escrever(temporario)
+    os.replace(temporario, dados)
+    # Os metadados vão por último: quem os lê encontra a tabela já completa
+    temporario = caminho.with_suffix('.json.tmp')
+    temporario.write_text(json.dumps({**meta, 'arquivo': dados.name}, ensure_ascii=False, indent=1),
+                          encoding='utf-8')
+    os.replace(temporario, caminho)
+    return caminho
+
+
+def carregar(uf=UF_PADRAO, diretorio=None):
+    """``(tabela, metadados)`` da última coleta da UF, ou None se nunca houve coleta."""
+    caminho = arquivo_municipios(uf, diretorio)
+    try:
+        meta = json.loads(caminho.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    dados = caminho.parent / meta['arquivo']
+    tabela = pd.read_parquet(dados) if dados.suffix == '.parquet' else pd.read_csv(dados, dtype={'Código': str})
+    return tabela, meta
+
+
+def atualizar(uf=UF_PADRAO, diretorio=None, **opcoes):
+    """Coleta e grava; retorna os metadados."""
+    tabela, meta = coletar(uf, **opcoes)
+    salvar(tabela, meta, diretorio)
+    return meta
+
+
+def agendar(intervalo_h=INTERVALO_H, uf=UF_PADRAO, diretorio=None):
+    """Refaz a coleta a cada ``intervalo_h`` horas numa thread; retorna o evento que a encerra."""
+    parar = threading.Event()
+    if intervalo_h <= 0:
+        return parar
+
+    def laco():
+        while True:
+            try:
+                atualizar(uf, diretorio)
+            except Exception:
+                # Sem rede a coleta anterior continua valendo; tenta de novo no próximo ciclo
+                pass
+            if parar.wait(intervalo_h * 3600):
+                return
+
+    threading.Thread(target=laco, name='eaas-ingestao', daemon=True).start()
+    return parar
+
+
+# ============================================================================
+# SERVIDOR LOCAL (substituto das APIs)
+# ============================================================================
+
+class ServidorLocal:
+    """Imita localidades e /values do SIDRA em ``url`` com latência e falhas injetadas.
+
+    ``falha_a_cada`` > 0 responde 503 ao primeiro pedido de cada N URLs
+    distintas (a repetição é atendida). Respostas têm ETag e honram
+    ``If-None-Match``.
+    """
+
+    def __init__(self, municipios=300, atraso_ms=50, falha_a_cada=0, uf=UF_PADRAO):
+        self.codigos = [f'{uf}{i:05d}' for i in range(municipios)]
+        self.atraso_s = atraso_ms / 1000
+        self.falha_a_cada = falha_a_cada
+        self.uf = uf
+        self.pedidos = Counter()
+        self._trava = threading.Lock()
+        self._vistos = set()
+        self._servidor = ThreadingHTTPServer(('127.0.0.1', 0), self._manipulador())
+        self._servidor.daemon_threads = True
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self._servidor.server_address[1]}'
+
+    def __enter__(self):
+        threading.Thread(target=self._servidor.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *erro):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+    def _corpo(self, caminho):
+        if caminho == f'/estados/{self.uf}/municipios':
+            return [{'id': int(codigo), 'nome': f'Município {codigo}'} for codigo in self.codigos]
+        encontrado = re.fullmatch(r'/values/t/(\d+)/n6/([\d,]+)/v/(\d+)/p/(\w+)', caminho)
+        if encontrado is None:
+            return None
+        tabela, codigos, variavel, _ = encontrado.groups()
+        cabecalho = {'NC': 'Nível Territorial (Código)', 'D1C': 'Município (Código)', 'D1N': 'Município',
+                     'D2C': 'Ano (Código)', 'D2N': 'Ano', 'D3C': 'Variável (Código)', 'V': 'Valor'}
+        linhas = [
+            {'NC': '6', 'D1C': codigo, 'D1N': f'Município {codigo}', 'D2C': '2021', 'D2N': '2021',
+             'D3C': variavel, 'V': '-' if int(codigo) % 97 == 0 else str(int(codigo) % 10_000 * int(tabela) % 99_991)}
+            for codigo in codigos.split(',')
+        ]
+        return [cabecalho, *linhas]
+
+    def _manipulador(self):
+        servidor = weakref.proxy(self)
+
+        class Manipulador(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Cabeçalho e corpo num só envio (sem a espera do ACK atrasado do TCP)
+            wbufsize = -1
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _responder(self, status, corpo=b'', cabecalhos=()):
+                self.send_response(status)
+                for chave, valor in cabecalhos:
+                    self.send_header(chave, valor)
+                self.send_header('Content-Length', str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def do_GET(self):
+                time.sleep(servidor.atraso_s)
+                with servidor._trava:
+                    servidor.pedidos[self.path] += 1
+                    primeira = self.path not in servidor._vistos
+                    servidor._vistos.add(self.path)
+                    falhar = (servidor.falha_a_cada and primeira
+                              and len(servidor._vistos) % servidor.falha_a_cada == 0)
+                if falhar:
+                    return self._responder(503, cabecalhos=[('Retry-After', '0')])
+                dados = servidor._corpo(self.path.split('/api/v1/localidades')[-1])
+                if dados is None:
+                    return self._responder(404)
+                corpo = json.dumps(dados, ensure_ascii=False).encode('utf-8')
+                etag = f'"{hashlib.sha256(corpo).hexdigest()[:16]}"'
+                if self.headers.get('If-None-Match') == etag:
+                    return self._responder(304, cabecalhos=[('ETag', etag)])
+                self._responder(200, corpo, [('Content-Type', 'application/json'), ('ETag', etag)])
+
+        return Manipulador
+
+
+def benchmark(municipios=300, atraso_ms=50, conexoes=CONEXOES, lote=1, falha_a_cada=50):
+    """Coleta contra o servidor local: 1 conexão × ``conexoes``, e de novo com o cache em disco."""
+    raiz = Path(tempfile.mkdtemp(prefix='eaas-ingestao-'))
+    resultado = {'municipios': municipios, 'atraso_ms': atraso_ms, 'lote': lote}
+    try:
+        with ServidorLocal(municipios, atraso_ms, falha_a_cada) as servidor:
+            urls = {'url_sidra_base': servidor.url, 'url_localidades_base': servidor.url + '/api/v1/localidades'}
+
+            def rodar(rotulo, cache, n):
+                with Cliente(cache, conexoes=n, espera_s=0.01) as cliente:
+                    tabela, meta = coletar(servidor.uf, cliente=cliente, lote=lote, **urls)
+                resultado[rotulo] = {'ms': meta['ms'], **meta['contagem'], 'falhas': len(meta['falhas'])}
+                return tabela
+
+            # Serial só numa amostra de 1/10 dos municípios, extrapolada
+            with ServidorLocal(max(municipios // 10, 1), atraso_ms) as amostra:
+                with Cliente(None, conexoes=1) as cliente:
+                    _, meta = coletar(amostra.uf, cliente=cliente, lote=lote, url_sidra_base=amostra.url,
+                                      url_localidades_base=amostra.url + '/api/v1/localidades')
+                resultado['serial_estimado_ms'] = round(meta['ms'] * municipios / max(municipios // 10, 1), 1)
+            tabela = rodar('concorrente', CacheHttp(raiz), conexoes)
+            rodar('cache_fresco', CacheHttp(raiz), conexoes)
+            rodar('revalidacao_304', CacheHttp(raiz, ttl_h=0), conexoes)
+            resultado['linhas'] = len(tabela)
+    finally:
+        shutil.rmtree(raiz, ignore_errors=True)
+    return resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Indicadores municipais do IBGE/SIDRA")
+    sub = parser.add_subparsers(dest='comando', required=True)
+    coleta = sub.add_parser('coletar', help="Coleta e grava em data/ibge/")
+    coleta.add_argument('--uf', default=UF_PADRAO)
+    coleta.add_argument('--lote', type=int, default=LOTE)
+    coleta.add_argument('--conexoes', type=int, default=CONEXOES)
+    sub.add_parser('status', help="Última coleta gravada")
+    sub.add_parser('limpar', help="Descarta o cache HTTP em disco")
+    bench = sub.add_parser('benchmark', help="Coleta contra o servidor local")
+    bench.add_argument('--municipios', type=int, default=300)
+    bench.add_argument('--atraso-ms', type=int, default=50)
+    bench.add_argument('--conexoes', type=int, default=CONEXOES)
+    bench.add_argument('--lote', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    if args.comando == 'coletar':
+        with Cliente(CacheHttp(DIR_INGESTAO / 'http'), conexoes=args.conexoes) as cliente:
+            tabela, meta = coletar(args.uf, cliente=cliente, lote=args.lote)
+        print(salvar(tabela, meta))
+        print({chave: meta[chave] for chave in ('periodos', 'pedidos', 'ms', 'contagem')}, f"{len(meta['falhas'])} falhas")
+    elif args.comando == 'status':
+        for caminho in sorted(DIR_INGESTAO.glob('municipios_*.json')):
+            meta = json.loads(caminho.read_text(encoding='utf-8'))
+            print(f"{meta['uf']}: {meta['coletado_em']} {meta['periodos']} ({len(meta['falhas'])} falhas)")
+    elif args.comando == 'limpar':
+        CacheHttp(DIR_INGESTAO / 'http').limpar()
+    else:
+        print(benchmark(args.municipios, args.atraso_ms, args.conexoes, args.lote))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,394 @@
+"""Malhas territoriais simplificadas para o mapa coroplético.
+
+As malhas brutas do IBGE (dezenas de MB para os municípios) são preparadas
+uma única vez, offline: cada anel é simplificado por Douglas–Peucker em
+várias tolerâncias (``RESOLUCOES``, em graus), as coordenadas são
+quantizadas numa grade de ``BITS`` bits sobre a extensão da camada e
+gravadas em delta (int32) num ``data/geo/<camada>.npz`` comprimido.
+
+No dashboard, a resolução servida depende do recorte (o "zoom"): o país
+inteiro vai na mais grosseira, um estado na intermediária e um município
+na mais fina. ``escolher_resolucao`` pega a mais fina cujos vértices das
+feições visíveis cabem em ``MAX_VERTICES``, de modo que o que vai ao
+navegador não cresce com o detalhe da malha original::
+
+    python -m eaas.mapa baixar estados
+    python -m eaas.mapa baixar municipios_42
+    python -m eaas.mapa preparar malha.geojson --camada municipios_42
+    python -m eaas.mapa benchmark --feicoes 295 --vertices 4000
+"""
+import argparse
+import json
+import math
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from eaas.dados import DIR_DADOS
+from eaas.oportunidade import INDICADOR_SCORE, construir_motor, regiao_de, scores_regionais
+from eaas.regioes import CADASTRO
+
+DIR_GEO = Path(os.environ.get('EAAS_GEO_DIR', DIR_DADOS / 'geo'))
+
+URL_MALHAS = os.environ.get('EAAS_MALHAS_URL', 'https://servicodados.ibge.gov.br/api/v3/malhas')
+
+# Nome -> tolerância de simplificação (graus; 0,01° ≈ 1,1 km)
+RESOLUCOES = {'baixa': 0.05, 'media': 0.01, 'alta': 0.002}
+
+# Bits por coordenada quantizada (16: ~70 m no país inteiro, ~5 m num estado)
+BITS = 16
+
+# Vértices enviados ao navegador por mapa
+MAX_VERTICES = 60_000
+
+METRICAS = ['Mercado (R$ mi)', 'Ticket Médio (R$)', INDICADOR_SCORE]
+
+
+# ============================================================================
+# SIMPLIFICAÇÃO
+# ============================================================================
+
+def _douglas_peucker(pontos, tolerancia, fixos):
+    """Máscara dos pontos mantidos; ``fixos`` são índices que nunca saem (e dividem os trechos)."""
+    manter = np.zeros(len(pontos), dtype=bool)
+    manter[fixos] = True
+    pilha = list(zip(fixos[:-1], fixos[1:]))
+    while pilha:
+        i, j = pilha.pop()
+        if j <= i + 1:
+            continue
+        a, d = pontos[i], pontos[j] - pontos[i]
+        trecho = pontos[i + 1:j] - a
+        comprimento = math.hypot(d[0], d[1])
+        if comprimento == 0:
+            distancia = np.hypot(trecho[:, 0], trecho[:, 1])
+        else:
+            distancia = np.abs(d[0] * trecho[:, 1] - d[1] * trecho[:, 0]) / comprimento
+        k = int(distancia.argmax())
+        if distancia[k] > tolerancia:
+            k += i + 1
+            manter[k] = True
+            pilha += [(i, k), (k, j)]
+    return manter
+
+
+def _area(anel):
+    """Área com sinal (positiva no sentido anti-horário)."""
+    x, y = anel[:, 0], anel[:, 1]
+    return float(np.dot(x[:-1], y[1:]) - np.dot(x[1:], y[:-1])) / 2
+
+
+def simplificar_anel(anel, tolerancia):
+    """Anel fechado simplificado, ou None se colapsar (menos de 3 vértices distintos)."""
+    anel = np.asarray(anel, dtype=np.float64)
+    if len(anel) < 4:
+        return None
+    # O anel fechado é dividido no ponto mais distante do primeiro
+    oposto = int(np.hypot(*(anel - anel[0]).T).argmax())
+    if oposto in (0, len(anel) - 1):
+        return None
+    simplificado = anel[_douglas_peucker(anel, tolerancia, [0, oposto, len(anel) - 1])]
+    return simplificado if len(simplificado) >= 4 else None
+
+
+def _poligonos(geometria):
+    if geometria['type'] == 'Polygon':
+        return [geometria['coordinates']]
+    if geometria['type'] == 'MultiPolygon':
+        return geometria['coordinates']
+    return []
+
+
+def _quantizar(anel, origem, escala):
+    q = np.round((anel - origem) / escala).astype(np.int32)
+    # Pontos que caíram na mesma célula da grade viram um só
+    repetido = np.r_[False, (np.diff(q, axis=0) == 0).all(axis=1)]
+    return q[~repetido]
+
+
+def preparar(geojson, camada, campo='codarea', campo_nome=None, resolucoes=RESOLUCOES, diretorio=None):
+    """Simplifica e quantiza uma FeatureCollection em ``<camada>.npz``; retorna os vértices por resolução."""
+    feicoes = geojson['features']
+    codigos = [str(f.get('properties', {}).get(campo, f.get('id'))) for f in feicoes]
+    nomes = [str(f.get('properties', {}).get(campo_nome, '')) if campo_nome else '' for f in feicoes]
+    todos = np.concatenate([np.asarray(anel, dtype=np.float64)[:, :2]
+                            for f in feicoes for poligono in _poligonos(f['geometry']) for anel in poligono])
+    origem = todos.min(axis=0)
+    escala = np.maximum(todos.max(axis=0) - origem, 1e-9) / (2 ** BITS - 1)
+
+    arrays = {'codigos': np.array(codigos), 'nomes': np.array(nomes), 'origem': origem, 'escala': escala,
+              'resolucoes': np.array(list(resolucoes)), 'tolerancias': np.array(list(resolucoes.values()))}
+    vertices = {'original': len(todos)}
+    for nome, tolerancia in resolucoes.items():
+        aneis, meta = [], []
+        for indice, feicao in enumerate(feicoes):
+            poligonos = _poligonos(feicao['geometry'])
+            mantidos = []
+            for p, poligono in enumerate(poligonos):
+                for a, anel in enumerate(poligono):
+                    simplificado = simplificar_anel(np.asarray(anel)[:, :2], tolerancia)
+                    if simplificado is not None:
+                        mantidos.append((p, a, simplificado))
+            if not mantidos and poligonos:
+                # Feição inteira abaixo da tolerância: o maior contorno, com tolerância menor
+                p = max(range(len(poligonos)), key=lambda i: len(poligonos[i][0]))
+                anel, t = np.asarray(poligonos[p][0], dtype=np.float64)[:, :2], tolerancia
+                while not mantidos and t > 1e-7:
+                    t /= 4
+                    simplificado = simplificar_anel(anel, t)
+                    if simplificado is not None:
+                        mantidos.append((p, 0, simplificado))
+            for p, a, simplificado in mantidos:
+                # Sentido esperado pelo d3-geo (Plotly): contorno horário, buracos anti-horários
+                if (_area(simplificado) > 0) == (a == 0):
+                    simplificado = simplificado[::-1]
+                q = _quantizar(simplificado, origem, escala)
+                if len(q) >= 4:
+                    aneis.append(q)
+                    meta.append((indice, p, a > 0, len(q)))
+        xy = np.concatenate(aneis)
+        # Delta por anel: o primeiro ponto é absoluto
+        inicio = np.cumsum([0, *(len(anel) for anel in aneis[:-1])])
+        delta = np.diff(xy, axis=0, prepend=np.zeros((1, 2), np.int32))
+        delta[inicio] = xy[inicio]
+        arrays[f'xy_{nome}'] = delta.astype(np.int32)
+        arrays[f'aneis_{nome}'] = np.array(meta, dtype=np.int32)
+        vertices[nome] = len(xy)
+
+    destino = Path(diretorio or DIR_GEO)
+    destino.mkdir(parents=True, exist_ok=True)
+    caminho = destino / f'{camada}.npz'
+    temporario = destino / f'.{camada}.tmp.npz'
+    np.savez_compressed(temporario, **arrays)
+    os.replace(temporario, caminho)
+    return vertices
+
+
+# ============================================================================
+# LEITURA
+# ============================================================================
+
+class Camada:
+    """Malha preparada: códigos das feições e os anéis de cada resolução."""
+
+    def __init__(self, arquivo):
+        with np.load(arquivo) as dados:
+            self.codigos = [str(c) for c in dados['codigos']]
+            self.nomes = [str(n) for n in dados['nomes']]
+            self.tolerancias = dict(zip((str(r) for r in dados['resolucoes']), dados['tolerancias'].tolist()))
+            origem, escala = dados['origem'], dados['escala']
+            self._aneis = {}
+            for resolucao in self.tolerancias:
+                meta = dados[f'aneis_{resolucao}']
+                delta = dados[f'xy_{resolucao}'].astype(np.int64)
+                inicio = np.cumsum(np.r_[0, meta[:-1, 3]])
+                # Desfaz o delta anel a anel: soma acumulada reiniciada em cada início
+                absoluto = np.cumsum(delta, axis=0)
+                base = np.repeat(absoluto[inicio] - delta[inicio], meta[:, 3], axis=0)
+                xy = (absoluto - base) * escala + origem
+                self._aneis[resolucao] = (meta, np.split(xy, inicio[1:]))
+
+    @property
+    def resolucoes(self):
+        """Da mais grosseira para a mais fina."""
+        return sorted(self.tolerancias, key=self.tolerancias.get, reverse=True)
+
+    def _indices(self, prefixo):
+        return [i for i, codigo in enumerate(self.codigos) if prefixo is None or codigo.startswith(prefixo)]
+
+    def vertices(self, resolucao, prefixo=None):
+        meta, _ = self._aneis[resolucao]
+        visiveis = np.isin(meta[:, 0], self._indices(prefixo))
+        return int(meta[visiveis, 3].sum())
+
+    def geojson(self, resolucao, prefixo=None):
+        """FeatureCollection (MultiPolygon, ``id`` = código) das feições cujo código começa com ``prefixo``."""
+        meta, aneis = self._aneis[resolucao]
+        # Casas decimais compatíveis com a tolerância: mais que isso é só bytes
+        casas = max(2, math.ceil(-math.log10(self.tolerancias[resolucao])) + 1)
+        poligonos = {}
+        visiveis = set(self._indices(prefixo))
+        for (feicao, poligono, _, _), anel in zip(meta, aneis):
+            if feicao in visiveis:
+                poligonos.setdefault(feicao, {}).setdefault(poligono, []).append(anel.round(casas).tolist())
+        return {
+            'type': 'FeatureCollection',
+            'features': [
+                {'type': 'Feature', 'id': self.codigos[f],
+                 'geometry': {'type': 'MultiPolygon', 'coordinates': list(poligonos[f].values())}}
+                for f in sorted(poligonos)
+            ],
+        }
+
+
+def arquivo_camada(camada, diretorio=None):
+    return Path(diretorio or DIR_GEO) / f'{camada}.npz'
+
+
+def carregar_camada(camada, diretorio=None):
+    """Camada preparada, ou None se ainda não foi gerada."""
+    caminho = arquivo_camada(camada, diretorio)
+    return Camada(caminho) if caminho.exists() else None
+
+
+def camada_regiao(regiao):
+    """``(camada, prefixo do código)`` do recorte de ``regiao`` no cadastro."""
+    cadastro = CADASTRO[regiao]
+    if cadastro['nivel'] == 'UF':
+        return f"municipios_{cadastro['codigo']}", None
+    if cadastro['nivel'] == 'Município':
+        return f"municipios_{cadastro['codigo'] // 10_000}", str(cadastro['codigo'])
+    return 'estados', None
+
+
+def escolher_resolucao(camada, prefixo=None, max_vertices=MAX_VERTICES):
+    """Resolução mais fina cujas feições visíveis cabem em ``max_vertices``."""
+    cabem = [r for r in camada.resolucoes if camada.vertices(r, prefixo) <= max_vertices]
+    return cabem[-1] if cabem else camada.resolucoes[0]
+
+
+# ============================================================================
+# VALORES
+# ============================================================================
+
+def _regionais(fontes, metrica):
+    if metrica == INDICADOR_SCORE:
+        return scores_regionais(fontes)
+    return fontes['mercado'].set_index('Região')[metrica].astype(np.float64)
+
+
+def valores(fontes, camada, codigos, metrica, cubo=None, motor=None):
+    """Valor de ``metrica`` por código da camada.
+
+    Com o cubo de estabelecimentos cada município (ou UF) tem o seu; sem ele,
+    ou fora do cubo, vale o da entrada mais específica do cadastro que o contém.
+    O score é sempre o do motor (média ponderada pelo mercado): com o cubo,
+    só as feições do cubo têm score, pois o da matriz regional está em outra
+    escala. ``motor`` reaproveita um MotorOportunidade já montado sobre o mesmo cubo.
+    """
+    municipal = camada.startswith('municipios')
+    uf = np.array([int(c[:2]) for c in codigos])
+    municipio = np.array([int(c[:6]) if municipal else -1 for c in codigos])
+    resultado = pd.Series(_regionais(fontes, metrica).reindex(regiao_de(uf, municipio)).to_numpy(),
+                          index=codigos, name=metrica)
+    if cubo is not None:
+        motor = motor or construir_motor(fontes, cubo)
+        chave = cubo['Município' if municipal else 'UF'].to_numpy()
+        por = pd.DataFrame({
+            'chave': chave,
+            'Mercado': motor.matriz['Mercado'].to_numpy(),
+            'Estabelecimentos': cubo['Estabelecimentos'].to_numpy(np.float64),
+        }).groupby('chave').sum()
+        locais = {
+            'Mercado (R$ mi)': por['Mercado'] / 1e6,
+            'Ticket Médio (R$)': por['Mercado'] / (por['Estabelecimentos'] * 12),
+            INDICADOR_SCORE: motor.scores_por(chave),
+        }[metrica].reindex(municipio if municipal else uf).to_numpy()
+        if metrica == INDICADOR_SCORE:
+            return pd.Series(locais, index=codigos, name=metrica)
+        resultado = resultado.where(np.isnan(locais), locais)
+    return resultado
+
+
+# ============================================================================
+# DOWNLOAD E BENCHMARK
+# ============================================================================
+
+def url_malha(camada):
+    """Malha do IBGE (API de malhas v3) de ``estados`` ou ``municipios_<uf>``."""
+    formato = 'formato=application/vnd.geo+json&qualidade=maxima'
+    if camada == 'estados':
+        return f"{URL_MALHAS}/paises/BR?{formato}&intrarregiao=UF"
+    return f"{URL_MALHAS}/estados/{camada.split('_')[1]}?{formato}&intrarregiao=municipio"
+
+
+def baixar(camada, diretorio=None):
+    """Baixa a malha completa do IBGE e prepara a camada."""
+    import requests
+
+    resposta = requests.get(url_malha(camada), timeout=120)
+    resposta.raise_for_status()
+    return preparar(resposta.json(), camada, diretorio=diretorio)
+
+
+def geometria_sintetica(feicoes=295, vertices=4000, semente=0):
+    """Grade de feições com contornos serrilhados de ``vertices`` pontos (como malhas reais)."""
+    rng = np.random.default_rng(semente)
+    lado = math.ceil(math.sqrt(feicoes))
+    t = np.linspace(0, 2 * np.pi, vertices)
+    features = []
+    for i in range(feicoes):
+        cx, cy = -53 + (i % lado) * 0.3, -29 + (i // lado) * 0.3
+        raio = 0.12 + 0.02 * np.sin(5 * t) + np.cumsum(rng.normal(0, 0.0008, vertices))
+        raio -= np.linspace(0, raio[-1] - raio[0], vertices)  # fecha o anel
+        anel = np.column_stack([cx + raio * np.cos(t), cy + raio * np.sin(t)])
+        features.append({'type': 'Feature', 'properties': {'codarea': f'42{i:05d}'},
+                         'geometry': {'type': 'Polygon', 'coordinates': [anel.tolist()]}})
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+def benchmark(feicoes=295, vertices=4000):
+    """Tamanho e tempo de figura por resolução contra a malha sem simplificação."""
+    from eaas.artefatos import figura_mapa
+
+    geojson = geometria_sintetica(feicoes, vertices)
+    resultado = {'geojson_mb': round(len(json.dumps(geojson)) / 1024 ** 2, 1)}
+    with tempfile.TemporaryDirectory() as diretorio:
+        inicio = time.perf_counter()
+        contagem = preparar(geojson, 'sintetica', diretorio=diretorio)
+        resultado['preparar_s'] = round(time.perf_counter() - inicio, 2)
+        resultado['npz_kb'] = round(arquivo_camada('sintetica', diretorio).stat().st_size / 1024, 1)
+        inicio = time.perf_counter()
+        camada = carregar_camada('sintetica', diretorio)
+        resultado['carregar_ms'] = round((time.perf_counter() - inicio) * 1000, 1)
+
+    def medir(rotulo, colecao, n):
+        serie = pd.Series(np.arange(len(camada.codigos), dtype=np.float64), index=camada.codigos)
+        inicio = time.perf_counter()
+        payload = figura_mapa(colecao, serie, 'Valor').to_json()
+        resultado[rotulo] = {'vertices': n, 'payload_kb': round(len(payload) / 1024, 1),
+                             'figura_ms': round((time.perf_counter() - inicio) * 1000, 1)}
+
+    medir('original', geojson, contagem['original'])
+    for resolucao in camada.resolucoes:
+        medir(resolucao, camada.geojson(resolucao), contagem[resolucao])
+    resultado['automatica'] = escolher_resolucao(camada)
+    return resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Malhas simplificadas para o mapa coroplético")
+    sub = parser.add_subparsers(dest='comando', required=True)
+    baixa = sub.add_parser('baixar', help="Baixa a malha do IBGE e prepara a camada")
+    baixa.add_argument('camada', help="estados ou municipios_<uf> (ex.: municipios_42)")
+    prepara = sub.add_parser('preparar', help="Prepara uma camada a partir de um GeoJSON local")
+    prepara.add_argument('arquivo')
+    prepara.add_argument('--camada', required=True)
+    prepara.add_argument('--campo', default='codarea', help="Propriedade com o código IBGE")
+    prepara.add_argument('--campo-nome', default=None)
+    sub.add_parser('status', help="Camadas preparadas e vértices por resolução")
+    bench = sub.add_parser('benchmark', help="Simplificação de uma malha sintética")
+    bench.add_argument('--feicoes', type=int, default=295)
+    bench.add_argument('--vertices', type=int, default=4000)
+    args = parser.parse_args(argv)
+
+    if args.comando == 'baixar':
+        print(baixar(args.camada))
+    elif args.comando == 'preparar':
+        with open(args.arquivo, encoding='utf-8') as arquivo:
+            print(preparar(json.load(arquivo), args.camada, args.campo, args.campo_nome))
+    elif args.comando == 'status':
+        for caminho in sorted(DIR_GEO.glob('*.npz')):
+            camada = Camada(caminho)
+            contagem = {r: camada.vertices(r) for r in camada.resolucoes}
+            print(f"{caminho.stem}: {len(camada.codigos)} feições, vértices {contagem}")
+    else:
+        print(benchmark(args.feicoes, args.vertices))
+
+
+if __name__ == '__main__':
+    main()
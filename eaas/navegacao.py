@@ -0,0 +1,63 @@
+"""Navegação sob demanda entre as abas e medição do custo de cada uma.
+
+No modo sob demanda apenas a aba selecionada é executada e enviada ao
+navegador. O custo de cada renderização (tempo de parede e bytes de
+ForwardMsg enviados pelo websocket) fica registrado em ``st.session_state``.
+"""
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+import streamlit as st
+
+from eaas import perfil
+from eaas.perfil import contar_payload
+
+CHAVE_CUSTOS = 'custos_abas'
+
+
+@contextmanager
+def medir_aba(nome):
+    """Mede tempo e bytes enviados ao navegador pelo bloco ``with``."""
+    inicio = time.perf_counter()
+    try:
+        with perfil.medir('aba', nome), contar_payload() as payload:
+            yield
+    finally:
+        duracao_ms = (time.perf_counter() - inicio) * 1000
+        st.session_state.setdefault(CHAVE_CUSTOS, {})[nome] = {
+            'Tempo (ms)': round(duracao_ms, 1),
+            'Payload (KB)': round(payload.bytes / 1024, 1),
+        }
+
+
+def renderizar_abas(abas, todas=False):
+    """Renderiza as abas: só a ativa (padrão) ou todas via ``st.tabs``."""
+    if todas:
+        for aba, (nome, render) in zip(st.tabs(list(abas)), abas.items()):
+            with aba, medir_aba(nome):
+                render()
+        return list(abas)
+
+    ativa = st.radio(
+        "Navegação", list(abas), horizontal=True,
+        key='aba_ativa', label_visibility='collapsed'
+    )
+    with medir_aba(ativa):
+        abas[ativa]()
+    return [ativa]
+
+
+def painel_custos(renderizadas):
+    """Mostra o custo das abas renderizadas neste rerun e nos anteriores."""
+    custos = st.session_state.get(CHAVE_CUSTOS, {})
+    if not custos:
+        return
+    df = pd.DataFrame.from_dict(custos, orient='index')
+    df['Neste rerun'] = df.index.isin(renderizadas)
+    atual = df[df['Neste rerun']]
+    st.caption(
+        f"Rerun atual: {atual['Tempo (ms)'].sum():.0f} ms · "
+        f"{atual['Payload (KB)'].sum():.1f} KB"
+    )
+    st.dataframe(df, use_container_width=True)
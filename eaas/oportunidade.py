@@ -0,0 +1,267 @@
+"""Score de oportunidade ponderado para localidades × segmentos.
+
+Cada linha da matriz é um par localidade × segmento com as dimensões que o
+KPI já acompanha: HHI, adoção de tecnologia, elasticidade-preço, barreira
+de entrada, crescimento e tamanho do mercado (receita anual potencial do
+segmento). As colunas são normalizadas uma única vez para [0, 1] no
+sentido "maior é melhor"; o score de um vetor de pesos é um produto
+matriz × vetor e o top-K sai de ``np.argpartition`` (seleção parcial, O(n)),
+ordenando só as K linhas escolhidas.
+
+Com o cubo de estabelecimentos (eaas.agregacao) cada município entra com
+seus segmentos e herda as dimensões regionais da entrada mais específica do
+cadastro que o contém (o próprio município, a UF ou o país). Sem o cubo, a
+matriz usa as segmentações regionais de ``data/``. O 'Score Oportunidade' de
+cada região (``kpi_com_score``, mostrado nas páginas regionais) é a média
+dos scores dos seus segmentos nessa matriz, ponderada pelo mercado::
+
+    python -m eaas.oportunidade ranking --k 10 --peso Mercado=3 --peso HHI=2
+    python -m eaas.oportunidade benchmark --municipios 5570
+"""
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from eaas.concentracao import kpi_com_hhi
+from eaas.dimensionamento import COL_QTD, COL_TICKET, segmentacao_longa
+from eaas.regioes import CADASTRO
+
+# Dimensão: (indicador do KPI ou coluna do mercado, sentido: +1 maior é melhor, -1 menor é melhor)
+DIMENSOES = {
+    'HHI': ('HHI Index', -1),
+    'Adoção Tech': ('Taxa Adoção Tech', 1),
+    'Elasticidade': ('Elasticidade-Preço', 1),
+    'Barreira': ('Barreira Entrada', -1),
+    'Crescimento': ('Crescimento Anual', 1),
+    'Mercado': ('Mercado Anual (R$)', 1),
+}
+
+PESOS_PADRAO = {'HHI': 2, 'Adoção Tech': 1, 'Elasticidade': 1, 'Barreira': 2, 'Crescimento': 2, 'Mercado': 3}
+
+TOP_K = 10
+
+# Linha do KPI preenchida por ``kpi_com_score``
+INDICADOR_SCORE = 'Score Oportunidade'
+
+
+def _dimensoes_regionais(fontes):
+    """Uma linha por região do cadastro com as dimensões (exceto mercado)."""
+    kpi = kpi_com_hhi(fontes).set_index('Indicador')
+    mercado = fontes['mercado'].set_index('Região')
+    regioes = list(CADASTRO)
+    dados = {nome: kpi.loc[indicador, regioes].to_numpy(np.float64)
+             for nome, (indicador, _) in DIMENSOES.items() if indicador in kpi.index}
+    dados['Crescimento'] = mercado.loc[regioes, 'Crescimento Anual'].to_numpy(np.float64)
+    return pd.DataFrame(dados, index=regioes)
+
+
+def matriz_regional(fontes):
+    """Matriz a partir das segmentações regionais: uma linha por região × segmento."""
+    longa = segmentacao_longa(fontes)
+    regiao = longa['Região'].astype(str).to_numpy()
+    dimensoes = _dimensoes_regionais(fontes).loc[regiao].reset_index(drop=True)
+    return pd.concat([
+        pd.DataFrame({'Localidade': regiao, 'Segmento': longa['Segmento'].astype(str).to_numpy()}),
+        dimensoes,
+        pd.DataFrame({'Mercado': longa[COL_QTD].to_numpy(np.float64)
+                      * longa[COL_TICKET].to_numpy(np.float64) * 12}),
+    ], axis=1)
+
+
+def regiao_de(uf, municipio):
+    """Entrada mais específica do cadastro que contém cada município."""
+    regiao = np.full(len(municipio), None, dtype=object)
+    for nivel in (None, 'UF', 'Município'):
+        for nome, c in CADASTRO.items():
+            if c['nivel'] != nivel:
+                continue
+            if nivel is None:
+                regiao[:] = nome
+            else:
+                regiao[(uf if nivel == 'UF' else municipio) == c['codigo']] = nome
+    return regiao
+
+
+def matriz_municipios(cubo, fontes):
+    """Matriz a partir do cubo: uma linha por município × segmento.
+
+    O tamanho do mercado é Estabelecimentos × ticket do segmento na região
+    de referência (ou a mediana dos tickets, se o segmento não estiver lá).
+    """
+    municipio = cubo['Município'].to_numpy()
+    regiao = regiao_de(cubo['UF'].to_numpy(), municipio)
+    segmento = cubo['Segmento'].astype(str).to_numpy()
+
+    longa = segmentacao_longa(fontes)
+    tickets = pd.Series(longa[COL_TICKET].to_numpy(np.float64),
+                        index=pd.MultiIndex.from_arrays([longa['Região'].astype(str), longa['Segmento'].astype(str)]))
+    ticket = tickets.reindex(pd.MultiIndex.from_arrays([regiao, segmento])).to_numpy()
+    ticket = np.where(np.isnan(ticket), np.nanmedian(tickets.to_numpy()), ticket)
+
+    dimensoes = _dimensoes_regionais(fontes).loc[regiao].reset_index(drop=True)
+    return pd.concat([
+        pd.DataFrame({'Localidade': [f"Município {m}" for m in municipio], 'Segmento': segmento}),
+        dimensoes,
+        pd.DataFrame({'Mercado': cubo['Estabelecimentos'].to_numpy(np.float64) * ticket * 12}),
+    ], axis=1)
+
+
+def _normalizar(coluna, sentido):
+    if sentido > 0 and coluna.min() >= 0 and coluna.max() > 1e3:
+        # Tamanhos de mercado variam em ordens de grandeza
+        coluna = np.log1p(coluna)
+    minimo, maximo = coluna.min(), coluna.max()
+    if maximo == minimo:
+        return np.full(len(coluna), 0.5)
+    normalizada = (coluna - minimo) / (maximo - minimo)
+    return normalizada if sentido > 0 else 1 - normalizada
+
+
+class MotorOportunidade:
+    """Matriz normalizada pronta para pontuar qualquer vetor de pesos."""
+
+    def __init__(self, matriz):
+        self.matriz = matriz.reset_index(drop=True)
+        self.dimensoes = [d for d in DIMENSOES if d in self.matriz.columns]
+        self.normalizada = np.column_stack([
+            _normalizar(self.matriz[d].to_numpy(np.float64), DIMENSOES[d][1]) for d in self.dimensoes
+        ])
+
+    def __len__(self):
+        return len(self.matriz)
+
+    def vetor(self, pesos=None):
+        """Pesos na ordem das dimensões, somando 1 (ausentes valem 0)."""
+        pesos = PESOS_PADRAO if pesos is None else pesos
+        w = np.array([float(pesos.get(d, 0)) for d in self.dimensoes])
+        return w / w.sum() if w.sum() > 0 else np.full(len(w), 1 / len(w))
+
+    def scores(self, pesos=None):
+        """Score 0–100 de todas as linhas."""
+        return self.normalizada @ self.vetor(pesos) * 100
+
+    def scores_por(self, chaves, pesos=None):
+        """Score 0–100 por chave (ex.: localidade): média das linhas ponderada pelo mercado."""
+        mercado = self.matriz['Mercado'].to_numpy(np.float64)
+        grupos = pd.DataFrame({'chave': chaves, 'Ponderado': self.scores(pesos) * mercado, 'Mercado': mercado})
+        grupos = grupos.groupby('chave', sort=False)[['Ponderado', 'Mercado']].sum()
+        return grupos['Ponderado'] / grupos['Mercado']
+
+    def top(self, k=TOP_K, pesos=None):
+        """As ``k`` linhas de maior score, em ordem, sem ordenar a matriz inteira."""
+        score = self.scores(pesos)
+        k = min(k, len(score))
+        if k <= 0:
+            return self.matriz.iloc[:0].assign(Score=[])
+        escolhidos = np.argpartition(-score, k - 1)[:k]
+        # Empates ficam na ordem da matriz
+        escolhidos = escolhidos[np.lexsort((escolhidos, -score[escolhidos]))]
+        ranking = self.matriz.iloc[escolhidos].reset_index(drop=True)
+        ranking.insert(0, 'Score', score[escolhidos].round(1))
+        ranking.insert(0, 'Posição', np.arange(1, k + 1))
+        return ranking
+
+
+def construir_motor(fontes, cubo=None):
+    """Motor sobre o cubo de municípios, se houver, ou sobre as segmentações regionais."""
+    matriz = matriz_regional(fontes) if cubo is None else matriz_municipios(cubo, fontes)
+    return MotorOportunidade(matriz)
+
+
+def scores_regionais(fontes, pesos=None, motor=None):
+    """Score de cada região do cadastro sobre a matriz regional (``motor`` já montado sobre ela, se houver)."""
+    motor = motor or construir_motor(fontes)
+    return motor.scores_por(motor.matriz['Localidade'].to_numpy(), pesos).reindex(list(CADASTRO))
+
+
+def kpi_com_score(fontes, kpi=None):
+    """Cópia de ``kpi`` com a linha 'Score Oportunidade' calculada pelo motor com ``PESOS_PADRAO``."""
+    kpi = (fontes['kpi'] if kpi is None else kpi).copy()
+    kpi = kpi[kpi['Indicador'] != INDICADOR_SCORE]
+    linha = {'Indicador': INDICADOR_SCORE, **scores_regionais(fontes).round(1).to_dict()}
+    return pd.concat([kpi, pd.DataFrame([linha])], ignore_index=True)
+
+
+def cubo_sintetico(municipios=5570, semente=0):
+    """Cubo com ``municipios`` municípios × todos os segmentos (contagens aleatórias)."""
+    from eaas.agregacao import SEGMENTOS
+
+    rng = np.random.default_rng(semente)
+    nomes = [s[0] for s in SEGMENTOS]
+    codigo = np.repeat(110001 + np.arange(municipios) * 7, len(nomes)) % 530000
+    return pd.DataFrame({
+        'UF': codigo // 10_000,
+        'Município': codigo,
+        'Segmento': pd.Categorical(np.tile(nomes, municipios), categories=nomes),
+        'Estabelecimentos': rng.geometric(0.01, len(codigo)),
+    })
+
+
+def benchmark(municipios=5570, k=TOP_K, consultas=200, semente=0):
+    """Tempo de montar o motor e de cada consulta top-K com pesos aleatórios."""
+    from eaas.dados import carregar_fontes
+
+    fontes = carregar_fontes()
+    cubo = cubo_sintetico(municipios, semente)
+    inicio = time.perf_counter()
+    motor = construir_motor(fontes, cubo)
+    montagem = (time.perf_counter() - inicio) * 1000
+
+    rng = np.random.default_rng(semente)
+    tempos, ordenacao = [], []
+    for _ in range(consultas):
+        pesos = dict(zip(motor.dimensoes, rng.integers(0, 10, len(motor.dimensoes))))
+        inicio = time.perf_counter()
+        motor.top(k, pesos)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+        # Referência: ordenação completa dos scores
+        inicio = time.perf_counter()
+        np.argsort(-motor.scores(pesos), kind='stable')[:k]
+        ordenacao.append((time.perf_counter() - inicio) * 1000)
+    return {
+        'linhas': len(motor),
+        'montagem_ms': round(montagem, 1),
+        'top_k_ms': round(float(np.median(tempos)), 3),
+        'ordenacao_completa_ms': round(float(np.median(ordenacao)), 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ranking de oportunidade por localidade × segmento")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    rank = sub.add_parser('ranking', help="Top-K com os pesos informados")
+    rank.add_argument('--k', type=int, default=TOP_K)
+    rank.add_argument('--peso', action='append', default=[], metavar='DIMENSAO=PESO',
+                      help=f"Dimensões: {', '.join(DIMENSOES)}")
+    rank.add_argument('--cubos', type=Path, default=None,
+                      help="Diretório do cubo de estabelecimentos (padrão: EAAS_CUBOS_DIR ou data/cubos)")
+
+    bench = sub.add_parser('benchmark', help="Montagem do motor e consultas top-K num cubo sintético")
+    bench.add_argument('--municipios', type=int, default=5570)
+    bench.add_argument('--k', type=int, default=TOP_K)
+    bench.add_argument('--consultas', type=int, default=200)
+
+    args = parser.parse_args(argv)
+
+    if args.comando == 'ranking':
+        from eaas.agregacao import carregar_cubo
+        from eaas.dados import carregar_fontes
+
+        pesos = dict(PESOS_PADRAO)
+        for item in args.peso:
+            nome, valor = item.split('=', 1)
+            if nome not in DIMENSOES:
+                parser.error(f"dimensão desconhecida: {nome}")
+            pesos[nome] = float(valor)
+        motor = construir_motor(carregar_fontes(), carregar_cubo(args.cubos))
+        print(motor.top(args.k, pesos).to_string(index=False))
+    else:
+        print(benchmark(args.municipios, args.k, args.consultas))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+"""Página regional única, guiada pelo cadastro de ``eaas.regioes``.
+
+Um seletor escolhe a região e só ela é montada e enviada ao navegador; os
+artefatos de cada região ficam em cache por versão dos dados. O custo de um
+rerun não depende de quantas regiões estão cadastradas.
+
+A página (``pagina_regiao``) e a seção de segmentação são ``st.fragment``:
+trocar a região reexecuta só a página e mexer no controle da segmentação
+refaz só os gráficos dessa seção, sem rodar o script inteiro. O simulador
+de preço também é um fragmento e cada movimento de slider é só uma consulta
+às curvas de demanda pré-calculadas (eaas.elasticidade).
+"""
+import streamlit as st
+
+from eaas import formatacao as fmt, perfil
+from eaas.artefatos import GRAFICOS_REGIAO
+from eaas.cache import obter_artefatos, obter_curvas, obter_segmentacao
+from eaas.concentracao import classificar_hhi, rotulo_hhi
+from eaas.dimensionamento import COL_RECEITA, COL_TICKET, REFERENCIA
+from eaas.elasticidade import GRADE_MAX, GRADE_MIN
+from eaas.regioes import CADASTRO, classificar_barreira, classificar_oportunidade
+from eaas.tabela import tabela_paginada
+
+
+def seletor_regiao(chave='regiao'):
+    """Selectbox com as regiões cadastradas."""
+    return st.selectbox(
+        "Região", list(CADASTRO), key=chave,
+        format_func=lambda nome: f"{CADASTRO[nome]['icone']} {nome}",
+    )
+
+
+def metricas_regiao(indicadores, regiao):
+    """Linha de métricas principais da região."""
+    linha = indicadores['regioes'].loc[regiao]
+    kpi = indicadores['kpi'].set_index('Indicador')[regiao]
+    if regiao == REFERENCIA:
+        delta_empresas = f"{fmt.percentual(linha['Taxa Penetração'])} penetração"
+    else:
+        delta_empresas = f"{fmt.razao(linha['Razão Empresas'])} {REFERENCIA}"
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Empresas Alvo", fmt.numero(linha['Empresas Alvo']), delta_empresas)
+    col2.metric("Mercado Potencial", fmt.moeda_abreviada(linha['Mercado (R$)']), "Anual")
+    col3.metric("Ticket Médio", fmt.moeda(linha['Ticket Médio (R$)']),
+                f"{fmt.numero(kpi['Elasticidade-Preço'], 2)} elasticidade")
+    col4.metric("Oportunidade", f"{kpi['Score Oportunidade']:.0f}/100",
+                classificar_oportunidade(kpi['Score Oportunidade']))
+
+
+def _swot(swot):
+    col1, col2 = st.columns(2)
+    with col1:
+        st.success("**Forças**")
+        for i, forca in enumerate(swot['Forças'], 1):
+            st.write(f"{i}. {forca}")
+        st.error("**Fraquezas**")
+        for i, fraqueza in enumerate(swot['Fraquezas'], 1):
+            st.write(f"{i}. {fraqueza}")
+    with col2:
+        st.info("**Oportunidades**")
+        for i, oportunidade in enumerate(swot['Oportunidades'], 1):
+            st.write(f"{i}. {oportunidade}")
+        st.warning("**Ameaças**")
+        for i, ameaca in enumerate(swot['Ameaças'], 1):
+            st.write(f"{i}. {ameaca}")
+
+
+# Segmentos exibidos por padrão quando a tabela é grande
+MAX_SEGMENTOS = 10
+
+
+@st.fragment
+def _segmentacao(fontes, versao, regiao):
+    cadastro = CADASTRO[regiao]
+    dataframe = perfil.envolver(st.dataframe, 'dataframe')
+    plotly_chart = perfil.envolver(st.plotly_chart, 'plotly_chart')
+
+    total = len(obter_artefatos(fontes, regiao, versao)['df_segmentacao'])
+    maiores = total
+    if total > 1:
+        maiores = st.slider("Segmentos de maior receita", 1, total, min(total, MAX_SEGMENTOS),
+                            key=f"{cadastro['chave']}_segmentos")
+    art = obter_segmentacao(fontes, regiao, versao, maiores)
+    dataframe(art['df_segmentacao'], use_container_width=True)
+
+    graficos = [(titulo, chave) for titulo, chave in GRAFICOS_REGIAO if chave in art]
+    for inicio in range(0, len(graficos), 2):
+        for col, (titulo, chave) in zip(st.columns(2), graficos[inicio:inicio + 2]):
+            with col:
+                st.subheader(titulo)
+                plotly_chart(art[chave], use_container_width=True)
+
+
+@st.fragment
+def _simulador(fontes, versao, regiao):
+    cadastro = CADASTRO[regiao]
+    curvas = obter_curvas(fontes, versao)
+    segmentos = curvas.segmentos(regiao)
+    elasticidade = curvas.elasticidade_regiao(regiao)
+    st.caption(
+        f"Elasticidade-preço ε = {fmt.numero(elasticidade, 2)}: clientes = Qtd. Estimada × "
+        f"(preço / ticket atual)^ε. Preços entre {GRADE_MIN:.0%} e {GRADE_MAX:.0%} do ticket atual."
+    )
+
+    # Sliders para os segmentos de maior receita; os demais ficam no ticket atual
+    maiores = segmentos.nlargest(MAX_SEGMENTOS, COL_RECEITA)
+    colunas = st.columns(min(len(maiores), 4))
+    precos = {}
+    for i, (segmento, ticket) in enumerate(zip(maiores['Segmento'], maiores[COL_TICKET])):
+        precos[segmento] = colunas[i % len(colunas)].slider(
+            f"{segmento} (R$/mês)", int(ticket * GRADE_MIN), int(ticket * GRADE_MAX), int(ticket),
+            step=max(1, int(ticket // 100)), key=f"{cadastro['chave']}_preco_{i}",
+        )
+    projecao = curvas.projetar(regiao, precos)
+
+    total = projecao.sum(numeric_only=True)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Clientes Projetados", fmt.numero(total['Clientes Projetados']),
+                fmt.numero(total['Clientes Projetados'] - total['Clientes Atuais']))
+    col2.metric("Receita Mensal", fmt.moeda_abreviada(total[COL_RECEITA]),
+                fmt.variacao((total[COL_RECEITA] / total['Receita Atual (R$)'] - 1) * 100))
+    atual, projetada = curvas.participacao(regiao, projecao)
+    col3.metric("Participação de Mercado", fmt.percentual(projetada, 2),
+                f"{fmt.numero(projetada - atual, 2)} pp")
+    if curvas.excede_mercado(regiao):
+        st.warning(
+            f"A segmentação de {regiao} soma {fmt.moeda_abreviada(total['Receita Atual (R$)'] * 12)}/ano, "
+            "acima do 'Mercado (R$ mi)' da região: a participação fica limitada a 100%."
+        )
+    perfil.envolver(st.dataframe, 'dataframe')(projecao, use_container_width=True, hide_index=True)
+
+
+def _kpis(indicadores, regiao):
+    kpi = indicadores['kpi'].set_index('Indicador')[regiao]
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric(f"Índice {rotulo_hhi(regiao)}", fmt.numero(kpi['HHI Index']),
+                  classificar_hhi(kpi['HHI Index']))
+        st.metric("Taxa Adoção Tecnologia", fmt.percentual(kpi['Taxa Adoção Tech'], 0))
+        st.metric("Elasticidade-Preço", fmt.numero(kpi['Elasticidade-Preço'], 2))
+    with col2:
+        st.metric("Barreira de Entrada", f"{fmt.numero(kpi['Barreira Entrada'], 1)}/5",
+                  classificar_barreira(kpi['Barreira Entrada']))
+        st.metric("Score Oportunidade", f"{kpi['Score Oportunidade']:.0f}/100",
+                  classificar_oportunidade(kpi['Score Oportunidade']))
+
+
+def renderizar_regiao(fontes, versao, indicadores, regiao, compacta=False):
+    """Página de uma região; ``compacta`` mostra só métricas e concorrentes."""
+    cadastro = CADASTRO[regiao]
+    art = obter_artefatos(fontes, regiao, versao)
+    dataframe = perfil.envolver(st.dataframe, 'dataframe')
+    plotly_chart = perfil.envolver(st.plotly_chart, 'plotly_chart')
+
+    st.header(f"{cadastro['icone']} {cadastro['titulo']}")
+    metricas_regiao(indicadores, regiao)
+
+    st.markdown("---")
+
+    if 'df_cidades' in art and not compacta:
+        st.subheader("📍 Principais Cidades Econômicas")
+        dataframe(art['df_cidades'], use_container_width=True)
+        st.markdown("---")
+
+    st.subheader("🏢 Análise Competitiva - Principais Concorrentes")
+    tabela_paginada(art['tab_concorrentes'], f"{cadastro['chave']}_concorrentes")
+    if compacta:
+        return
+
+    st.subheader("💲 Faixa de Preço por Concorrente (R$/mês)")
+    plotly_chart(art['fig_precos'], use_container_width=True)
+
+    st.markdown("---")
+
+    st.subheader("📊 Segmentação de Clientes")
+    _segmentacao(fontes, versao, regiao)
+
+    st.markdown("---")
+
+    st.subheader("🧮 Simulador de Preço (What-if)")
+    _simulador(fontes, versao, regiao)
+
+    if 'swot' in art:
+        st.markdown("---")
+        st.subheader(f"🎯 Análise SWOT - {regiao}")
+        _swot(art['swot'])
+
+    st.markdown("---")
+
+    st.subheader("📈 Indicadores-Chave de Performance (KPIs)")
+    _kpis(indicadores, regiao)
+
+
+@st.fragment
+def pagina_regiao(fontes, versao, indicadores):
+    """Seletor e página da região, reexecutados sem o restante do script."""
+    renderizar_regiao(fontes, versao, indicadores, seletor_regiao())
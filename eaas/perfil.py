@@ -0,0 +1,259 @@
+"""Perfil opcional do dashboard: tempo, alocações e payload por trecho.
+
+Ligado pelo ambiente: ``EAAS_PERFIL=1`` mede todos os reruns e
+``EAAS_PERFIL=url`` só as sessões abertas com ``?perfil=1``. Sem a
+variável, o parâmetro da URL é ignorado (um visitante não consegue deixar
+o servidor mais lento). Quando ligado, cada aba, cada construção de figura, cada ``st.dataframe`` e cada
+``st.plotly_chart`` vira um registro com tempo de parede, memória retida
+(variação do tamanho atual do ``tracemalloc``) e bytes de ForwardMsg
+enviados ao navegador. Os registros
+do último rerun aparecem num painel da barra lateral e podem ser baixados
+como métricas no formato Prometheus ou JSON lines; com ``EAAS_PERFIL_ARQUIVO``
+cada rerun também é acrescentado a esse arquivo JSONL.
+
+Desligado, ``envolver`` devolve a própria função do Streamlit e ``medir`` e
+``instrumentado`` só consultam uma ``ContextVar``: o custo é desprezível.
+O Streamlit só é importado quando há algo a mostrar, então os módulos
+instrumentados (eaas.artefatos) continuam usáveis fora do dashboard.
+
+O ``tracemalloc`` é global ao processo: fica ligado enquanto houver algum
+``Perfil`` aberto (contagem sob trava) e é desligado pelo último, mesmo
+que o rerun termine por ``st.rerun()`` ou exceção antes de ``finalizar``.
+Por isso não há pico por trecho (``reset_peak`` zeraria o das outras
+sessões) e, com sessões simultâneas, a memória retida inclui o que as
+outras threads alocaram no mesmo intervalo.
+"""
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import pandas as pd
+
+CHAVE_PERFIL = 'perfil_registros'
+
+_ATUAL = ContextVar('perfil', default=None)
+
+# Perfis abertos em todas as sessões; o tracemalloc só é desligado pelo último
+_TRAVA = threading.Lock()
+_usuarios = 0
+_ligado_aqui = False
+
+
+def _reservar_tracemalloc():
+    global _usuarios, _ligado_aqui
+    with _TRAVA:
+        if _usuarios == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _ligado_aqui = True
+        _usuarios += 1
+
+
+def _liberar_tracemalloc():
+    global _usuarios, _ligado_aqui
+    with _TRAVA:
+        _usuarios -= 1
+        # Quem ligou o tracemalloc por fora (python -X tracemalloc) continua com ele
+        if _usuarios == 0 and _ligado_aqui:
+            tracemalloc.stop()
+            _ligado_aqui = False
+
+
+@contextmanager
+def contar_payload():
+    """Conta os bytes de ForwardMsg enfileirados pelo bloco ``with`` (``.bytes``)."""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    enviar = getattr(ctx, '_enqueue', None)
+    contador = _Contador()
+
+    if enviar is not None:
+        def _contar(msg):
+            contador.bytes += msg.ByteSize()
+            enviar(msg)
+        ctx._enqueue = _contar
+    try:
+        yield contador
+    finally:
+        if enviar is not None:
+            ctx._enqueue = enviar
+
+
+class _Contador:
+    bytes = 0
+
+
+class Perfil:
+    """Registros de um rerun."""
+
+    def __init__(self):
+        self.registros = []
+        self._pilha = []
+        self._chamadas = {}
+        _reservar_tracemalloc()
+        # Libera na primeira entre encerrar() e a coleta do objeto (rerun interrompido)
+        self._liberar = weakref.finalize(self, _liberar_tracemalloc)
+
+    def secao_atual(self):
+        return self._pilha[-1] if self._pilha else ''
+
+    @contextmanager
+    def medir(self, tipo, nome, **extras):
+        memoria = tracemalloc.get_traced_memory()[0]
+        self._pilha.append(nome)
+        inicio = time.perf_counter()
+        try:
+            with contar_payload() as payload:
+                yield
+        finally:
+            duracao_ms = (time.perf_counter() - inicio) * 1000
+            self._pilha.pop()
+            self.registros.append({
+                'tipo': tipo,
+                'nome': nome,
+                'tempo_ms': round(duracao_ms, 2),
+                'alocado_kb': round((tracemalloc.get_traced_memory()[0] - memoria) / 1024, 1),
+                'payload_kb': round(payload.bytes / 1024, 1),
+                **extras,
+            })
+
+    def rotulo(self, tipo):
+        """Nome da próxima chamada de ``tipo`` dentro da seção atual (ex.: 'Brasil · dataframe 2')."""
+        chave = (self.secao_atual(), tipo)
+        self._chamadas[chave] = self._chamadas.get(chave, 0) + 1
+        return f"{chave[0]} · {tipo} {self._chamadas[chave]}".lstrip(' ·')
+
+    def encerrar(self):
+        self._liberar()
+        return self.registros
+
+
+def ativo():
+    """``EAAS_PERFIL=1`` liga para todos; ``EAAS_PERFIL=url`` só com ``?perfil=1``."""
+    modo = os.environ.get('EAAS_PERFIL', '')
+    if modo == 'url':
+        import streamlit as st
+
+        return st.query_params.get('perfil', '') not in ('', '0')
+    return modo not in ('', '0')
+
+
+def iniciar():
+    """Começa o perfil do rerun se estiver ativo; devolve o ``Perfil`` ou ``None``."""
+    anterior = _ATUAL.get()
+    if anterior is not None:
+        # O rerun anterior desta thread não chegou a finalizar (st.rerun ou exceção)
+        anterior.encerrar()
+    perfil = Perfil() if ativo() else None
+    _ATUAL.set(perfil)
+    return perfil
+
+
+def medir(tipo, nome, **extras):
+    """Context manager que registra o bloco no perfil ativo (ou não faz nada)."""
+    perfil = _ATUAL.get()
+    if perfil is None:
+        return _NADA
+    return perfil.medir(tipo, nome, **extras)
+
+
+class _Nada:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NADA = _Nada()
+
+
+def instrumentado(tipo):
+    """Decorador: registra cada chamada da função quando há perfil ativo."""
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            perfil = _ATUAL.get()
+            if perfil is None:
+                return funcao(*args, **kwargs)
+            nome = f"{perfil.secao_atual()} · {funcao.__name__}".lstrip(' ·')
+            with perfil.medir(tipo, nome):
+                return funcao(*args, **kwargs)
+        return envolvida
+    return decorador
+
+
+def envolver(funcao, tipo):
+    """Versão medida de um comando do Streamlit (ex.: ``st.dataframe``) para este rerun."""
+    perfil = _ATUAL.get()
+    if perfil is None:
+        return funcao
+
+    @functools.wraps(funcao)
+    def envolvida(dados=None, *args, **kwargs):
+        extras = {'linhas': len(dados)} if isinstance(dados, pd.DataFrame) else {}
+        with perfil.medir(tipo, perfil.rotulo(tipo), **extras):
+            return funcao(dados, *args, **kwargs)
+    return envolvida
+
+
+def prometheus(registros):
+    """Registros no formato de exposição de texto do Prometheus."""
+    metricas = {
+        'tempo_ms': "Tempo de parede do trecho (ms)",
+        'alocado_kb': "Variação do tamanho atual do tracemalloc no trecho, global ao processo (KB)",
+        'payload_kb': "Bytes de ForwardMsg enviados ao navegador (KB)",
+    }
+    linhas = []
+    for campo, ajuda in metricas.items():
+        linhas.append(f"# HELP eaas_{campo} {ajuda}")
+        linhas.append(f"# TYPE eaas_{campo} gauge")
+        for r in registros:
+            nome = r['nome'].replace('\\', '\\\\').replace('"', '\\"')
+            linhas.append(f'eaas_{campo}{{tipo="{r["tipo"]}",nome="{nome}"}} {r[campo]}')
+    return '\n'.join(linhas) + '\n'
+
+
+def jsonl(registros):
+    return ''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in registros)
+
+
+def finalizar(perfil):
+    """Encerra o perfil do rerun, guarda os registros e grava o JSONL se configurado."""
+    import streamlit as st
+
+    _ATUAL.set(None)
+    registros = perfil.encerrar()
+    st.session_state[CHAVE_PERFIL] = registros
+    arquivo = os.environ.get('EAAS_PERFIL_ARQUIVO')
+    if arquivo:
+        carimbo = time.time()
+        with open(arquivo, 'a', encoding='utf-8') as f:
+            f.write(jsonl([{'ts': carimbo, **r} for r in registros]))
+    return registros
+
+
+def painel(registros):
+    """Tabela dos registros do rerun e botões de exportação."""
+    import streamlit as st
+
+    if not registros:
+        st.caption("Nenhum trecho medido neste rerun.")
+        return
+    df = pd.DataFrame(registros)
+    abas = df[df['tipo'] == 'aba']
+    st.caption(
+        f"{len(df)} trechos · abas: {abas['tempo_ms'].sum():.0f} ms, "
+        f"{abas['payload_kb'].sum():.1f} KB. 'alocado_kb' é a variação da memória rastreada "
+        "pelo processo inteiro: com outras sessões ativas inclui o que elas alocaram."
+    )
+    st.dataframe(df, use_container_width=True, hide_index=True)
+    col1, col2 = st.columns(2)
+    col1.download_button("Prometheus", prometheus(registros), "eaas_perfil.prom", "text/plain")
+    col2.download_button("JSONL", jsonl(registros), "eaas_perfil.jsonl", "application/jsonl")
@@ -0,0 +1,183 @@
+"""Projeção plurianual do mercado por região e segmento.
+
+O mercado de cada região (``Mercado (R$ mi)`` de mercado_data) é repartido
+entre os segmentos na proporção da receita potencial de cada um (Qtd.
+Estimada × Ticket Médio) e cresce a juros compostos pela taxa anual da
+região. O cubo região × segmento × período sai de uma única operação
+vetorizada::
+
+    cubo = base[:, :, None] * (1 + taxa[:, :, None]) ** anos[None, None, :]
+
+Um cenário troca a taxa de regiões inteiras ou de pares região × segmento
+(``ajustes``) e pode somar um choque em pontos percentuais a todas elas.
+``pontos_por_ano`` > 1 gera pontos intermediários (ex.: 12 para mensal).
+
+Antes de ir para o navegador, ``reduzir`` limita o número de séries (as
+maiores no último período; as demais viram uma linha agregada) e o número
+de pontos por série, de modo que o gráfico não cresce com o número de
+regiões nem com o horizonte::
+
+    python -m eaas.projecao --anos 10
+    python -m eaas.projecao benchmark --regioes 5000 --anos 20 --pontos-por-ano 12
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from eaas.dimensionamento import COL_QTD, COL_TICKET, segmentacao_longa
+
+HORIZONTE_ANOS = 10
+
+# Limites do que é enviado ao gráfico
+MAX_SERIES = 12
+MAX_PONTOS = 240
+
+ROTULO_DEMAIS = "Demais"
+
+
+class CuboProjecao:
+    """Mercado projetado (R$) com eixos ``regioes`` × ``segmentos`` × ``anos``."""
+
+    def __init__(self, regioes, segmentos, anos, valores):
+        self.regioes = list(regioes)
+        self.segmentos = list(segmentos)
+        self.anos = np.asarray(anos)
+        self.valores = valores
+
+    @property
+    def nbytes(self):
+        return self.valores.nbytes
+
+    def por_regiao(self):
+        """Matriz regiões × períodos (soma dos segmentos)."""
+        return pd.DataFrame(self.valores.sum(axis=1), index=self.regioes, columns=self.anos)
+
+    def por_segmento(self, regiao):
+        """Matriz segmentos × períodos de ``regiao`` (segmentos ausentes ficam de fora)."""
+        valores = self.valores[self.regioes.index(regiao)]
+        presentes = valores[:, 0] > 0
+        return pd.DataFrame(valores[presentes], index=np.asarray(self.segmentos)[presentes], columns=self.anos)
+
+    def final(self):
+        """Mercado no início e no fim do horizonte por região × segmento, com o CAGR."""
+        inicio, fim = self.valores[:, :, 0], self.valores[:, :, -1]
+        presentes = inicio > 0
+        r, s = np.nonzero(presentes)
+        anos = self.anos[-1] - self.anos[0]
+        return pd.DataFrame({
+            'Região': np.asarray(self.regioes)[r],
+            'Segmento': np.asarray(self.segmentos)[s],
+            'Mercado Atual (R$ mi)': inicio[presentes] / 1e6,
+            f'Mercado Ano {anos:g} (R$ mi)': fim[presentes] / 1e6,
+            'CAGR (%)': ((fim[presentes] / inicio[presentes]) ** (1 / anos) - 1) * 100 if anos else 0.0,
+        })
+
+
+def base_mercado(fontes):
+    """``(regioes, segmentos, base R×S em R$, taxa anual R×S)`` a partir das tabelas do dashboard."""
+    longa = segmentacao_longa(fontes)
+    mercado = fontes['mercado'].set_index('Região')
+    receita = longa[COL_QTD].astype(np.float64) * longa[COL_TICKET].astype(np.float64)
+    matriz = pd.crosstab(longa['Região'].astype(str), longa['Segmento'].astype(str),
+                         values=receita, aggfunc='sum').fillna(0.0)
+    regioes = [r for r in mercado.index if r in matriz.index]
+    matriz = matriz.loc[regioes]
+    participacao = matriz.to_numpy() / matriz.to_numpy().sum(axis=1, keepdims=True)
+    base = participacao * mercado.loc[regioes, 'Mercado (R$ mi)'].to_numpy(np.float64)[:, None] * 1e6
+    taxa = np.repeat(mercado.loc[regioes, 'Crescimento Anual'].to_numpy(np.float64)[:, None] / 100,
+                     matriz.shape[1], axis=1)
+    return regioes, list(matriz.columns), base, taxa
+
+
+def projetar(regioes, segmentos, base, taxa, anos=HORIZONTE_ANOS, pontos_por_ano=1, ajustes=None, choque_pp=0.0):
+    """Cubo de projeção; ``ajustes`` mapeia região ou (região, segmento) para a taxa anual em %."""
+    taxa = taxa.copy()
+    for alvo, valor in (ajustes or {}).items():
+        if isinstance(alvo, tuple):
+            taxa[regioes.index(alvo[0]), segmentos.index(alvo[1])] = valor / 100
+        else:
+            taxa[regioes.index(alvo)] = valor / 100
+    taxa += choque_pp / 100
+    periodos = np.arange(anos * pontos_por_ano + 1) / pontos_por_ano
+    valores = base[:, :, None] * np.power(1 + taxa[:, :, None], periodos[None, None, :])
+    return CuboProjecao(regioes, segmentos, periodos, valores)
+
+
+def projetar_fontes(fontes, anos=HORIZONTE_ANOS, pontos_por_ano=1, ajustes=None, choque_pp=0.0):
+    """Cubo de projeção das tabelas do dashboard."""
+    return projetar(*base_mercado(fontes), anos, pontos_por_ano, ajustes, choque_pp)
+
+
+def reduzir(series, max_series=MAX_SERIES, max_pontos=MAX_PONTOS):
+    """Formato longo (Série, Ano, Valor) pronto para o gráfico, com no máximo ``max_series`` × ``max_pontos``.
+
+    As séries além das maiores no último período são somadas em uma linha
+    "Demais". Os pontos são amostrados a passo constante, mantendo o primeiro
+    e o último; as curvas compostas são suaves, então nada visível se perde.
+    """
+    if len(series) > max_series:
+        ordem = np.argsort(-series.iloc[:, -1].to_numpy(), kind='stable')
+        maiores = series.iloc[np.sort(ordem[:max_series - 1])]
+        demais = series.iloc[ordem[max_series - 1:]]
+        series = pd.concat([maiores, demais.sum().to_frame(f"{ROTULO_DEMAIS} ({len(demais)})").T])
+    colunas = series.shape[1]
+    if colunas > max_pontos:
+        indices = np.unique(np.linspace(0, colunas - 1, max_pontos).round().astype(np.int64))
+        series = series.iloc[:, indices]
+    longo = series.rename_axis('Série').reset_index().melt(id_vars='Série', var_name='Ano', value_name='Valor')
+    longo['Ano'] = longo['Ano'].astype(np.float64)
+    return longo
+
+
+def base_sintetica(regioes=5000, segmentos=6, semente=0):
+    """Base e taxas aleatórias com ``regioes`` × ``segmentos`` (para medir escala)."""
+    rng = np.random.default_rng(semente)
+    base = rng.lognormal(15, 1.5, (regioes, segmentos))
+    taxa = np.repeat(rng.uniform(0.02, 0.15, (regioes, 1)), segmentos, axis=1)
+    return [f"Região {i}" for i in range(regioes)], [f"Segmento {j}" for j in range(segmentos)], base, taxa
+
+
+def benchmark(regioes=5000, segmentos=6, anos=20, pontos_por_ano=12, repeticoes=5):
+    """Tempo do cubo e da redução, e tamanho do cubo contra o que vai ao gráfico."""
+    nomes, segs, base, taxa = base_sintetica(regioes, segmentos)
+    tempos_cubo, tempos_reducao = [], []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        cubo = projetar(nomes, segs, base, taxa, anos, pontos_por_ano, choque_pp=1.0)
+        tempos_cubo.append((time.perf_counter() - inicio) * 1000)
+        inicio = time.perf_counter()
+        longo = reduzir(cubo.por_regiao())
+        tempos_reducao.append((time.perf_counter() - inicio) * 1000)
+    return {
+        'cubo': list(cubo.valores.shape),
+        'cubo_mb': round(cubo.nbytes / 1024 ** 2, 1),
+        'cubo_ms': round(float(np.median(tempos_cubo)), 1),
+        'reducao_ms': round(float(np.median(tempos_reducao)), 1),
+        'pontos_grafico': len(longo),
+        'pontos_sem_reducao': regioes * cubo.valores.shape[2],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Projeção plurianual do mercado por região e segmento")
+    parser.add_argument('comando', nargs='?', choices=['tabela', 'benchmark'], default='tabela')
+    parser.add_argument('--anos', type=int, default=None)
+    parser.add_argument('--pontos-por-ano', type=int, default=1)
+    parser.add_argument('--choque', type=float, default=0.0, help="Pontos percentuais somados a todas as taxas")
+    parser.add_argument('--regioes', type=int, default=5000, help="Regiões sintéticas (benchmark)")
+    args = parser.parse_args(argv)
+
+    if args.comando == 'benchmark':
+        print(benchmark(args.regioes, anos=args.anos or 20, pontos_por_ano=args.pontos_por_ano))
+        return
+    from eaas.dados import carregar_fontes
+
+    cubo = projetar_fontes(carregar_fontes(), args.anos or HORIZONTE_ANOS, args.pontos_por_ano,
+                           choque_pp=args.choque)
+    print(cubo.final().round(2).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
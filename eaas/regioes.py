@@ -0,0 +1,73 @@
+"""Cadastro das regiões exibidas no dashboard.
+
+Cada entrada diz de onde vêm os dados de uma região: tabela de concorrentes
+(colunas de nome, preço e participação), tabela de segmentação, tabelas
+opcionais (cidades, SWOT) e o recorte no cubo de estabelecimentos (nível e
+código IBGE). A página regional, o cálculo de concentração, a segmentação
+consolidada e a agregação leem este cadastro; incluir um estado ou cidade é
+acrescentar uma entrada aqui e as tabelas correspondentes em
+``eaas.dados.ESQUEMAS``.
+"""
+
+# Faixas do score de oportunidade (0–100) e da barreira de entrada (1–5)
+LIMIARES_OPORTUNIDADE = [(75, "MUITO ATRATIVO"), (60, "ATRATIVO"), (0, "MODERADO")]
+LIMIARES_BARREIRA = [(3.5, "Moderada-Alta"), (2.5, "Moderada"), (0, "Baixa a Moderada")]
+
+CADASTRO = {
+    'Florianópolis': {
+        'chave': 'florianopolis',
+        'icone': '🏙️',
+        'titulo': "Florianópolis - Análise de Mercado EaaS",
+        'concorrentes': 'concorrentes_fl',
+        'col_empresa': 'Empresa',
+        'col_preco': 'Faixa de Preço (R$)',
+        'col_participacao': 'Clientes Aprox.',
+        'segmentacao': 'segmentacao_fl',
+        'cidades': None,
+        'swot': 'swot_fl',
+        'nivel': 'Município',
+        'codigo': 420540,
+    },
+    'Santa Catarina': {
+        'chave': 'santa_catarina',
+        'icone': '🌎',
+        'titulo': "Santa Catarina - Análise Regional",
+        'concorrentes': 'concorrentes_sc',
+        'col_empresa': 'Empresa',
+        'col_preco': 'Preço Base (R$/mês)',
+        'col_participacao': None,
+        'segmentacao': 'segmentacao_sc',
+        'cidades': 'cidades_sc',
+        'swot': None,
+        'nivel': 'UF',
+        'codigo': 42,
+    },
+    'Brasil': {
+        'chave': 'brasil',
+        'icone': '🇧🇷',
+        'titulo': "Brasil - Mercado Nacional",
+        'concorrentes': 'concorrentes_br',
+        'col_empresa': 'Empresa/Plataforma',
+        'col_preco': 'Ticket Médio (R$/mês)',
+        'col_participacao': None,
+        'segmentacao': 'segmentacao_br',
+        'cidades': None,
+        'swot': None,
+        'nivel': None,
+        'codigo': None,
+    },
+}
+
+
+def tabelas_regiao(regiao):
+    """Tabelas de origem lidas pela página de ``regiao``."""
+    cadastro = CADASTRO[regiao]
+    return [cadastro[campo] for campo in ('concorrentes', 'segmentacao', 'cidades', 'swot') if cadastro[campo]]
+
+
+def classificar_oportunidade(score):
+    return next(rotulo for limite, rotulo in LIMIARES_OPORTUNIDADE if score >= limite)
+
+
+def classificar_barreira(barreira):
+    return next(rotulo for limite, rotulo in LIMIARES_BARREIRA if barreira >= limite)
@@ -0,0 +1,402 @@
+"""Exportação estática do dashboard para leitura sem servidor Python.
+
+Gera, sem Streamlit, um pacote HTML com as abas, tabelas e figuras Plotly
+que dependem só das tabelas de ``data/`` e pode ser servido por qualquer
+servidor de arquivos ou CDN. Seções interativas entram com os valores
+padrão (projeção de ``HORIZONTE_ANOS``, ranking regional com
+``PESOS_PADRAO``); ficam de fora a busca de concorrentes (só faz sentido com
+uma consulta), os indicadores do IBGE e a aba Mapa, que leem arquivos
+coletados à parte (``data/ibge``, ``data/geo``) fora do hash de entrada.
+O pacote tem:
+
+- ``assets/plotly.<hash>.min.js``: a biblioteca Plotly, gravada uma única vez
+  e compartilhada por todos os gráficos;
+- ``<secao>.<hash>.html``: uma página por aba, com nome derivado do conteúdo
+  (imutável, pode ter cache longo);
+- ``index.html``: navegação que abre as seções num iframe (único arquivo
+  reescrito a cada construção);
+- ``manifest.json``: hash de entrada de cada seção (tabelas de que depende +
+  versão do código) e o arquivo gerado.
+
+A construção é incremental: uma seção só é renderizada de novo quando o hash
+de entrada muda; páginas antigas que deixaram de ser referenciadas são
+apagadas.
+
+Uso::
+
+    python -m eaas.snapshot --saida dist/snapshot
+"""
+import argparse
+import functools
+import hashlib
+import html
+import json
+import os
+from pathlib import Path
+
+from plotly.offline import get_plotlyjs
+
+from eaas import formatacao as fmt
+from eaas.artefatos import DEPENDENCIAS, GRAFICOS_REGIAO, construir_artefatos, figura_bandas, figura_projecao
+from eaas.cenarios import REGIOES as REGIOES_CENARIO, bandas_receita, parametros_regionais, percentis, sortear_base
+from eaas.concentracao import classificar_hhi, nota_hhi, rotulo_hhi
+from eaas.dados import carregar_fontes, versao_dados
+from eaas.dimensionamento import REFERENCIA, SEGMENTACOES, calcular_indicadores
+from eaas.oportunidade import PESOS_PADRAO, TOP_K, construir_motor
+from eaas.projecao import HORIZONTE_ANOS, projetar_fontes, reduzir
+from eaas.regioes import CADASTRO, classificar_barreira, classificar_oportunidade
+
+PASTA = Path(__file__).resolve().parent
+
+# Módulos cujo código altera o conteúdo das páginas
+MODULOS = ['artefatos', 'cenarios', 'concentracao', 'dados', 'dimensionamento', 'formatacao', 'oportunidade',
+           'precos', 'projecao', 'regioes', 'snapshot']
+
+# Tabelas usadas pelas métricas (eaas.dimensionamento) exibidas em todas as páginas
+DEPENDENCIAS_INDICADORES = ['mercado', 'kpi', *(
+    c[campo] for c in CADASTRO.values() for campo in ('concorrentes', 'segmentacao')
+    if campo == 'segmentacao' or c['col_participacao']
+)]
+
+# Simulações por região na aba de cenários estática (parâmetros padrão)
+N_SIMULACOES = 200_000
+
+# Uma página por seção e uma por região cadastrada (chave -> rótulo)
+REGIOES_POR_CHAVE = {c['chave']: regiao for regiao, c in CADASTRO.items()}
+
+PAGINAS = {
+    'resumo': "📈 Resumo Executivo",
+    **{c['chave']: f"{c['icone']} {regiao}" for regiao, c in CADASTRO.items()},
+    'consolidada': "📋 Análise Consolidada",
+    'cenarios': "🎲 Cenários",
+}
+
+CSS = """
+body { font-family: -apple-system, 'Segoe UI', Roboto, sans-serif; margin: 0; color: #262730; }
+nav { background: #f0f2f6; padding: 12px 24px; }
+nav a { margin-right: 18px; text-decoration: none; color: #262730; }
+main { padding: 12px 32px; }
+.metricas, .colunas { display: flex; gap: 16px; }
+.metricas > div, .colunas > div { flex: 1; min-width: 0; }
+.metrica .rotulo { font-size: 0.85em; color: #555; }
+.metrica .valor { font-size: 1.8em; }
+.metrica .delta { font-size: 0.85em; color: #09ab3b; }
+table { border-collapse: collapse; font-size: 0.85em; margin-bottom: 16px; }
+th, td { border: 1px solid #e6e9ef; padding: 4px 8px; text-align: left; }
+th { background: #f0f2f6; }
+.caixa { padding: 12px 16px; border-radius: 8px; background: #e8f0fe; margin-bottom: 8px; }
+footer { text-align: center; color: #666; font-size: 0.9em; padding: 24px; }
+"""
+
+
+def _hash(*partes):
+    h = hashlib.sha256()
+    for parte in partes:
+        h.update(parte if isinstance(parte, bytes) else str(parte).encode('utf-8'))
+    return h.hexdigest()[:12]
+
+
+def versao_codigo():
+    return _hash(*((PASTA / f'{nome}.py').read_bytes() for nome in MODULOS))
+
+
+def dependencias(secao):
+    """Tabelas de origem lidas pela página de ``secao``."""
+    if secao == 'cenarios':
+        extras = ['recomendacoes']
+    elif secao == 'consolidada':
+        # Projeção e ranking leem o mercado e as segmentações regionais
+        extras = [*DEPENDENCIAS[secao], *SEGMENTACOES]
+    else:
+        extras = DEPENDENCIAS[REGIOES_POR_CHAVE.get(secao, secao)]
+    return sorted(set(DEPENDENCIAS_INDICADORES) | set(extras))
+
+
+def hash_entrada(fontes, secao, codigo):
+    return _hash(codigo, versao_dados({nome: fontes[nome] for nome in dependencias(secao)}))
+
+
+# ============================================================================
+# BLOCOS HTML
+# ============================================================================
+
+def _titulo(texto, nivel=2):
+    return f'<h{nivel}>{html.escape(texto)}</h{nivel}>'
+
+
+def _metricas(itens):
+    blocos = ''.join(
+        f'<div class="metrica"><div class="rotulo">{html.escape(rotulo)}</div>'
+        f'<div class="valor">{html.escape(valor)}</div>'
+        f'<div class="delta">{html.escape(delta)}</div></div>'
+        for rotulo, valor, delta in itens
+    )
+    return f'<div class="metricas">{blocos}</div>'
+
+
+def _tabela(df):
+    return df.to_html(index=False, border=0, na_rep='', float_format=lambda v: fmt.numero(v, 2))
+
+
+def _figura(fig, id_div):
+    # id fixo para que o HTML (e portanto o hash do arquivo) seja determinístico
+    return fig.to_html(full_html=False, include_plotlyjs=False, div_id=id_div,
+                       config={'responsive': True})
+
+
+def _colunas(*blocos):
+    return '<div class="colunas">' + ''.join(f'<div>{b}</div>' for b in blocos) + '</div>'
+
+
+def _grafico(art, chave, titulo=None):
+    return (_titulo(titulo, 4) if titulo else '') + _figura(art[chave], chave)
+
+
+# ============================================================================
+# PÁGINAS
+# ============================================================================
+
+def _pagina_resumo(fontes, ind):
+    art = construir_artefatos(fontes, 'resumo')
+    geral = ind['geral']
+    return [
+        _titulo("📈 Resumo Executivo - Dimensionamento de Mercado"),
+        _metricas([
+            ("Empresas Alvo Total", fmt.numero(geral['empresas_total']),
+             f"{fmt.variacao(geral['crescimento_empresas'])} YoY"),
+            ("Mercado Potencial", fmt.moeda_abreviada(geral['mercado_total']),
+             f"{fmt.variacao(geral['crescimento_mercado'])} YoY"),
+            ("Ticket Médio", fmt.moeda(geral['ticket_medio']),
+             f"{fmt.variacao(geral['ticket_vs_referencia'])} vs FL"),
+            ("Penetração Média", fmt.percentual(geral['penetracao_media']), "Baixa concentração"),
+        ]),
+        _titulo("Comparativo Regional", 3),
+        _tabela(art['df_mercado']),
+        _colunas(_grafico(art, 'fig_mercado', "Mercado Potencial (R$ mi)"),
+                 _grafico(art, 'fig_empresas', "Universo de Empresas")),
+        _colunas(_grafico(art, 'fig_penetracao', "Taxa de Penetração (%)"),
+                 _grafico(art, 'fig_ticket', "Ticket Médio (R$)")),
+    ]
+
+
+def _swot(swot):
+    def lista(coluna):
+        itens = ''.join(f'<li>{html.escape(str(v))}</li>' for v in swot[coluna])
+        return f'<div class="caixa"><b>{coluna}</b><ol>{itens}</ol></div>'
+    return _colunas(lista('Forças') + lista('Fraquezas'), lista('Oportunidades') + lista('Ameaças'))
+
+
+def _pagina_regiao(fontes, ind, regiao):
+    cadastro = CADASTRO[regiao]
+    art = construir_artefatos(fontes, regiao)
+    linha = ind['regioes'].loc[regiao]
+    kpi = ind['kpi'].set_index('Indicador')[regiao]
+    if regiao == REFERENCIA:
+        delta_empresas = f"{fmt.percentual(linha['Taxa Penetração'])} penetração"
+    else:
+        delta_empresas = f"{fmt.razao(linha['Razão Empresas'])} {REFERENCIA}"
+    score = kpi['Score Oportunidade']
+
+    blocos = [
+        _titulo(f"{cadastro['icone']} {cadastro['titulo']}"),
+        _metricas([
+            ("Empresas Alvo", fmt.numero(linha['Empresas Alvo']), delta_empresas),
+            ("Mercado Potencial", fmt.moeda_abreviada(linha['Mercado (R$)']), "Anual"),
+            ("Ticket Médio", fmt.moeda(linha['Ticket Médio (R$)']),
+             f"{fmt.numero(kpi['Elasticidade-Preço'], 2)} elasticidade"),
+            ("Oportunidade", f"{score:.0f}/100", classificar_oportunidade(score)),
+        ]),
+    ]
+    if 'df_cidades' in art:
+        blocos += [_titulo("📍 Principais Cidades Econômicas", 3), _tabela(art['df_cidades'])]
+    blocos += [
+        _titulo("🏢 Análise Competitiva - Principais Concorrentes", 3),
+        _tabela(art['df_concorrentes']),
+        _grafico(art, 'fig_precos', "💲 Faixa de Preço por Concorrente (R$/mês)"),
+        _titulo("📊 Segmentação de Clientes", 3),
+        _tabela(art['df_segmentacao']),
+    ]
+    graficos = [_grafico(art, chave, titulo) for titulo, chave in GRAFICOS_REGIAO if chave in art]
+    blocos += [_colunas(*graficos[i:i + 2]) for i in range(0, len(graficos), 2)]
+    if 'swot' in art:
+        blocos += [_titulo(f"🎯 Análise SWOT - {regiao}", 3), _swot(art['swot'])]
+    blocos += [
+        _titulo("📈 Indicadores-Chave de Performance (KPIs)", 3),
+        _metricas([
+            (f"Índice {rotulo_hhi(regiao)}", fmt.numero(kpi['HHI Index']),
+             classificar_hhi(kpi['HHI Index'])),
+            ("Taxa Adoção Tecnologia", fmt.percentual(kpi['Taxa Adoção Tech'], 0), ''),
+            ("Elasticidade-Preço", fmt.numero(kpi['Elasticidade-Preço'], 2), ''),
+            ("Barreira de Entrada", f"{fmt.numero(kpi['Barreira Entrada'], 1)}/5",
+             classificar_barreira(kpi['Barreira Entrada'])),
+            ("Score Oportunidade", f"{score:.0f}/100", classificar_oportunidade(score)),
+        ]),
+    ]
+    return blocos
+
+
+def _pagina_consolidada(fontes, ind):
+    art = construir_artefatos(fontes, 'consolidada')
+    projecao = projetar_fontes(fontes, HORIZONTE_ANOS)
+    kpi = ind['kpi'].set_index('Indicador')
+    caixas = [
+        f'<div class="caixa"><b>{html.escape(nome)}</b><ul>'
+        f"<li>🎯 Score: {kpi.loc['Score Oportunidade', nome]:.0f}/100</li>"
+        f"<li>📊 {rotulo_hhi(nome)}: {fmt.numero(kpi.loc['HHI Index', nome])}</li>"
+        f"<li>💰 Mercado: {fmt.moeda_abreviada(regiao['Mercado (R$)'])}</li>"
+        f"<li>📈 Crescimento: {fmt.percentual(regiao['Crescimento Anual'])} ao ano</li></ul></div>"
+        for nome, regiao in ind['regioes'].iterrows()
+    ]
+    return [
+        _titulo("📋 Análise Consolidada - Comparativo Regional"),
+        _titulo("📊 Dimensionamento Comparativo", 3),
+        _colunas(_grafico(art, 'fig_empresas_comp', "Empresas Alvo por Região"),
+                 _grafico(art, 'fig_mercado_comp', "Mercado Potencial Comparativo")),
+        _titulo("🎯 Índices de Oportunidade (KPIs Consolidados)", 3),
+        _tabela(art['df_kpi']),
+        f"<p>{html.escape(nota_hhi())}</p>",
+        _tabela(ind['concentracao'].reset_index()),
+        _colunas(*caixas),
+        _titulo("📈 Projeção de Mercado", 3),
+        f"<p>Crescimento anual de cada região em {HORIZONTE_ANOS} anos.</p>",
+        _figura(figura_projecao(reduzir(projecao.por_regiao())), 'projecao'),
+        _tabela(projecao.final()),
+        _titulo("💡 Recomendações Estratégicas por Região", 3),
+        _tabela(art['df_recomendacoes']),
+        _titulo("🚀 Gaps e Oportunidades Principais", 3),
+        _tabela(art['df_gaps']),
+        _titulo("🏆 Ranking de Oportunidade (Localidade × Segmento)", 3),
+        "<p>Pesos padrão, regiões do cadastro.</p>",
+        _tabela(construir_motor(fontes).top(TOP_K, PESOS_PADRAO)),
+    ]
+
+
+def _pagina_cenarios(fontes, ind):
+    base = sortear_base(REGIOES_CENARIO, N_SIMULACOES)
+    resultado = percentis(fontes, base)
+    bandas = bandas_receita(resultado, parametros_regionais(fontes))
+    graficos = [
+        _titulo(regiao, 4) + _figura(figura_bandas(bandas[bandas['Região'] == regiao]), f'bandas_{i}')
+        for i, regiao in enumerate(bandas['Região'].unique())
+    ]
+    return [
+        _titulo("🎲 Cenários - Simulação Monte Carlo"),
+        f"<p>Parâmetros padrão (sem variação de preço), {fmt.numero(N_SIMULACOES)} simulações por região.</p>",
+        _titulo("📊 Percentis por Região", 3),
+        _tabela(resultado),
+        _titulo("📈 Receita Mensal Projetada - Faixas de Percentis", 3),
+        *graficos,
+    ]
+
+
+CONSTRUTORES = {
+    'resumo': _pagina_resumo,
+    **{c['chave']: functools.partial(_pagina_regiao, regiao=regiao) for regiao, c in CADASTRO.items()},
+    'consolidada': _pagina_consolidada,
+    'cenarios': _pagina_cenarios,
+}
+
+
+def _pagina(titulo, corpo, plotly_js):
+    return (
+        '<!DOCTYPE html><html lang="pt-BR"><head><meta charset="utf-8">'
+        f'<title>{html.escape(titulo)}</title><style>{CSS}</style>'
+        f'<script src="{plotly_js}"></script></head><body><main>{corpo}</main>'
+        '<footer><p><b>Fonte:</b> Análise EaaS - Mercado de Consultoria Econômica</p>'
+        '<p><b>Regiões Cobertas:</b> Florianópolis (SC) | Santa Catarina | Brasil</p></footer>'
+        '</body></html>'
+    )
+
+
+def _indice(arquivos):
+    # Única página sem hash: navegação que abre as seções (imutáveis) num iframe
+    primeira = arquivos[next(iter(PAGINAS))]
+    links = ''.join(f'<a href="{arquivos[s]}" target="conteudo">{html.escape(r)}</a>' for s, r in PAGINAS.items())
+    return (
+        '<!DOCTYPE html><html lang="pt-BR"><head><meta charset="utf-8">'
+        f'<title>EaaS Dashboard</title><style>{CSS}'
+        'iframe { border: 0; width: 100%; height: calc(100vh - 48px); }</style></head><body>'
+        f'<nav><b>📊 EaaS</b> &nbsp; {links}</nav>'
+        f'<iframe name="conteudo" src="{primeira}"></iframe></body></html>'
+    )
+
+
+def _gravar(caminho, conteudo):
+    # Escrita atômica: servidores nunca leem um arquivo pela metade
+    temporario = caminho.with_name(caminho.name + '.tmp')
+    temporario.write_text(conteudo, encoding='utf-8')
+    os.replace(temporario, caminho)
+
+
+# ============================================================================
+# CONSTRUÇÃO
+# ============================================================================
+
+def construir(saida, fontes=None, forcar=False):
+    """Gera ou atualiza o pacote estático em ``saida``; retorna as seções renderizadas."""
+    saida = Path(saida)
+    (saida / 'assets').mkdir(parents=True, exist_ok=True)
+    if fontes is None:
+        fontes = carregar_fontes()
+
+    js = get_plotlyjs()
+    plotly_js = f'assets/plotly.{_hash(js)}.min.js'
+    if not (saida / plotly_js).exists():
+        _gravar(saida / plotly_js, js)
+
+    caminho_manifesto = saida / 'manifest.json'
+    anterior = json.loads(caminho_manifesto.read_text()) if caminho_manifesto.exists() else {}
+    secoes_anteriores = anterior.get('secoes', {}) if anterior.get('plotly') == plotly_js else {}
+
+    codigo = versao_codigo()
+    entradas = {secao: hash_entrada(fontes, secao, codigo) for secao in PAGINAS}
+    pendentes = [
+        secao for secao in PAGINAS
+        if forcar
+        or secoes_anteriores.get(secao, {}).get('entrada') != entradas[secao]
+        or not (saida / secoes_anteriores[secao]['arquivo']).exists()
+    ]
+
+    indicadores = calcular_indicadores(fontes) if pendentes else None
+    arquivos = {secao: secoes_anteriores[secao]['arquivo'] for secao in PAGINAS if secao not in pendentes}
+    for secao in pendentes:
+        documento = _pagina(PAGINAS[secao], '\n'.join(CONSTRUTORES[secao](fontes, indicadores)), plotly_js)
+        arquivos[secao] = f'{secao}.{_hash(documento)}.html'
+        if not (saida / arquivos[secao]).exists():
+            _gravar(saida / arquivos[secao], documento)
+
+    _gravar(saida / 'index.html', _indice(arquivos))
+
+    manifesto = {
+        'plotly': plotly_js,
+        'codigo': codigo,
+        'secoes': {s: {'entrada': entradas[s], 'arquivo': arquivos[s], 'tabelas': dependencias(s)}
+                   for s in PAGINAS},
+    }
+    _gravar(caminho_manifesto, json.dumps(manifesto, indent=2, ensure_ascii=False))
+
+    # Remove páginas e scripts que não são mais referenciados
+    vivos = set(arquivos.values()) | {'index.html', 'manifest.json'}
+    for arquivo in saida.glob('*.html'):
+        if arquivo.name not in vivos:
+            arquivo.unlink()
+    for arquivo in (saida / 'assets').glob('plotly.*.js'):
+        if f'assets/{arquivo.name}' != plotly_js:
+            arquivo.unlink()
+    return pendentes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta o dashboard EaaS como HTML estático")
+    parser.add_argument('--saida', default='dist/snapshot')
+    parser.add_argument('--dados', default=None, help="Diretório das tabelas (padrão: data/)")
+    parser.add_argument('--forcar', action='store_true', help="Renderiza todas as seções")
+    args = parser.parse_args(argv)
+
+    renderizadas = construir(args.saida, carregar_fontes(args.dados), forcar=args.forcar)
+    print(f"{len(renderizadas)} seção(ões) renderizada(s): {', '.join(renderizadas) or 'nenhuma'}")
+    print(Path(args.saida) / 'index.html')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""Tabelas grandes ordenadas, filtradas e paginadas no servidor.
+
+``TabelaIndexada`` guarda, junto com o DataFrame, as ordens de todas as
+colunas (crescente e decrescente) e um texto normalizado por linha para a
+busca. É montada uma vez com os artefatos da versão dos dados; trocar a
+ordenação é só indexar uma permutação pronta, sem ordenar de novo.
+
+``tabela_paginada`` desenha os controles e envia ao navegador apenas a
+janela visível; é um ``st.fragment``, então filtrar, ordenar ou paginar
+reexecuta só a tabela. O tamanho máximo da página é limitado por ``ORCAMENTO_KB``,
+medido em Arrow IPC (o formato em que o ``st.dataframe`` envia os dados)
+numa amostra de linhas, então o payload de um rerun não cresce com o
+tamanho da tabela. O Streamlit
+só é importado ao desenhar a tabela: os artefatos (e o snapshot estático)
+montam ``TabelaIndexada`` sem ele.
+"""
+import functools
+import math
+import threading
+
+import numpy as np
+import pandas as pd
+
+from eaas import perfil
+
+# Orçamento de dados por tabela em um rerun
+ORCAMENTO_KB = 64
+
+TAMANHOS_PAGINA = [10, 25, 50, 100, 250]
+
+# Termos de busca recentes guardados por tabela
+MAX_FILTROS = 32
+
+# Linhas (espaçadas pela tabela) cujo tamanho em Arrow IPC define o custo por linha
+AMOSTRA_LINHAS = 200
+
+
+def _ordem(serie, decrescente):
+    serie = serie.reset_index(drop=True)
+    # Texto (inclusive categorias, cuja ordem interna é a de leitura) ordena sem caixa
+    chave = None if pd.api.types.is_numeric_dtype(serie) else (lambda s: s.astype(str).str.lower())
+    ordenada = serie.sort_values(ascending=not decrescente, kind='stable', na_position='last', key=chave)
+    return ordenada.index.to_numpy(np.int64)
+
+
+def tamanho_ipc(df):
+    """Bytes de ``df`` serializado como stream Arrow IPC."""
+    import pyarrow as pa
+
+    tabela = pa.Table.from_pandas(df)
+    saida = pa.BufferOutputStream()
+    with pa.ipc.new_stream(saida, tabela.schema) as escritor:
+        escritor.write_table(tabela)
+    return saida.getvalue().size
+
+
+class TabelaIndexada:
+    """DataFrame com índices de ordenação e de busca construídos uma única vez."""
+
+    def __init__(self, df):
+        self.df = df.reset_index(drop=True)
+        self.ordens = {
+            (coluna, decrescente): _ordem(self.df[coluna], decrescente)
+            for coluna in self.df.columns for decrescente in (False, True)
+        }
+        texto = [self.df[c].astype(str).str.lower() for c in self.df.columns
+                 if not pd.api.types.is_numeric_dtype(self.df[c])]
+        self._busca = pd.Series(
+            texto[0].str.cat(texto[1:], sep='\x1f') if texto else [''] * len(self.df),
+            dtype=object,
+        )
+        # Compartilhada entre as sessões (st.cache_resource): o cache de filtros tem trava
+        self._filtros = {}
+        self._trava = threading.Lock()
+        self._custo_ipc = None
+
+    def __len__(self):
+        return len(self.df)
+
+    def _mascara(self, termo):
+        with self._trava:
+            mascara = self._filtros.get(termo)
+        if mascara is None:
+            # A busca roda fora da trava; duas sessões com o mesmo termo só calculam duas vezes
+            mascara = self._busca.str.contains(termo, regex=False).to_numpy()
+            with self._trava:
+                if termo not in self._filtros and len(self._filtros) >= MAX_FILTROS:
+                    self._filtros.pop(next(iter(self._filtros)))
+                self._filtros[termo] = mascara
+        return mascara
+
+    def posicoes(self, coluna=None, decrescente=False, filtro=''):
+        """Posições das linhas na ordem pedida, já filtradas."""
+        if coluna is None:
+            posicoes = np.arange(len(self.df))
+        else:
+            posicoes = self.ordens[(coluna, decrescente)]
+        termo = filtro.strip().lower()
+        if termo:
+            posicoes = posicoes[self._mascara(termo)[posicoes]]
+        return posicoes
+
+    def janela(self, coluna=None, decrescente=False, filtro='', inicio=0, tamanho=TAMANHOS_PAGINA[1]):
+        """``(linhas visíveis, total após o filtro)``."""
+        posicoes = self.posicoes(coluna, decrescente, filtro)
+        return self.df.iloc[posicoes[inicio:inicio + tamanho]], len(posicoes)
+
+    def custo_ipc(self):
+        """``(bytes fixos, bytes por linha)`` de uma janela em Arrow IPC, medidos numa amostra."""
+        if self._custo_ipc is None:
+            amostra = self.df.iloc[np.unique(np.linspace(0, len(self.df) - 1, AMOSTRA_LINHAS).astype(np.int64))
+                                   if len(self.df) else []]
+            fixo = tamanho_ipc(amostra.iloc[:0])
+            self._custo_ipc = (fixo, max(1.0, (tamanho_ipc(amostra) - fixo) / max(len(amostra), 1)))
+        return self._custo_ipc
+
+    def tamanho_maximo(self, orcamento_kb=ORCAMENTO_KB):
+        """Maior página cujo payload Arrow IPC cabe no orçamento."""
+        fixo, por_linha = self.custo_ipc()
+        return max(1, int((orcamento_kb * 1024 - fixo) // por_linha))
+
+
+@functools.cache
+def _fragmento():
+    import streamlit as st
+
+    return st.fragment(_tabela_paginada)
+
+
+def tabela_paginada(tabela, chave, orcamento_kb=ORCAMENTO_KB):
+    """Controles de busca, ordenação e página; envia só a janela visível."""
+    return _fragmento()(tabela, chave, orcamento_kb)
+
+
+def _tabela_paginada(tabela, chave, orcamento_kb):
+    import streamlit as st
+
+    if not isinstance(tabela, TabelaIndexada):
+        tabela = TabelaIndexada(tabela)
+
+    limite = tabela.tamanho_maximo(orcamento_kb)
+    tamanhos = [t for t in TAMANHOS_PAGINA if t <= limite] or [limite]
+
+    col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
+    filtro = col1.text_input("Filtrar", key=f'{chave}_filtro', placeholder="Buscar em todas as colunas")
+    coluna = col2.selectbox("Ordenar por", [None, *tabela.df.columns], key=f'{chave}_coluna',
+                            format_func=lambda c: "Original" if c is None else c)
+    decrescente = col3.toggle("Decrescente", key=f'{chave}_desc')
+    tamanho = col4.selectbox("Linhas", tamanhos, index=min(1, len(tamanhos) - 1), key=f'{chave}_tamanho')
+
+    posicoes = tabela.posicoes(coluna, decrescente, filtro)
+    total = len(posicoes)
+    paginas = max(1, math.ceil(total / tamanho))
+    # Página volta para o início quando a consulta muda
+    consulta = (filtro, coluna, decrescente, tamanho)
+    if st.session_state.get(f'{chave}_consulta') != consulta:
+        st.session_state[f'{chave}_consulta'] = consulta
+        st.session_state[f'{chave}_pagina'] = 1
+    st.session_state[f'{chave}_pagina'] = min(st.session_state.get(f'{chave}_pagina', 1), paginas)
+
+    inicio = (st.session_state[f'{chave}_pagina'] - 1) * tamanho
+    janela = tabela.df.iloc[posicoes[inicio:inicio + tamanho]]
+    perfil.envolver(st.dataframe, 'dataframe')(janela, use_container_width=True)
+
+    col1, col2 = st.columns([1, 3])
+    pagina = col1.number_input("Página", min_value=1, max_value=paginas, step=1, key=f'{chave}_pagina',
+                               label_visibility='collapsed')
+    inicio = (pagina - 1) * tamanho
+    col2.caption(f"Linhas {min(inicio + 1, total)}–{min(inicio + tamanho, total)} de {total:,}".replace(',', '.')
+                 + f" · página {pagina} de {paginas}")
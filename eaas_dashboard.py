@@ -1,9 +1,24 @@
+import os
+
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
 from datetime import datetime
 
+from eaas import formatacao as fmt, perfil
+from eaas.aquecimento import autorizado
+from eaas.artefatos import figura_bandas
+from eaas.cache import (obter_artefatos, obter_busca, obter_cenario, obter_exportador, obter_fontes, obter_grafo,
+                        obter_indicadores, obter_mapa, obter_municipios, obter_projecao, obter_ranking, invalidar_cache)
+from eaas.concentracao import nota_hhi, rotulo_hhi
+from eaas.exportacao import disponiveis as formatos_exportacao
+from eaas.grafo import INTERVALO_S
+from eaas.mapa import METRICAS, RESOLUCOES, camada_regiao
+from eaas.navegacao import renderizar_abas, painel_custos
+from eaas.oportunidade import DIMENSOES, PESOS_PADRAO, TOP_K
+from eaas.pagina_regional import pagina_regiao
+from eaas.projecao import HORIZONTE_ANOS
+from eaas.regioes import CADASTRO
+from eaas.tabela import tabela_paginada
+
 # Configuração da página
 st.set_page_config(
     page_title="EaaS Dashboard", 
@@ -12,6 +27,12 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Perfil opcional (EAAS_PERFIL=1, ou EAAS_PERFIL=url e ?perfil=1); desligado, dataframe e
+# plotly_chart são os próprios comandos do Streamlit
+PERFIL = perfil.iniciar()
+dataframe = perfil.envolver(st.dataframe, 'dataframe')
+plotly_chart = perfil.envolver(st.plotly_chart, 'plotly_chart')
+
 # Tema
 st.markdown("""
 <style>
@@ -30,568 +51,399 @@ st.title("📊 Economics as a Service (EaaS) Dashboard")
 st.markdown("**Mercado de Consultoria Econômica - Análise de Oportunidade**")
 st.markdown("**Regiões:** Florianópolis | Santa Catarina | Brasil | **Data:** 02/12/2025")
 
+# ============================================================================
+# CACHE DE ARTEFATOS (DataFrames e figuras)
+# ============================================================================
+
+with st.sidebar:
+    if st.button("🔄 Recarregar dados", help="Descarta o cache compartilhado de tabelas e gráficos"):
+        invalidar_cache()
+    todas_abas = st.toggle(
+        "Renderizar todas as abas",
+        value=False,
+        help="Modo clássico (st.tabs): executa e envia todas as abas a cada rerun"
+    )
+
+# Sessão de aquecimento (python -m eaas.aquecimento --url ...): monta todas as
+# abas só com o token de EAAS_AQUECIMENTO_TOKEN
+if 'aquecer' in st.query_params and autorizado(st.query_params['aquecer']):
+    todas_abas = True
+
 # ============================================================================
 # DADOS CONSOLIDADOS
 # ============================================================================
 
-# Dimensionamento de Mercado
-mercado_data = {
-    'Região': ['Florianópolis', 'Santa Catarina', 'Brasil'],
-    'Empresas Alvo': [280, 1800, 45000],
-    'Mercado (R$ mi)': [50.4, 432, 1440],
-    'Ticket Médio (R$)': [2840, 2900, 3135],
-    'Taxa Penetração': [18, 10, 4],
-    'Crescimento Anual': [12, 9, 6]
-}
+# Tabelas lidas de data/ (Arrow/Parquet/CSV) pela camada de dados compartilhada
+FONTES, VERSAO = obter_fontes()
 
-# Concorrentes por região
-concorrentes_fl = {
-    'Empresa': ['Ás Consultoria', 'MS Tecnologia', 'Parcon Consultoria', 'Novo Design', 'Neo Pessoas', 'Agência G13'],
-    'Serviço Principal': ['Análise econômica', 'BPO Financeiro', 'Planejamento PME', 'Design/Consultoria', 'Gestão de Pessoas', 'Design/Marketing'],
-    'Faixa de Preço (R$)': ['3.500-5.500', '2.000-3.500', '2.500-4.000', '2.500-4.500', '3.000-5.000', '2.000-4.000'],
-    'Clientes Aprox.': ['25-35', '60-80', '40-55', '20-30', '35-45', '50-70']
-}
+# Com EAAS_OBSERVAR_S, edições em data/ são recalculadas na thread do grafo
+# (eaas.grafo); o fragmento só compara a geração e refaz o rerun quando uma
+# nova é publicada
+st.session_state['geracao_dados'] = obter_grafo().geracao
 
-# Segmentação Florianópolis
-segmentacao_fl = {
-    'Segmento': [
-        'Startups Growth',
-        'PMEs Pequenas',
-        'PMEs Micro'
-    ],
-    'Qtd. Estimada': [60, 110, 110],
-    'Ticket Médio (R$)': [5000, 3000, 1500],
-    'Receita Mensal (R$)': [300000, 330000, 165000],
-    'Inv. Anual EaaS': [60000, 36000, 18000]
-}
 
-# Indicadores de Performance
-kpi_data = {
-    'Indicador': ['HHI Index', 'Taxa Adoção Tech', 'Elasticidade-Preço', 'Barreira Entrada', 'Score Oportunidade'],
-    'Florianópolis': [6800, 48, -0.72, 3.8, 78],
-    'Santa Catarina': [5200, 42, -0.65, 3.2, 68],
-    'Brasil': [2900, 62, -0.58, 2.3, 55]
-}
+@st.fragment(run_every=INTERVALO_S or None)
+def dados_ao_vivo():
+    grafo = obter_grafo()
+    if grafo.geracao != st.session_state['geracao_dados']:
+        st.session_state['geracao_dados'] = grafo.geracao
+        st.rerun()
+    if grafo.ultima:
+        st.caption(f"Dados atualizados: {', '.join(grafo.ultima['tabelas'])} "
+                   f"({len(grafo.ultima['nos'])} nós em {grafo.ultima['ms']:.0f} ms)")
 
-# SWOT Florianópolis
-swot_fl = {
-    'Forças': [
-        'Ecossistema startups em crescimento',
-        'Expertise em análise econômico-financeira',
-        'Custos operacionais baixos',
-        'Relacionamentos com founders',
-        'Serviço diferenciado'
-    ],
-    'Fraquezas': [
-        'Mercado limitado (280 alvo)',
-        'Capacidade pagamento limitada',
-        'Dificuldade reter especialistas',
-        'Falta de volume para escala',
-        'Dependência de parcerias'
-    ],
-    'Oportunidades': [
-        'Expansão regional (Blumenau, Brusque)',
-        'Alta demanda crescimento',
-        'Mentorias e aceleradoras',
-        'Modelo online escalável',
-        'Especialização em inovação'
-    ],
-    'Ameaças': [
-        'Plataformas SaaS desintermediando',
-        'Entrada consultorias nacionais',
-        'Recessão econômica',
-        'Automatização por IA',
-        'Regulação de consultores'
-    ]
-}
 
-# ============================================================================
-# ABAS PRINCIPAIS
-# ============================================================================
+if INTERVALO_S:
+    with st.sidebar:
+        dados_ao_vivo()
 
-tab1, tab2, tab3, tab4, tab5 = st.tabs([
-    "📈 Resumo Executivo", 
-    "🏙️ Florianópolis", 
-    "🌎 Santa Catarina", 
-    "🇧🇷 Brasil",
-    "📋 Análise Consolidada"
-])
+# Métricas derivadas das tabelas (eaas.dimensionamento), memoizadas por versão
+INDICADORES = obter_indicadores(FONTES, VERSAO)
+REGIOES = INDICADORES['regioes']
+KPI = INDICADORES['kpi'].set_index('Indicador')
 
 # ============================================================================
 # TAB 1: RESUMO EXECUTIVO
 # ============================================================================
-with tab1:
+def aba_resumo():
+    art = obter_artefatos(FONTES, 'resumo', VERSAO)
+    
     st.header("📈 Resumo Executivo - Dimensionamento de Mercado")
     
     # Métricas principais
+    geral = INDICADORES['geral']
     col1, col2, col3, col4 = st.columns(4)
-    col1.metric("Empresas Alvo Total", "47.080", "+12% YoY")
-    col2.metric("Mercado Potencial", "R$ 1,9B", "+8% YoY")
-    col3.metric("Ticket Médio", "R$ 2.900", "-3% vs FL")
-    col4.metric("Penetração Média", "10,7%", "Baixa concentração")
+    col1.metric("Empresas Alvo Total", fmt.numero(geral['empresas_total']),
+                f"{fmt.variacao(geral['crescimento_empresas'])} YoY")
+    col2.metric("Mercado Potencial", fmt.moeda_abreviada(geral['mercado_total']),
+                f"{fmt.variacao(geral['crescimento_mercado'])} YoY")
+    col3.metric("Ticket Médio", fmt.moeda(geral['ticket_medio']),
+                f"{fmt.variacao(geral['ticket_vs_referencia'])} vs FL")
+    col4.metric("Penetração Média", fmt.percentual(geral['penetracao_media']), "Baixa concentração")
     
     st.markdown("---")
     
     # Tabela comparativa
     st.subheader("Comparativo Regional")
-    df_mercado = pd.DataFrame(mercado_data)
-    st.dataframe(df_mercado, use_container_width=True)
+    df_mercado = art['df_mercado']
+    dataframe(df_mercado, use_container_width=True)
     
     # Gráficos lado a lado
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("Mercado Potencial (R$ mi)")
-        fig_mercado = go.Figure(data=[
-            go.Bar(x=df_mercado['Região'], y=df_mercado['Mercado (R$ mi)'], marker_color='indianred')
-        ])
-        fig_mercado.update_layout(height=300, showlegend=False)
-        st.plotly_chart(fig_mercado, use_container_width=True)
+        plotly_chart(art['fig_mercado'], use_container_width=True)
     
     with col2:
         st.subheader("Universo de Empresas")
-        fig_empresas = go.Figure(data=[
-            go.Bar(x=df_mercado['Região'], y=df_mercado['Empresas Alvo'], marker_color='lightsalmon')
-        ])
-        fig_empresas.update_layout(height=300, showlegend=False)
-        st.plotly_chart(fig_empresas, use_container_width=True)
+        plotly_chart(art['fig_empresas'], use_container_width=True)
     
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("Taxa de Penetração (%)")
-        fig_penetracao = go.Figure(data=[
-            go.Bar(x=df_mercado['Região'], y=df_mercado['Taxa Penetração'], marker_color='lightseagreen')
-        ])
-        fig_penetracao.update_layout(height=300, showlegend=False)
-        st.plotly_chart(fig_penetracao, use_container_width=True)
+        plotly_chart(art['fig_penetracao'], use_container_width=True)
     
     with col2:
         st.subheader("Ticket Médio (R$)")
-        fig_ticket = go.Figure(data=[
-            go.Bar(x=df_mercado['Região'], y=df_mercado['Ticket Médio (R$)'], marker_color='khaki')
-        ])
-        fig_ticket.update_layout(height=300, showlegend=False)
-        st.plotly_chart(fig_ticket, use_container_width=True)
+        plotly_chart(art['fig_ticket'], use_container_width=True)
 
 # ============================================================================
-# TAB 2: FLORIANÓPOLIS
+# TAB 2: REGIÕES
 # ============================================================================
-with tab2:
-    st.header("🏙️ Florianópolis - Análise de Mercado EaaS")
-    
-    # Métricas principais
-    col1, col2, col3, col4 = st.columns(4)
-    col1.metric("Empresas Alvo", "280", "18% penetração")
-    col2.metric("Mercado Potencial", "R$ 50,4M", "Anual")
-    col3.metric("Ticket Médio", "R$ 2.840", "-0.72 elasticidade")
-    col4.metric("Oportunidade", "78/100", "MUITO ATRATIVO")
+def aba_regioes():
+    # Uma única página guiada pelo cadastro (eaas.regioes): só a região escolhida é montada.
+    # É um fragmento: trocar a região não reexecuta o restante do script
+    pagina_regiao(FONTES, VERSAO, INDICADORES)
+
+# ============================================================================
+# TAB 3: ANÁLISE CONSOLIDADA
+# ============================================================================
+def aba_consolidada():
+    art = obter_artefatos(FONTES, 'consolidada', VERSAO)
     
-    st.markdown("---")
+    st.header("📋 Análise Consolidada - Comparativo Regional")
     
-    # Concorrentes
-    st.subheader("🏢 Análise Competitiva - Principais Concorrentes")
-    df_concorrentes = pd.DataFrame(concorrentes_fl)
-    st.dataframe(df_concorrentes, use_container_width=True)
+    st.subheader("🔎 Buscar Concorrentes")
+    busca()
     
     st.markdown("---")
     
-    # Segmentação
-    st.subheader("📊 Segmentação de Clientes - Startups e PMEs")
-    df_segmentacao_fl = pd.DataFrame(segmentacao_fl)
-    st.dataframe(df_segmentacao_fl, use_container_width=True)
-    
-    st.write("**Debug:** Quantidade de registros:", len(df_segmentacao_fl))
-    st.write("**Valores para gráficos:**")
-    st.write(f"- Segmentos: {df_segmentacao_fl['Segmento'].tolist()}")
-    st.write(f"- Quantidades: {df_segmentacao_fl['Qtd. Estimada'].tolist()}")
-    
-    # Gráficos de Florianópolis - CORRIGIDO
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("Distribuição de Clientes por Segmento")
-        fig_dist_fl = px.pie(
-            df_segmentacao_fl,
-            labels='Segmento',
-            values='Qtd. Estimada',
-            color_discrete_sequence=['#FF6B6B', '#4ECDC4', '#45B7D1'],
-            title="Clientes por Segmento"
-        )
-        fig_dist_fl.update_layout(height=400)
-        st.plotly_chart(fig_dist_fl, use_container_width=True)
-    
-    with col2:
-        st.subheader("Ticket Médio por Segmento (R$)")
-        fig_ticket_fl = px.bar(
-            df_segmentacao_fl,
-            x='Segmento',
-            y='Ticket Médio (R$)',
-            color_discrete_sequence=['#FF6B6B'],
-            title="Ticket Médio"
-        )
-        fig_ticket_fl.update_layout(height=400, xaxis_tickangle=-45)
-        st.plotly_chart(fig_ticket_fl, use_container_width=True)
+    # Comparativo geral
+    st.subheader("📊 Dimensionamento Comparativo")
     
-    # Gráficos adicionais
     col1, col2 = st.columns(2)
     
     with col1:
-        st.subheader("Receita Mensal Potencial por Segmento (R$)")
-        fig_receita_fl = px.bar(
-            df_segmentacao_fl,
-            x='Segmento',
-            y='Receita Mensal (R$)',
-            color_discrete_sequence=['#4ECDC4'],
-            title="Receita Mensal"
-        )
-        fig_receita_fl.update_layout(height=400, xaxis_tickangle=-45)
-        st.plotly_chart(fig_receita_fl, use_container_width=True)
+        st.subheader("Empresas Alvo por Região")
+        plotly_chart(art['fig_empresas_comp'], use_container_width=True)
     
     with col2:
-        st.subheader("Investimento Anual em EaaS (R$)")
-        fig_inv_fl = px.bar(
-            df_segmentacao_fl,
-            x='Segmento',
-            y='Inv. Anual EaaS',
-            color_discrete_sequence=['#45B7D1'],
-            title="Investimento Anual"
-        )
-        fig_inv_fl.update_layout(height=400, xaxis_tickangle=-45)
-        st.plotly_chart(fig_inv_fl, use_container_width=True)
-    
-    st.markdown("---")
-    
-    # SWOT Analysis
-    st.subheader("🎯 Análise SWOT - Florianópolis")
-    
-    swot_col1, swot_col2 = st.columns(2)
-    
-    with swot_col1:
-        st.success("**Forças**")
-        for i, forca in enumerate(swot_fl['Forças'], 1):
-            st.write(f"{i}. {forca}")
-        
-        st.error("**Fraquezas**")
-        for i, fraqueza in enumerate(swot_fl['Fraquezas'], 1):
-            st.write(f"{i}. {fraqueza}")
-    
-    with swot_col2:
-        st.info("**Oportunidades**")
-        for i, oportunidade in enumerate(swot_fl['Oportunidades'], 1):
-            st.write(f"{i}. {oportunidade}")
-        
-        st.warning("**Ameaças**")
-        for i, ameaca in enumerate(swot_fl['Ameaças'], 1):
-            st.write(f"{i}. {ameaca}")
+        st.subheader("Mercado Potencial Comparativo")
+        plotly_chart(art['fig_mercado_comp'], use_container_width=True)
     
     st.markdown("---")
     
-    # KPIs
-    st.subheader("📈 Indicadores-Chave de Performance (KPIs)")
+    st.subheader("🎯 Índices de Oportunidade (KPIs Consolidados)")
     
-    kpi_col1, kpi_col2 = st.columns(2)
+    df_kpi = art['df_kpi']
+    dataframe(df_kpi, use_container_width=True)
+    st.caption(nota_hhi())
     
-    with kpi_col1:
-        st.metric("Índice HHI (Concentração)", "6.800", "Altamente concentrado")
-        st.metric("Taxa Adoção Tecnologia", "48%", "Oportunidade digital")
-        st.metric("Elasticidade-Preço", "-0,72", "Moderadamente elástica")
+    st.caption("Concentração calculada a partir dos clientes dos concorrentes (regiões com dados de participação)")
+    dataframe(INDICADORES['concentracao'], use_container_width=True)
     
-    with kpi_col2:
-        st.metric("Barreira de Entrada", "3,8/5", "Moderada-Alta")
-        st.metric("Score Oportunidade", "78/100", "MUITO ATRATIVO ✓")
-
-# ============================================================================
-# TAB 3: SANTA CATARINA
-# ============================================================================
-with tab3:
-    st.header("🌎 Santa Catarina - Análise Regional")
-    
-    # Métricas principais
-    col1, col2, col3, col4 = st.columns(4)
-    col1.metric("Empresas Alvo", "1.800", "6,4x Florianópolis")
-    col2.metric("Mercado Potencial", "R$ 432M", "Anual")
-    col3.metric("Ticket Médio", "R$ 2.900", "Tickets maiores")
-    col4.metric("Oportunidade", "68/100", "ATRATIVO")
+    for col, (nome, regiao) in zip(st.columns(len(REGIOES)), REGIOES.iterrows()):
+        col.info(
+            f"**{nome}**\n\n"
+            f"- 🎯 Score: {KPI.loc['Score Oportunidade', nome]:.0f}/100\n"
+            f"- 📊 {rotulo_hhi(nome)}: {fmt.numero(KPI.loc['HHI Index', nome])}\n"
+            f"- 💰 Mercado: {fmt.moeda_abreviada(regiao['Mercado (R$)'])}\n"
+            f"- 📈 Crescimento: {fmt.percentual(regiao['Crescimento Anual'])} ao ano"
+        )
     
     st.markdown("---")
     
-    st.subheader("📍 Principais Cidades Econômicas")
-    cidades_sc = {
-        'Cidade': ['Florianópolis', 'Blumenau', 'Joinville', 'Chapecó', 'Criciúma', 'Brusque'],
-        'Especialização': [
-            'Startups/Tech',
-            'Têxtil/Turismo',
-            'Planejamento Urbano',
-            'Agro/Indústria',
-            'Cerâmica/Porcelana',
-            'Têxtil/Varejo'
-        ],
-        'Ticket Médio': ['R$ 2.840', 'R$ 3.200', 'R$ 3.500', 'R$ 2.500', 'R$ 3.800', 'R$ 3.100']
-    }
-    df_cidades = pd.DataFrame(cidades_sc)
-    st.dataframe(df_cidades, use_container_width=True)
+    st.subheader("📈 Projeção de Mercado")
+    projecao()
     
     st.markdown("---")
     
-    st.subheader("🏢 Concorrentes Regionais Principais")
-    concorrentes_sc = {
-        'Empresa': ['Parcon', 'Ás Consultoria', 'Regência', 'Alore', 'EconômiX', 'Análise Setorial SC'],
-        'Região Base': ['Florianópolis', 'Florianópolis', 'Várias', 'Criciúma', 'Blumenau', 'Brusque'],
-        'Estratégia': ['Local/Acessível', 'Especializada', 'Volume', 'Setorial', 'EaaS Esp.', 'Cluster'],
-        'Preço Base (R$/mês)': ['2.500-4.500', '3.500-6.000', '2.500-5.000', '4.000-6.500', '3.000-5.500', '2.800-5.000']
-    }
-    df_conc_sc = pd.DataFrame(concorrentes_sc)
-    st.dataframe(df_conc_sc, use_container_width=True)
+    st.subheader("💡 Recomendações Estratégicas por Região")
     
-    st.markdown("---")
+    df_recomendacoes = art['df_recomendacoes']
+    dataframe(df_recomendacoes, use_container_width=True)
     
-    st.subheader("📊 Segmentação de Clientes - SC")
-    segmentacao_sc = {
-        'Segmento': ['Startups Growth', 'PMEs Médias', 'PMEs Pequenas'],
-        'Qtd. Estimada': [360, 720, 720],
-        'Ticket Médio (R$)': [4500, 3200, 1800],
-        'Receita Mensal': [1620000, 2304000, 1296000]
-    }
-    df_seg_sc = pd.DataFrame(segmentacao_sc)
-    st.dataframe(df_seg_sc, use_container_width=True)
+    st.markdown("---")
     
-    col1, col2 = st.columns(2)
+    st.subheader("🚀 Gaps e Oportunidades Principais")
     
-    with col1:
-        fig_seg_sc_pie = px.pie(df_seg_sc, labels='Segmento', values='Qtd. Estimada',
-                               color_discrete_sequence=['#FF6B6B', '#4ECDC4', '#45B7D1'])
-        st.plotly_chart(fig_seg_sc_pie, use_container_width=True)
-    
-    with col2:
-        st.subheader("Receita Potencial por Segmento")
-        fig_receita_sc = px.bar(df_seg_sc, x='Segmento', y='Receita Mensal',
-                               color_discrete_sequence=['#4ECDC4'])
-        st.plotly_chart(fig_receita_sc, use_container_width=True)
+    tabela_paginada(art['tab_gaps'], 'gaps')
     
     st.markdown("---")
     
-    st.subheader("📈 KPIs Santa Catarina")
-    kpi_col1, kpi_col2 = st.columns(2)
+    st.subheader("🏆 Ranking de Oportunidade (Localidade × Segmento)")
+    st.caption(
+        "Score 0–100 ponderado sobre as dimensões dos KPIs e o mercado de cada segmento; "
+        "com o cubo de estabelecimentos (eaas.agregacao), cada município entra no ranking."
+    )
+    ranking()
     
-    with kpi_col1:
-        st.metric("HHI (Concentração)", "5.200", "Moderadamente concentrado")
-        st.metric("Taxa Adoção Tech", "42%", "Crescente")
+    st.markdown("---")
     
-    with kpi_col2:
-        st.metric("Barreira Entrada", "3,2/5", "Moderada")
-        st.metric("Score Oportunidade", "68/100", "ATRATIVO")
+    st.subheader("🏛️ Indicadores Municipais (IBGE/SIDRA)")
+    municipios = obter_municipios()
+    if municipios is None:
+        st.caption("Sem coleta gravada: `python -m eaas.ingestao coletar --uf 42`")
+    else:
+        df_municipios, meta = municipios
+        periodos = ', '.join(f"{nome} {periodo}" for nome, periodo in meta['periodos'].items())
+        st.caption(f"Coletado em {meta['coletado_em'][:10]} · {periodos}")
+        dataframe(df_municipios, use_container_width=True, hide_index=True)
+
+
+# Fragmento: cada consulta refaz só a busca
+@st.fragment
+def busca():
+    col_consulta, col_preco = st.columns([3, 1])
+    consulta = col_consulta.text_input(
+        "Empresa, serviço, região ou preço", key='busca_consulta',
+        placeholder="ex.: consultoria financ, bpo 3000",
+        help="Sem acentos, por prefixo e tolerante a erros de digitação, em todas as regiões"
+    )
+    preco_max = col_preco.number_input("Preço mínimo até (R$/mês)", min_value=0, value=0, step=500,
+                                       key='busca_preco', help="0: sem limite")
+    if not consulta.strip():
+        return
+    resultado = obter_busca(FONTES, VERSAO, consulta, preco_max=preco_max or None)
+    if resultado.empty:
+        st.caption("Nenhum concorrente encontrado.")
+    else:
+        dataframe(resultado, use_container_width=True, hide_index=True)
+
+
+# Fragmento: mudar horizonte ou taxas refaz só a projeção
+@st.fragment
+def projecao():
+    col_anos, col_choque, col_regiao = st.columns(3)
+    anos = col_anos.slider("Horizonte (anos)", 1, 30, HORIZONTE_ANOS, key='projecao_anos')
+    choque = col_choque.slider("Choque em todas as taxas (pp)", -5.0, 5.0, 0.0, step=0.5, key='projecao_choque')
+    regiao = col_regiao.selectbox("Detalhar", [None, *REGIOES.index], key='projecao_regiao',
+                                  format_func=lambda r: "Todas as regiões" if r is None else f"Segmentos - {r}")
+    
+    # Cenário: taxa anual de cada região (padrão: 'Crescimento Anual' de mercado_data)
+    ajustes = {}
+    for col, (nome, linha) in zip(st.columns(len(REGIOES)), REGIOES.iterrows()):
+        taxa = col.slider(f"Crescimento {nome} (% a.a.)", 0.0, 30.0, float(linha['Crescimento Anual']),
+                          step=0.5, key=f'projecao_taxa_{nome}')
+        if taxa != linha['Crescimento Anual']:
+            ajustes[nome] = taxa
+    
+    fig, final = obter_projecao(FONTES, VERSAO, anos, ajustes=ajustes, choque_pp=choque, regiao=regiao)
+    plotly_chart(fig, use_container_width=True)
+    dataframe(final, use_container_width=True, hide_index=True)
+
+
+# Fragmento: mudar um peso refaz só o ranking
+@st.fragment
+def ranking():
+    *colunas, col_k = st.columns(len(DIMENSOES) + 1)
+    pesos = {dimensao: col.slider(dimensao, 0, 5, PESOS_PADRAO[dimensao], key=f'peso_{dimensao}')
+             for col, dimensao in zip(colunas, DIMENSOES)}
+    k = col_k.select_slider("Top-K", [5, 10, 25, 50, 100], TOP_K, key='ranking_k')
+    dataframe(obter_ranking(FONTES, VERSAO, pesos, k), use_container_width=True, hide_index=True)
 
 # ============================================================================
-# TAB 4: BRASIL
+# TAB 4: MAPA
 # ============================================================================
-with tab4:
-    st.header("🇧🇷 Brasil - Mercado Nacional")
-    
-    # Métricas principais
+def aba_mapa():
+    st.header("🧭 Mapa - Estados e Municípios")
+    st.markdown(
+        "Malhas do IBGE simplificadas offline (eaas.mapa): o recorte define o nível de detalhe "
+        "enviado ao navegador."
+    )
+    mapa()
+
+
+# Fragmento: trocar recorte, métrica ou detalhe refaz só o mapa
+@st.fragment
+def mapa():
+    col_regiao, col_metrica, col_detalhe = st.columns(3)
+    regiao = col_regiao.selectbox("Recorte", list(CADASTRO), index=list(CADASTRO).index('Santa Catarina'),
+                                  key='mapa_regiao')
+    metrica = col_metrica.selectbox("Métrica", METRICAS, key='mapa_metrica')
+    detalhe = col_detalhe.select_slider("Detalhe", ["Automático", *RESOLUCOES], key='mapa_detalhe')
+    resultado = obter_mapa(FONTES, VERSAO, regiao, metrica, None if detalhe == "Automático" else detalhe)
+    if resultado is None:
+        camada, _ = camada_regiao(regiao)
+        st.info(f"Malha '{camada}' ainda não preparada: `python -m eaas.mapa baixar {camada}`")
+        return
+    fig, resolucao, vertices = resultado
+    if not vertices:
+        st.info(f"Nenhuma feição de {regiao} na malha preparada.")
+        return
+    plotly_chart(fig, use_container_width=True)
+    st.caption(
+        f"Resolução {resolucao} ({fmt.numero(vertices)} vértices). "
+        "Sem o cubo de estabelecimentos, cada localidade recebe o valor da região do cadastro que a contém; "
+        "com ele, o score só aparece nos municípios do cubo."
+    )
+
+# ============================================================================
+# TAB 5: CENÁRIOS (MONTE CARLO)
+# ============================================================================
+def aba_cenarios():
+    st.header("🎲 Cenários - Simulação Monte Carlo")
+    st.markdown(
+        "Ticket, clientes, elasticidade-preço e penetração sorteados a partir das faixas "
+        "das Recomendações Estratégicas e dos KPIs de cada região."
+    )
+    simulacao()
+
+
+# Fragmento: mover um slider refaz só a simulação, não o script inteiro
+@st.fragment
+def simulacao():
     col1, col2, col3, col4 = st.columns(4)
-    col1.metric("Empresas Alvo", "45.000", "160x Florianópolis")
-    col2.metric("Mercado Potencial", "R$ 1,44B", "Anual")
-    col3.metric("Ticket Médio", "R$ 3.135", "Maior valor agregado")
-    col4.metric("Oportunidade", "55/100", "MODERADA")
-    
-    st.markdown("---")
-    
-    st.subheader("🏢 Concorrentes Nacionais - Top Players")
-    
-    concorrentes_br = {
-        'Empresa/Plataforma': [
-            'Hubbli Finance', 'Caju Finance', 'Contabl', 'Omni Finance',
-            'XP Investimentos', 'Deloitte', 'PwC', 'Eureca Consultoria'
-        ],
-        'Especialidade': [
-            'PME Digital', 'Fluxo Caixa SaaS', 'Gestão Completa',
-            'AI Analysis', 'Corporate', 'Enterprise', 'Enterprise', 'Startups'
-        ],
-        'Abrangência': [
-            'Online Brasil', 'Online Brasil', 'Online Brasil',
-            'Online Brasil', 'Nacional', 'Nacional', 'Nacional', 'Online Brasil'
-        ],
-        'Ticket Médio (R$/mês)': [
-            '1.500-4.000', '2.000-4.500', '1.800-4.000', '2.500-5.000',
-            '10.000-50.000', '15.000-60.000', '12.000-40.000', '2.000-5.000'
-        ]
-    }
-    df_conc_br = pd.DataFrame(concorrentes_br)
-    st.dataframe(df_conc_br, use_container_width=True)
+    variacao = col1.slider("Variação de preço (%)", -30, 30, 0, step=5)
+    desvio_el = col2.slider("Incerteza da elasticidade (σ)", 0.0, 0.5, 0.15, step=0.05)
+    desvio_pen = col3.slider("Incerteza da penetração (σ, pp)", 0.0, 10.0, 3.0, step=0.5)
+    n = col4.select_slider("Simulações por região", [100_000, 250_000, 500_000, 1_000_000], 1_000_000,
+                           format_func=fmt.numero)
+    
+    resultado, bandas = obter_cenario(
+        FONTES, VERSAO, n,
+        processos=int(os.environ.get('EAAS_SIMULACAO_PROCESSOS', 1)),
+        variacao_preco=variacao / 100,
+        desvio_elasticidade=desvio_el,
+        desvio_penetracao=desvio_pen,
+    )
     
     st.markdown("---")
     
-    st.subheader("📊 Segmentação de Clientes - Brasil")
-    
-    segmentacao_br = {
-        'Segmento': [
-            'Startups Growth',
-            'Startups Scale',
-            'PMEs Médias',
-            'PMEs Pequenas'
-        ],
-        'Qtd. Estimada': [9000, 2250, 18000, 15750],
-        'Ticket Médio (R$)': [4500, 6500, 3200, 1800],
-        'Receita Mensal (R$)': [40500000, 14625000, 57600000, 28350000]
-    }
-    df_seg_br = pd.DataFrame(segmentacao_br)
-    st.dataframe(df_seg_br, use_container_width=True)
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("Distribuição de Clientes")
-        fig_seg_br_pie = px.pie(df_seg_br, labels='Segmento', values='Qtd. Estimada',
-                               color_discrete_sequence=['#FF6B6B', '#4ECDC4', '#45B7D1', '#F7DC6F'])
-        st.plotly_chart(fig_seg_br_pie, use_container_width=True)
-    
-    with col2:
-        st.subheader("Potencial de Receita Mensal")
-        fig_receita_br = px.bar(df_seg_br, x='Segmento', y='Receita Mensal (R$)',
-                               color_discrete_sequence=['#4ECDC4'])
-        st.plotly_chart(fig_receita_br, use_container_width=True)
-    
-    st.markdown("---")
-    
-    st.subheader("📈 KPIs Brasil")
-    kpi_col1, kpi_col2 = st.columns(2)
-    
-    with kpi_col1:
-        st.metric("HHI (Concentração)", "2.900", "Fragmentado - múltiplos nichos")
-        st.metric("Taxa Adoção Tech EaaS", "62%", "Oportunidade crescente")
-        st.metric("Elasticidade-Preço", "-0,58", "Preço é fator decisão")
+    st.subheader("📊 Percentis por Região")
+    dataframe(resultado, use_container_width=True)
     
-    with kpi_col2:
-        st.metric("Barreira Entrada", "2,3/5", "Baixa a Moderada")
-        st.metric("Score Oportunidade", "55/100", "MODERADO - Nichos com potencial")
+    st.subheader("📈 Receita Mensal Projetada - Faixas de Percentis")
+    regiao = st.radio("Região", list(bandas['Região'].unique()), horizontal=True, key='cenario_regiao')
+    plotly_chart(figura_bandas(bandas[bandas['Região'] == regiao]), use_container_width=True)
 
 # ============================================================================
-# TAB 5: ANÁLISE CONSOLIDADA
+# ABAS PRINCIPAIS
 # ============================================================================
-with tab5:
-    st.header("📋 Análise Consolidada - Comparativo Regional")
-    
-    # Comparativo geral
-    st.subheader("📊 Dimensionamento Comparativo")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("Empresas Alvo por Região")
-        fig_empresas_comp = px.bar(df_mercado, x='Região', y='Empresas Alvo',
-                                  color_discrete_sequence=['#FF6B6B'])
-        st.plotly_chart(fig_empresas_comp, use_container_width=True)
-    
-    with col2:
-        st.subheader("Mercado Potencial Comparativo")
-        fig_mercado_comp = px.bar(df_mercado, x='Região', y='Mercado (R$ mi)',
-                                 color_discrete_sequence=['#4ECDC4'])
-        st.plotly_chart(fig_mercado_comp, use_container_width=True)
-    
-    st.markdown("---")
-    
-    st.subheader("🎯 Índices de Oportunidade (KPIs Consolidados)")
-    
-    df_kpi = pd.DataFrame(kpi_data)
-    st.dataframe(df_kpi, use_container_width=True)
-    
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.info("**Florianópolis**\n\n- 🎯 Score: 78/100\n- 📊 HHI: 6.800\n- 💰 Mercado: R$ 50,4M\n- 📈 Crescimento: 12% ao ano")
-    
-    with col2:
-        st.info("**Santa Catarina**\n\n- 🎯 Score: 68/100\n- 📊 HHI: 5.200\n- 💰 Mercado: R$ 432M\n- 📈 Crescimento: 9% ao ano")
-    
-    with col3:
-        st.info("**Brasil**\n\n- 🎯 Score: 55/100\n- 📊 HHI: 2.900\n- 💰 Mercado: R$ 1,44B\n- 📈 Crescimento: 6% ao ano")
-    
-    st.markdown("---")
-    
-    st.subheader("💡 Recomendações Estratégicas por Região")
-    
-    recomendacoes = {
-        'Dimensão': [
-            'Foco Principal',
-            'Target Principal',
-            'Positioning',
-            'Preço Base Recomendado',
-            'Horizon Inicial',
-            'Escala Viável (Year 1)',
-            'Receita Realista (Year 1)'
-        ],
-        'Florianópolis': [
-            'Diferenciação Local Premium',
-            'Cat A+B (270 clientes)',
-            'Expert Local + Design + Marketing',
-            'R$ 4.500-6.000/mês',
-            '12 meses',
-            '10-15 clientes',
-            'R$ 60-90 mil/mês'
-        ],
-        'Santa Catarina': [
-            'Integração Regional',
-            'Cat A (640 clientes)',
-            'Solução Integrada Multi-Regional',
-            'R$ 3.500-5.500/mês',
-            '18 meses',
-            '15-25 clientes',
-            'R$ 75-150 mil/mês'
-        ],
-        'Brasil': [
-            'Especialização Nacional',
-            'Cat B+C (42.5k clientes)',
-            'Nicho Especializado',
-            'R$ 2.000-8.000/mês',
-            '24-36 meses',
-            '5-10 clientes',
-            'R$ 50-100 mil/mês'
-        ]
-    }
-    
-    df_recomendacoes = pd.DataFrame(recomendacoes)
-    st.dataframe(df_recomendacoes, use_container_width=True)
-    
-    st.markdown("---")
-    
-    st.subheader("🚀 Gaps e Oportunidades Principais")
-    
-    gaps_oportunidades = {
-        'Gap/Oportunidade': [
-            'Consultoria Integrada',
-            'Especialização em PME',
-            'Transformação Digital',
-            'Suporte Local + Online',
-            'Certificações Profissionais',
-            'Parcerias Estratégicas',
-            'Copyright/Propriedade Intelectual'
-        ],
-        'Florianópolis': ['FORTE', 'FORTE', 'MODERADA', 'FORTE', 'MODERADA', 'MODERADA', 'OPORTUNIDADE'],
-        'Santa Catarina': ['MODERADA', 'FORTE', 'MODERADA', 'MODERADA', 'FRACA', 'FORTE', 'OPORTUNIDADE'],
-        'Brasil': ['FORTE', 'MUITO FORTE', 'FORTE', 'OPORTUNIDADE', 'FORTE', 'FORTE', 'OPORTUNIDADE'],
-        'Recomendação': [
-            'Diferenciar como EaaS',
-            'Nicho principal',
-            'Combinar com inovação',
-            'Modelo híbrido',
-            'Diferenciar expertise',
-            'Ampliar com universidades',
-            'Novo mercado emergente'
-        ]
-    }
-    
-    df_gaps = pd.DataFrame(gaps_oportunidades)
-    st.dataframe(df_gaps, use_container_width=True)
+
+ABAS = {
+    "📈 Resumo Executivo": aba_resumo,
+    "🗺️ Regiões": aba_regioes,
+    "📋 Análise Consolidada": aba_consolidada,
+    "🧭 Mapa": aba_mapa,
+    "🎲 Cenários": aba_cenarios,
+}
+
+renderizadas = renderizar_abas(ABAS, todas=todas_abas)
+
+# ============================================================================
+# EXPORTAÇÃO
+# ============================================================================
+ROTULOS_EXPORTACAO = {'xlsx': "Excel (tabelas)", 'parquet': "Parquet (tabelas, .zip)", 'pdf': "PDF (gráficos)"}
+
+
+# Fragmento: trocar o formato ou gerar o arquivo não reexecuta as abas
+@st.fragment
+def exportacao():
+    formatos = formatos_exportacao()
+    if not formatos:
+        st.caption("Instale pyarrow, openpyxl ou kaleido para exportar.")
+        return
+    formato = st.selectbox("Formato", formatos, format_func=ROTULOS_EXPORTACAO.get, key='exportacao_formato')
+    exportador = obter_exportador()
+    tarefa = exportador.consultar(FONTES, formato)
+    if (tarefa is None or tarefa.erro) and st.button("Gerar arquivo", key='exportacao_gerar'):
+        tarefa = exportador.iniciar(FONTES, formato)
+    if tarefa is None:
+        return
+    if tarefa.erro:
+        st.error(tarefa.erro)
+    elif tarefa.pronta:
+        st.download_button(f"⬇️ {tarefa.nome}", data=tarefa.caminho.read_bytes, file_name=tarefa.nome,
+                           mime=tarefa.mime, key='exportacao_baixar', on_click='ignore')
+    else:
+        andamento_exportacao(tarefa)
+
+
+# Acompanha a thread do exportador; ao terminar, refaz o rerun para mostrar o download
+@st.fragment(run_every=1)
+def andamento_exportacao(tarefa):
+    if tarefa.pronta or tarefa.erro:
+        st.rerun()
+    st.progress(tarefa.progresso, text=f"{tarefa.etapa or 'Preparando'} ({tarefa.feitos}/{tarefa.total or '?'})")
+
+
+with st.sidebar.expander("📦 Exportar dados"):
+    exportacao()
+
+with st.sidebar.expander("⏱️ Custo por aba"):
+    painel_custos(renderizadas)
 
 # ============================================================================
 # RODAPÉ
 # ============================================================================
+# Data da última coleta do IBGE (eaas.ingestao), se houver
+MUNICIPIOS = obter_municipios()
+fonte_ibge = f" | IBGE/SIDRA ({MUNICIPIOS[1]['coletado_em'][:10]})" if MUNICIPIOS else ""
 st.markdown("---")
-st.markdown("""
+st.markdown(f"""
 <div style='text-align: center; color: #666; font-size: 0.9em;'>
     <p><b>Dashboard atualizado em:</b> 02/12/2025</p>
-    <p><b>Fonte:</b> Análise EaaS - Mercado de Consultoria Econômica</p>
+    <p><b>Fonte:</b> Análise EaaS - Mercado de Consultoria Econômica{fonte_ibge}</p>
     <p><b>Regiões Cobertas:</b> Florianópolis (SC) | Santa Catarina | Brasil</p>
 </div>
 """, unsafe_allow_html=True)
+
+# ============================================================================
+# PERFIL
+# ============================================================================
+if PERFIL is not None:
+    with st.sidebar.expander("🔬 Perfil do rerun", expanded=True):
+        perfil.painel(perfil.finalizar(PERFIL))
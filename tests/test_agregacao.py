@@ -0,0 +1,15 @@
+import os
+import subprocess
+import sys
+
+from eaas.agregacao import salvar_cubo
+from eaas.oportunidade import cubo_sintetico
+
+
+def test_cubo_lido_de_eaas_cubos_dir(tmp_path):
+    caminho = salvar_cubo(cubo_sintetico(5), tmp_path)
+    codigo = ("from eaas.agregacao import arquivo_cubo, carregar_cubo\n"
+              "print(arquivo_cubo()); print(len(carregar_cubo()))")
+    saida = subprocess.run([sys.executable, '-c', codigo], check=True, capture_output=True, text=True,
+                           env={**os.environ, 'EAAS_CUBOS_DIR': str(tmp_path)}).stdout.split()
+    assert saida == [str(caminho), str(len(cubo_sintetico(5)))]
@@ -0,0 +1,65 @@
+import subprocess
+import sys
+
+import pandas as pd
+import plotly.graph_objects as go
+import pytest
+
+from eaas.armazem import MODULOS, Armazem
+from eaas.tabela import TabelaIndexada
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture
+def artefatos():
+    df = pd.DataFrame({'Região': pd.Categorical(['SC', 'BR']), 'Valor': [1.5, 2.5]})
+    return {
+        'df_mercado': df,
+        'tab_gaps': TabelaIndexada(df),
+        'fig_mercado': go.Figure(go.Bar(x=['SC', 'BR'], y=[1.5, 2.5])),
+        'swot': {'Forças': ['a', 'b']},
+    }
+
+
+def test_ida_e_volta(tmp_path, artefatos):
+    armazem = Armazem(tmp_path)
+    assert armazem.gravar('chave', artefatos)
+    # Outra réplica não sobrescreve uma entrada publicada
+    assert not armazem.gravar('chave', artefatos)
+    lidos = Armazem(tmp_path).ler('chave')
+    pd.testing.assert_frame_equal(lidos['df_mercado'], artefatos['df_mercado'])
+    assert isinstance(lidos['tab_gaps'], TabelaIndexada)
+    pd.testing.assert_frame_equal(lidos['tab_gaps'].df, artefatos['tab_gaps'].df)
+    assert lidos['fig_mercado'].to_plotly_json()['data'] == artefatos['fig_mercado'].to_plotly_json()['data']
+    assert lidos['swot'] == artefatos['swot']
+
+
+def test_obter_constroi_uma_vez(tmp_path, artefatos):
+    armazem = Armazem(tmp_path)
+    chamadas = []
+
+    def construir():
+        chamadas.append(1)
+        return {'df_mercado': artefatos['df_mercado']}
+
+    armazem.obter('chave', construir)
+    armazem.obter('chave', construir)
+    assert len(chamadas) == 1
+    assert armazem.ler('outra') is None
+
+
+def test_despejar_mais_antigas(tmp_path, artefatos):
+    armazem = Armazem(tmp_path, limite_mb=0)
+    armazem.gravar('chave', {'df_mercado': artefatos['df_mercado']})
+    # Com limite zero, a entrada recém-gravada é despejada
+    assert armazem.status().empty
+
+
+def test_versao_codigo_cobre_os_modulos_importados():
+    codigo = ("import sys, eaas.armazem, eaas.grafo\n"
+              "print(' '.join(m[5:] for m in sys.modules if m.startswith('eaas.')))")
+    importados = set(subprocess.run([sys.executable, '-c', codigo], check=True, capture_output=True,
+                                    text=True).stdout.split())
+    # O perfil só mede; não muda o conteúdo dos artefatos
+    assert importados - {'perfil'} <= set(MODULOS)
@@ -0,0 +1,46 @@
+import pandas as pd
+import pytest
+
+from eaas.busca import IndiceBusca, termos_consulta
+
+
+@pytest.fixture
+def indice():
+    return IndiceBusca(pd.DataFrame({
+        'Empresa': ['Ás Consultoria', 'Parcon', 'EconômiX', 'Caju Finance'],
+        'Região': ['Florianópolis', 'Santa Catarina', 'Santa Catarina', 'Brasil'],
+        'Descrição': ['Análise econômica', 'Consultoria PME', 'BPO Financeiro', 'Fluxo de caixa'],
+        'Faixa de Preço': ['3.500-5.500', '2.500-4.500', '3.000-5.500', '2.000-4.500'],
+        'Preço Mín (R$)': [3500.0, 2500.0, 3000.0, 2000.0],
+        'Preço Máx (R$)': [5500.0, 4500.0, 5500.0, 4500.0],
+    }))
+
+
+def _empresas(resultado):
+    return list(resultado['Empresa'])
+
+
+def test_termos_sem_acento_e_milhar():
+    assert termos_consulta('Análise R$ 2.500') == ['analise', 'r', '2500']
+
+
+def test_nome_pesa_mais_que_descricao(indice):
+    # 'consultoria' está no nome de uma empresa e na descrição de outra
+    assert _empresas(indice.consultar('consultoria')) == ['Ás Consultoria', 'Parcon']
+
+
+def test_prefixo_e_erro_de_digitacao(indice):
+    assert _empresas(indice.consultar('econ')) == ['EconômiX', 'Ás Consultoria']
+    # Uma troca de letra: casa 'finance' (nome) e o prefixo de 'financeiro' (descrição)
+    aproximado = indice.consultar('finanse')
+    assert _empresas(aproximado) == ['Caju Finance', 'EconômiX']
+    assert aproximado['Score'].iloc[0] < indice.consultar('finance')['Score'].iloc[0]
+
+
+def test_preco_e_combinacao(indice):
+    # Todos os termos precisam casar: só as faixas de SC que contêm 5.000
+    assert sorted(_empresas(indice.consultar('5000 santa'))) == ['EconômiX']
+    assert sorted(_empresas(indice.consultar('4000 santa'))) == ['EconômiX', 'Parcon']
+    assert _empresas(indice.consultar('santa', preco_max=2800)) == ['Parcon']
+    assert indice.consultar('xyzzy').empty
+    assert indice.consultar('   ').empty
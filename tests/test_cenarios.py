@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from eaas.cenarios import PERCENTIS, Simulador, parametros_regionais, sortear_base
+from eaas.dados import carregar_fontes
+
+
+@pytest.fixture(scope='module')
+def simulador():
+    return Simulador(sortear_base(n=20_000), parametros_regionais(carregar_fontes()))
+
+
+@pytest.mark.parametrize('cenario', [
+    {},
+    {'variacao_preco': 0.2, 'desvio_elasticidade': 0.3},
+    {'variacao_preco': -0.1, 'desvio_penetracao': 6.0},
+])
+def test_percentis_iguais_aos_das_amostras(simulador, cenario):
+    resultado = simulador.percentis(**cenario).set_index(['Região', 'Métrica'])
+    for regiao in simulador.parametros.index:
+        for metrica, amostras in simulador.simular(regiao, **cenario).items():
+            np.testing.assert_allclose(resultado.loc[(regiao, metrica)].to_numpy(np.float64),
+                                       np.percentile(amostras, PERCENTIS), rtol=1e-5)
+
+
+def test_percentis_em_cache_por_controle(simulador):
+    simulador.percentis(variacao_preco=0.1)
+    guardados = len(simulador._percentis)
+    # Só o mercado depende do desvio da penetração
+    simulador.percentis(variacao_preco=0.1, desvio_penetracao=7.0)
+    assert len(simulador._percentis) == guardados + len(simulador.parametros)
+    pd.testing.assert_frame_equal(simulador.percentis(variacao_preco=0.1),
+                                  simulador.percentis(variacao_preco=0.1))
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from eaas.concentracao import MonitorConcentracao, classificar_hhi, indices_concentracao
+
+
+@pytest.fixture
+def participacoes():
+    return pd.DataFrame({
+        'Região': ['A'] * 5 + ['B'] * 2,
+        'Empresa': ['a1', 'a2', 'a3', 'a4', 'a5', 'b1', 'b2'],
+        'Clientes': [40, 30, 20, 10, 0, 50, 50],
+    })
+
+
+def test_hhi_cr4(participacoes):
+    indices = indices_concentracao(participacoes)
+    a, b = indices.loc['A'], indices.loc['B']
+    # Valores zerados não contam como empresa
+    assert a['Empresas'] == 4
+    assert a['HHI'] == pytest.approx(0.4 ** 2 * 1e4 + 0.3 ** 2 * 1e4 + 0.2 ** 2 * 1e4 + 0.1 ** 2 * 1e4)
+    assert a['CR4 (%)'] == pytest.approx(100)
+    assert a['Líder (%)'] == pytest.approx(40)
+    assert b['HHI'] == pytest.approx(5000)
+    assert b['Nº Equivalente'] == pytest.approx(2)
+
+
+def test_classificar_hhi():
+    assert classificar_hhi(3000) == "Altamente concentrado"
+    assert classificar_hhi(2000) == "Moderadamente concentrado"
+    assert classificar_hhi(800) == "Fragmentado - múltiplos nichos"
+
+
+def test_monitor_igual_ao_vetorizado(participacoes):
+    monitor = MonitorConcentracao(participacoes)
+    pd.testing.assert_frame_equal(monitor.tabela(), indices_concentracao(participacoes), check_exact=False)
+
+
+def test_monitor_reaplica_so_o_que_mudou(participacoes):
+    monitor = MonitorConcentracao(participacoes)
+    editada = participacoes.assign(Clientes=[40, 30, 20, 60, 5, 50, 50])
+    assert monitor.sincronizar(editada) == 2
+    pd.testing.assert_frame_equal(monitor.tabela(), indices_concentracao(editada), check_exact=False)
+
+
+def test_monitor_indexado_por_regiao_e_empresa(participacoes):
+    monitor = MonitorConcentracao(participacoes)
+    # Reordenar as linhas não muda nenhuma empresa
+    assert monitor.sincronizar(participacoes.iloc[::-1]) == 0
+    maior = pd.concat([participacoes.iloc[1:], pd.DataFrame({'Região': ['C'], 'Empresa': ['c1'], 'Clientes': [7]})],
+                      ignore_index=True)
+    # Sai a1, entra c1
+    assert monitor.sincronizar(maior) == 2
+    pd.testing.assert_frame_equal(monitor.tabela().sort_index(), indices_concentracao(maior).sort_index(),
+                                  check_exact=False)
+
+
+def test_monitor_atualizar_remove_grupo_vazio():
+    monitor = MonitorConcentracao()
+    monitor.atualizar('X', 'x1', 10)
+    assert monitor.hhi('X') == pytest.approx(10_000)
+    monitor.atualizar('X', 'x1', None)
+    assert monitor.tabela().empty
+    assert np.isnan(monitor.hhi('X'))
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from eaas.dados import carregar_fontes
+from eaas.dimensionamento import COL_TICKET
+from eaas.elasticidade import GRADE_MAX, GRADE_MIN, construir_curvas
+
+
+@pytest.fixture(scope='module')
+def curvas():
+    return construir_curvas(carregar_fontes())
+
+
+@pytest.mark.parametrize('multiplo', np.linspace(GRADE_MIN, GRADE_MAX, 11))
+def test_participacao_limitada_a_100(curvas, multiplo):
+    for regiao in curvas.regioes:
+        segmentos = curvas.segmentos(regiao)
+        precos = dict(zip(segmentos['Segmento'], segmentos['Ticket Médio (R$)'] * multiplo))
+        projecao = curvas.projetar(regiao, precos)
+        assert (projecao['Participação Atual (%)'] <= 100).all()
+        assert (projecao['Participação Projetada (%)'] <= 100).all()
+        atual, projetada = curvas.participacao(regiao, projecao)
+        assert 0 <= atual <= 100 and 0 <= projetada <= 100
+
+
+def test_participacao_sobre_mercado_anual(curvas):
+    projecao = curvas.projetar('Florianópolis')
+    mercado = carregar_fontes()['mercado'].set_index('Região').loc['Florianópolis', 'Mercado (R$ mi)'] * 1e6
+    atual, _ = curvas.participacao('Florianópolis', projecao)
+    assert not curvas.excede_mercado('Florianópolis')
+    assert atual == pytest.approx(projecao['Receita Atual (R$)'].sum() * 12 / mercado * 100)
@@ -0,0 +1,25 @@
+import pytest
+
+from eaas import formatacao as fmt
+
+
+@pytest.mark.parametrize('funcao, valor, esperado', [
+    (fmt.numero, 47080, '47.080'),
+    (fmt.moeda, 2840, 'R$ 2.840'),
+    (fmt.moeda_abreviada, 1.9224e9, 'R$ 1,92B'),
+    (fmt.moeda_abreviada, 45.3e6, 'R$ 45,3M'),
+    (fmt.moeda_abreviada, 12_000, 'R$ 12 mil'),
+    (fmt.moeda_abreviada, 950, 'R$ 950'),
+    (fmt.percentual, 10.67, '10,7%'),
+    (fmt.percentual, 18.0, '18%'),
+    (fmt.razao, 6.43, '6,4x'),
+    (fmt.razao, 160.7, '161x'),
+    (fmt.variacao, 6.15, '+6,2%'),
+    (fmt.variacao, -3.0, '-3%'),
+])
+def test_padrao_brasileiro(funcao, valor, esperado):
+    assert funcao(valor) == esperado
+
+
+def test_numero_com_casas():
+    assert fmt.numero(1234567.891, 2) == '1.234.567,89'
@@ -0,0 +1,62 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from eaas.dados import DIR_DADOS
+from eaas.grafo import NOS, Grafo, abaixo
+
+
+@pytest.fixture
+def diretorio(tmp_path):
+    for arquivo in DIR_DADOS.glob('*.csv'):
+        shutil.copy2(arquivo, tmp_path)
+    return tmp_path
+
+
+def _editar(caminho):
+    df = pd.read_csv(caminho)
+    df.iloc[0, 0] = f'{df.iloc[0, 0]} editada'
+    df.to_csv(caminho, index=False)
+    # Garante assinatura nova mesmo com mtime de baixa resolução
+    info = caminho.stat()
+    os.utime(caminho, ns=(info.st_atime_ns, info.st_mtime_ns + 1_000_000_000))
+
+
+def test_abaixo_segue_dependencias():
+    nos = abaixo(['concorrentes_sc'])
+    assert 'busca' in nos
+    assert 'projecao' not in nos
+    assert all('concorrentes_sc' in NOS[no] for no in nos)
+
+
+def test_edicao_recalcula_so_os_nos_abaixo(diretorio):
+    recalculados = []
+    recalcular = {no: (lambda fontes, no=no: recalculados.append(no)) for no in NOS}
+    grafo = Grafo(diretorio, recalcular)
+    versoes = {no: grafo.versao(no) for no in NOS}
+    fontes, geracao = grafo.fontes, grafo.geracao
+    assert grafo.verificar() is None
+    recalculados.clear()
+
+    _editar(diretorio / 'concorrentes_sc.csv')
+    ultima = grafo.verificar()
+
+    assert ultima['tabelas'] == ['concorrentes_sc']
+    assert recalculados == ultima['nos'] == abaixo(['concorrentes_sc'])
+    assert grafo.geracao == geracao + 1
+    for no in NOS:
+        assert (grafo.versao(no) != versoes[no]) == (no in ultima['nos'])
+    # Tabelas intactas continuam sendo os mesmos objetos
+    assert grafo.fontes['mercado'] is fontes['mercado']
+
+
+def test_regravar_sem_mudar_conteudo_nao_publica(diretorio):
+    grafo = Grafo(diretorio)
+    geracao = grafo.geracao
+    caminho = diretorio / 'mercado.csv'
+    info = caminho.stat()
+    os.utime(caminho, ns=(info.st_atime_ns, info.st_mtime_ns + 1_000_000_000))
+    assert grafo.verificar() is None
+    assert grafo.geracao == geracao
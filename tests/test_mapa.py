@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from eaas.dados import carregar_fontes
+from eaas.mapa import valores
+from eaas.oportunidade import INDICADOR_SCORE, cubo_sintetico, scores_regionais
+
+
+@pytest.fixture(scope='module')
+def fontes():
+    return carregar_fontes()
+
+
+def test_score_sem_cubo_e_o_regional_do_motor(fontes):
+    serie = valores(fontes, 'municipios_42', ['4205407', '4200051'], INDICADOR_SCORE)
+    regionais = scores_regionais(fontes)
+    assert serie.tolist() == pytest.approx([regionais['Florianópolis'], regionais['Santa Catarina']])
+
+
+def test_score_com_cubo_nao_mistura_escalas(fontes):
+    cubo = cubo_sintetico(20)
+    no_cubo = [f'{m}0' for m in cubo['Município'].unique()[:3]]
+    serie = valores(fontes, 'municipios_42', [*no_cubo, '4205407'], INDICADOR_SCORE, cubo)
+    assert serie[no_cubo].notna().all()
+    # Fora do cubo não herda o score regional, que vem de outra normalização
+    assert np.isnan(serie['4205407'])
@@ -0,0 +1,14 @@
+"""Carga sintética de ~1M de linhas (eaas.desempenho memoria), lida num interpretador novo."""
+from eaas.desempenho import LINHAS_CARGA, RSS_MAX_MB, memoria
+
+
+def test_um_milhao_de_linhas_dentro_do_orcamento():
+    relatorio = memoria(LINHAS_CARGA, RSS_MAX_MB)
+    assert relatorio['linhas'] >= LINHAS_CARGA
+    # Memória das tabelas (memory_usage) é determinística: é aqui que uma regressão de dtype aparece
+    estouradas = {t['Tabela']: t['Bytes/Linha'] for t in relatorio['tabelas'] if not t['Dentro']}
+    assert not estouradas, f"tabelas acima do orçamento por linha: {estouradas}"
+    # RSS do processo varia com alocador e versões; o teto só pega estouros grosseiros
+    assert relatorio['pico_rss_mb'] <= RSS_MAX_MB, (
+        f"pico de RSS {relatorio['pico_rss_mb']:.0f} MB acima do teto de {RSS_MAX_MB} MB"
+    )
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from eaas.dados import carregar_fontes
+from eaas.dimensionamento import calcular_indicadores
+from eaas.oportunidade import INDICADOR_SCORE, construir_motor, scores_regionais
+from eaas.regioes import CADASTRO
+
+
+@pytest.fixture(scope='module')
+def fontes():
+    return carregar_fontes()
+
+
+def test_score_regional_vem_do_motor(fontes):
+    assert INDICADOR_SCORE not in set(fontes['kpi']['Indicador'])
+    kpi = calcular_indicadores(fontes)['kpi'].set_index('Indicador')
+    scores = scores_regionais(fontes)
+    assert list(scores.index) == list(CADASTRO)
+    assert ((scores >= 0) & (scores <= 100)).all()
+    assert kpi.loc[INDICADOR_SCORE, list(CADASTRO)].tolist() == scores.round(1).tolist()
+
+
+def test_scores_por_pondera_pelo_mercado(fontes):
+    motor = construir_motor(fontes)
+    matriz = motor.matriz
+    linhas = (matriz['Localidade'] == 'Brasil').to_numpy()
+    esperado = np.average(motor.scores()[linhas], weights=matriz['Mercado'].to_numpy()[linhas])
+    assert scores_regionais(fontes, motor=motor)['Brasil'] == pytest.approx(esperado)
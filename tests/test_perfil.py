@@ -0,0 +1,29 @@
+import subprocess
+import sys
+
+from eaas import perfil
+
+
+def test_artefatos_sem_streamlit():
+    codigo = (
+        "import sys, eaas.snapshot, eaas.artefatos, eaas.tabela\n"
+        "assert 'streamlit' not in sys.modules, 'streamlit importado'\n"
+    )
+    subprocess.run([sys.executable, '-c', codigo], check=True)
+
+
+def test_instrumentado_registra_memoria_retida():
+    @perfil.instrumentado('figura')
+    def montar():
+        return list(range(10000))
+
+    registro = perfil.Perfil()
+    token = perfil._ATUAL.set(registro)
+    try:
+        montar()
+    finally:
+        perfil._ATUAL.reset(token)
+    registros = registro.encerrar()
+    assert [r['nome'] for r in registros] == ['montar']
+    assert registros[0]['alocado_kb'] > 0
+    assert 'pico_kb' not in registros[0]
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from eaas import precos
+
+
+@pytest.fixture(params=['arrow', 'regex'])
+def caminho(request, monkeypatch):
+    # Os dois caminhos de parse precisam dar o mesmo resultado
+    if request.param == 'regex':
+        monkeypatch.setattr(precos, 'pa', None)
+    elif precos.pa is None:
+        pytest.skip("pyarrow ausente")
+    return request.param
+
+
+@pytest.mark.parametrize('texto, minimo, maximo', [
+    ('3.500-5.500', 3500, 5500),
+    ('R$ 2.000-3.500', 2000, 3500),
+    ('25-35', 25, 35),
+    ('1.500,50', 1500.5, 1500.5),
+    ('10.000 a 50.000', 10000, 50000),
+    ('12.000-40.000/mês', 12000, 40000),
+])
+def test_faixas_formato_brasileiro(caminho, texto, minimo, maximo):
+    df = precos.faixas([texto])
+    assert df.loc[0, 'Mín'] == minimo
+    assert df.loc[0, 'Máx'] == maximo
+    assert df.loc[0, 'Médio'] == (minimo + maximo) / 2
+
+
+def test_faixas_ausente_e_indice(caminho):
+    valores = pd.Series(['2.000-3.000', None, '500'], index=[10, 20, 30])
+    df = precos.faixas(valores)
+    assert list(df.index) == [10, 20, 30]
+    assert np.isnan(df.loc[20, 'Mín'])
+    assert df.loc[30, 'Máx'] == 500
+
+
+def test_com_faixa_nomeia_colunas():
+    df = precos.com_faixa(pd.DataFrame({'Preço': ['1.000-2.000']}), 'Preço', 'Preço', ' (R$)')
+    assert list(df.columns) == ['Preço', 'Preço Mín (R$)', 'Preço Máx (R$)', 'Preço Médio (R$)']
@@ -0,0 +1,63 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from eaas.tabela import MAX_FILTROS, TabelaIndexada, tamanho_ipc
+
+
+@pytest.fixture
+def tabela():
+    return TabelaIndexada(pd.DataFrame({
+        'Empresa': ['beta', 'Alfa', 'gama', 'Delta'],
+        'Preço': [300, 100, 400, 200],
+    }, index=[7, 8, 9, 10]))
+
+
+def test_ordem_sem_caixa(tabela):
+    assert list(tabela.janela('Empresa')[0]['Empresa']) == ['Alfa', 'beta', 'Delta', 'gama']
+    assert list(tabela.janela('Preço', decrescente=True)[0]['Preço']) == [400, 300, 200, 100]
+
+
+def test_filtro_e_pagina(tabela):
+    janela, total = tabela.janela('Preço', filtro=' A ', inicio=1, tamanho=2)
+    # 'a' aparece em todas as linhas; a página começa na segunda
+    assert total == 4
+    assert list(janela['Preço']) == [200, 300]
+    janela, total = tabela.janela(filtro='ELT')
+    assert total == 1
+    assert janela['Empresa'].item() == 'Delta'
+
+
+def test_tamanho_maximo_respeita_orcamento_ipc(tabela):
+    grande = TabelaIndexada(pd.DataFrame({
+        'Empresa': [f'empresa {i:05d}' for i in range(5000)],
+        'Preço': np.arange(5000, dtype=np.float64),
+    }))
+    limite = grande.tamanho_maximo(orcamento_kb=8)
+    # Janela filtrada: posições salteadas, o índice vai junto no payload
+    janela, total = grande.janela(filtro='7', tamanho=limite)
+    assert total > limite
+    assert tamanho_ipc(janela) <= 8 * 1024
+    assert tamanho_ipc(grande.janela(tamanho=limite * 3 // 2)[0]) > 8 * 1024
+    assert tabela.tamanho_maximo(orcamento_kb=0) == 1
+
+
+def test_cache_de_filtros_concorrente(tabela):
+    erros = []
+
+    def filtrar(n):
+        try:
+            for i in range(200):
+                tabela.posicoes(filtro=f'{n}-{i}')
+        except Exception as erro:  # pragma: no cover - só em caso de corrida
+            erros.append(erro)
+
+    threads = [threading.Thread(target=filtrar, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not erros
+    assert len(tabela._filtros) <= MAX_FILTROS